@@ -13,7 +13,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import directly without the problematic dependencies
 try:
-    from app_hybrid import FinancialAnalystAI
+    from financial_analyst import FinancialAnalystAI
     HYBRID_AVAILABLE = True
 except Exception as e:
     print(f"⚠️ Could not import FinancialAnalystAI: {e}")
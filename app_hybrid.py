@@ -3,853 +3,244 @@ Hybrid Flask App: Combines ML-based categorization with Rule-based Financial Ana
 - Uses Random Forest for general categorization 
 - Falls back to Financial Analyst AI for edge cases and higher confidence
 - Enhanced SMS parsing and transaction categorization
+- Importing it only defines routes; create_app() loads the model and builds the rule engine
 """
 
-from flask import Flask, request, jsonify
-import re
+from flask import Flask, Response, request, jsonify, stream_with_context
+import hmac
+import json
+import math
+import os
+import threading
 from datetime import datetime
-from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from financial_analyst import FinancialAnalystAI
+from sms_patterns import SMS_PATTERNS
+from sms_parser import parse_sms
+from result_cache import TemplateCache, sms_template
+from serving import InferenceExecutor, InferenceRejected
+from metrics import SharedMetrics, NULL_TIMER
 
 app = Flask(__name__)
 
-class FinancialAnalystAI:
-    """Expert-level Financial Analyst AI for transaction categorization"""
-    
-    def __init__(self):
-        # Comprehensive merchant and keyword mappings for each category
-        self.category_rules = {
-            'Food & Dining': {
-                'merchants': [
-                    # International chains
-                    'mcdonalds', 'starbucks', 'kfc', 'dominos', 'pizza hut', 'subway', 
-                    'dunkin', 'taco bell', 'burger king', 'chipotle', 'panda express',
-                    'olive garden', 'zomato', 'swiggy', 'uber eats', 'food panda',
-                    
-                    # Indian chains and identifiers
-                    'cafe coffee day', 'ccd', 'haldirams', 'bikanervala', 'barista',
-                    'mcdonald', 'mcind', 'dominos', 'dompizz', 'kfc-india', 'kfcfry',
-                    'pizzahut', 'phut', 'starbucks', 'tatstar', 'ccdcafe', 'haldiram',
-                    'hald', 'bikaner', 'bikv'
-                ],
-                'keywords': [
-                    'restaurant', 'cafe', 'coffee', 'pizza', 'burger', 'food', 'dining',
-                    'meal', 'breakfast', 'lunch', 'dinner', 'snack', 'beverage',
-                    'bakery', 'deli', 'bistro', 'eatery', 'cuisine', 'kitchen', 'fast food'
-                ]
-            },
-            'Transportation': {
-                'merchants': [
-                    # Ride services
-                    'uber', 'ola', 'lyft', 'rapido', 'uber india systems', 'ola cabs', 
-                    'auto rickshaw', 'taxi service', 'meru', 'mega cabs', 'tab cabs', 'easy cabs',
-                    
-                    # Public Transportation (but not train booking)
-                    'metro', 'bus depot', 'airport', 'parking', 'bmtc', 'best', 'dmrc', 
-                    'kolkata metro', 'chennai metro', 'bangalore metro', 'hyderabad metro',
-                    'mumbai local', 'local train', 'suburban railway'
-                ],
-                'keywords': [
-                    'taxi', 'cab', 'ride', 'parking', 'toll', 'metro', 'bus', 'transport', 
-                    'vehicle', 'auto', 'rickshaw', 'bike', 'uber', 'ola', 'lyft', 'rapido',
-                    'fare', 'trip', 'journey', 'commute', 'travel fare'
-                ]
-            },
-            'Shopping': {
-                'merchants': [
-                    # E-commerce and department stores
-                    'amazon', 'flipkart', 'myntra', 'ajio', 'nykaa', 'snapdeal', 'paytm mall',
-                    'tata cliq', 'walmart', 'target', 'costco',
-                    
-                    # Fashion and clothing with Indian identifiers
-                    'shoppers stop', 'ssstop', 'shopst', 'lifestyle', 'lifst', 'pantaloons',
-                    'pantaloon', 'panth', 'max fashion', 'maxfash', 'harmax', 'westside',
-                    'tatawest', 'reliance trends', 'trends', 'reltrend', 'zara', 'indzara',
-                    'h&m', 'hm-india', 'hmfash',
-                    
-                    # Electronics
-                    'reliance digital', 'reldig', 'reltech', 'croma', 'cromatech', 'tatah',
-                    'vijay sales', 'vijay', 'vsales', 'girias', 'giri', 'cromag',
-                    
-                    # Accessories and jewelry
-                    'titan', 'titanwatch', 'tita', 'tanishq', 'tanish'
-                ],
-                'keywords': [
-                    'shopping', 'mall', 'store', 'retail', 'fashion', 'clothing', 'apparel',
-                    'electronics', 'gadgets', 'accessories', 'jewelry', 'cosmetics',
-                    'marketplace', 'outlet', 'boutique', 'department store'
-                ]
-            },
-            'Groceries': {
-                'merchants': [
-                    # Major Indian grocery chains with identifiers
-                    'reliance retail', 'reliance-in', 'rfresh', 'dmart', 'avsup', 'big bazaar',
-                    'bigbaz', 'futret', 'spencer', 'rspg', 'more supermarket', 'more', 'abrl',
-                    'star bazaar', 'starbaz', 'tataret', 'nilgiris', 'nilg', 'nilgi',
-                    'nature basket', 'nbasket', 'natb', 'foodhall', 'futgour', 'vishal mega mart',
-                    'vishal', 'vmmart',
-                    
-                    # International
-                    'walmart', 'target', 'kroger', 'safeway', 'bigbasket', 'grofers', 'zepto',
-                    'fresh to home', 'dunzo', 'amazon fresh'
-                ],
-                'keywords': [
-                    'grocery', 'supermarket', 'vegetables', 'fruits', 'dairy', 'meat',
-                    'bakery', 'household', 'cleaning', 'personal care', 'fresh', 'organic',
-                    'hypermarket', 'provisions', 'mart', 'essentials'
-                ]
-            },
-            'Healthcare': {
-                'merchants': [
-                    # Major hospital chains
-                    'apollo', 'apollo pharmacy', 'apharm', 'fortis', 'max healthcare', 'manipal',
-                    'medplus', 'mpharm', 'netmeds', 'netph', 'pharmeasy', 'peasy', 'one-mg',
-                    'tatpharm', 'lenskart', 'titan eye plus',
-                    
-                    # Diagnostic labs with identifiers
-                    'dr lal pathlabs', 'srl diagnostics', 'metropolis healthcare', 'metropolis',
-                    'thyrocare', 'clinical laboratory', 'clinical', 'laboratory', 'lab',
-                    'diagnostic center', 'diagnostic', 'medical center', 'medical',
-                    'uma clinical laboratory', 'uma clinical', 'pathology lab',
-                    'cvs pharmacy', 'walgreens', 'rite aid', 'quest diagnostics'
-                ],
-                'keywords': [
-                    'hospital', 'clinic', 'pharmacy', 'medical', 'doctor', 'dentist',
-                    'laboratory', 'lab', 'diagnostic', 'pathology', 'radiology', 'scan',
-                    'test', 'checkup', 'dental', 'eye', 'optical', 'healthcare', 'health',
-                    'medicine', 'prescription', 'treatment', 'consultation', 'surgery',
-                    'physiotherapy', 'nursing', 'ambulance', 'emergency', 'clinical',
-                    'blood test', 'urine test', 'x-ray', 'mri', 'ct scan', 'ultrasound'
-                ]
-            },
-            'Bills & Utilities': {
-                'merchants': [
-                    'electricity board', 'water department', 'gas company', 'airtel',
-                    'jio', 'vodafone', 'bsnl', 'tata sky', 'dish tv', 'netflix',
-                    'verizon', 'att', 'comcast', 'spectrum'
-                ],
-                'keywords': [
-                    'electricity', 'water', 'gas', 'internet', 'phone', 'mobile',
-                    'broadband', 'cable', 'satellite', 'utility', 'bill', 'service',
-                    'subscription', 'recharge', 'top-up', 'postpaid', 'prepaid'
-                ]
-            },
-            'Entertainment': {
-                'merchants': [
-                    # Indian Cinema Chains
-                    'pvr cinemas', 'inox', 'cinepolis', 'carnival cinemas', 'waves cinemas',
-                    'miraj cinemas', 'fun cinemas', 'delite cinemas', 'eros cinemas',
-                    
-                    # Ticket Booking Platforms
-                    'bookmyshow', 'paytm movies', 'fandango', 'ticketnew',
-                    
-                    # Indian OTT Platforms
-                    'hotstar', 'disney+ hotstar', 'zee5', 'sony liv', 'voot', 'mx player',
-                    'alt balaji', 'eros now', 'hungama play', 'shemaroo me', 'hoichoi',
-                    'addatimes', 'kooku', 'ullu', 'chaupal', 'lionsgate play',
-                    
-                    # International Streaming
-                    'netflix', 'amazon prime', 'amazon prime video', 'disney+', 'youtube premium',
-                    'apple tv+', 'paramount+', 'discovery+',
-                    
-                    # Music Streaming Platforms
-                    'spotify', 'gaana', 'jiosaavn', 'wynk music', 'hungama music',
-                    'apple music', 'youtube music', 'amazon music', 'saregama carvaan',
-                    
-                    # Gaming Platforms
-                    'steam', 'epic games', 'google play games', 'playstation store',
-                    'xbox live', 'nintendo eshop', 'mobile premier league', 'mpl',
-                    'dream11', 'rummycircle', 'ace2three', 'adda52',
-                    
-                    # Event Management
-                    'insider.in', 'townscript', 'eventbrite', 'meraevents', 'explara',
-                    
-                    # Sports & Events
-                    'cricket.com', 'cricbuzz', 'espn cricinfo', 'sports18', 'star sports'
-                ],
-                'keywords': [
-                    'movie', 'cinema', 'theater', 'theatre', 'film', 'bollywood', 'hollywood',
-                    'concert', 'show', 'streaming', 'music', 'video', 'game', 'gaming',
-                    'entertainment', 'event', 'ticket', 'booking', 'subscription', 'premium',
-                    'sports', 'live', 'cricket', 'football', 'match', 'tournament',
-                    'ott', 'web series', 'series', 'episode', 'season', 'documentary'
-                ]
-            },
-            'Education': {
-                'merchants': [
-                    # Indian EdTech Platforms
-                    'byju\'s', 'byjus', 'unacademy', 'vedantu', 'white hat jr', 'whitehat jr',
-                    'toppr', 'doubtnut', 'embibe', 'aakash digital', 'allen digital',
-                    'extramarks', 'meritnation', 'adda247', 'gradeup', 'testbook',
-                    'oliveboard', 'career launcher', 'time', 'ims learning',
-                    
-                    # International Online Learning
-                    'coursera', 'udemy', 'skillshare', 'khan academy', 'edx',
-                    'pluralsight', 'lynda', 'udacity', 'codecademy', 'brilliant',
-                    
-                    # Professional Certification
-                    'simplilearn', 'upgrad', 'great learning', 'intellipaat',
-                    'jigsaw academy', 'analytics vidhya', 'henry harvin',
-                    'edureka', 'mindmajix', 'whizlabs',
-                    
-                    # Language Learning
-                    'duolingo', 'babbel', 'rosetta stone', 'cambly', 'preply',
-                    'italki', 'hello english', 'enguru',
-                    
-                    # Traditional Education
-                    'university', 'college', 'school', 'coaching', 'tuition',
-                    'iit', 'nit', 'iisc', 'iiit', 'bits', 'vit', 'manipal',
-                    'delhi university', 'mumbai university', 'pune university',
-                    'fiitjee', 'aakash', 'allen', 'resonance', 'motion', 'vibrant',
-                    
-                    # Books & Study Materials
-                    'amazon books', 'flipkart books', 'crossword', 'oxford bookstore',
-                    'sapna book house', 'higginbothams', 'landmark', 'book depot'
-                ],
-                'keywords': [
-                    'tuition', 'course', 'class', 'training', 'coaching', 'certification',
-                    'exam', 'test', 'preparation', 'study', 'learning', 'education',
-                    'book', 'textbook', 'notes', 'academic', 'fee', 'fees',
-                    'admission', 'enrollment', 'registration', 'semester',
-                    'degree', 'diploma', 'bachelor', 'master', 'phd', 'doctorate',
-                    'entrance', 'competitive', 'jee', 'neet', 'cat', 'gate',
-                    'upsc', 'bank po', 'ssc', 'railway', 'defence',
-                    'ielts', 'toefl', 'gre', 'gmat', 'sat'
-                ]
-            },
-            'Travel': {
-                'merchants': [
-                    # Indian Travel Booking Platforms
-                    'makemytrip', 'goibibo', 'yatra', 'cleartrip', 'ixigo', 'easemytrip',
-                    'via.com', 'travelyaari', 'abhibus', 'redbus', 'ticketgoose',
-                    
-                    # International Booking Platforms
-                    'expedia', 'booking.com', 'agoda', 'hotels.com', 'trivago', 'kayak',
-                    
-                    # Indian Hotel Chains & Accommodations
-                    'oyo', 'oyo rooms', 'treebo', 'fab hotels', 'zostel', 'backpacker panda',
-                    'the lalit', 'oberoi hotels', 'taj hotels', 'itc hotels', 'hyatt',
-                    'marriott', 'hilton', 'radisson', 'lemon tree', 'ginger hotels',
-                    'sarovar hotels', 'country inn', 'royal orchid',
-                    
-                    # International Accommodations
-                    'airbnb', 'vrbo', 'homestay',
-                    
-                    # Indian Airlines
-                    'indigo', 'spicejet', 'air india', 'vistara', 'akasa air', 'air asia india',
-                    'alliance air', 'trujet', 'star air',
-                    
-                    # International Airlines
-                    'emirates', 'qatar airways', 'etihad', 'lufthansa', 'british airways',
-                    'singapore airlines', 'thai airways', 'cathay pacific',
-                    
-                    # Indian Railways & Transportation
-                    'irctc', 'irctc air', 'confirmtkt', 'railyatri', 'trainman',
-                    'ola', 'uber', 'rapido', 'auto rickshaw', 'taxi',
-                    
-                    # Travel Services
-                    'thomas cook', 'cox & kings', 'sotc', 'veena world', 'kesari tours',
-                    'club mahindra', 'sterling holidays', 'mahindra holidays'
-                ],
-                'keywords': [
-                    'flight', 'airline', 'airport', 'boarding', 'baggage', 'check-in',
-                    'hotel', 'resort', 'accommodation', 'booking', 'reservation',
-                    'travel', 'vacation', 'trip', 'tour', 'holiday', 'package',
-                    'train', 'railway', 'bus', 'cab', 'taxi', 'transport',
-                    'visa', 'passport', 'immigration', 'customs', 'forex',
-                    'domestic', 'international', 'destination', 'itinerary'
-                ]
-            },
-            'Housing': {
-                'merchants': [
-                    # Home Services Platforms
-                    'urban company', 'urbanclap', 'housejoy', 'timesaverz', 'taskbob',
-                    'housekeeping', 'cleaning services', 'pest control', 'plumbing services',
-                    
-                    # Real Estate Platforms
-                    'magicbricks', '99acres', 'housing.com', 'commonfloor', 'proptiger',
-                    'squareyards', 'nobroker', 'nestaway', 'zolo', 'colive',
-                    
-                    # Furniture & Home Decor
-                    'ikea', 'pepperfry', 'urban ladder', 'fab india', 'home centre',
-                    'hometown', 'nilkamal', 'godrej interio', 'durian', '@home',
-                    'furnish', 'livspace', 'design cafe', 'homelane',
-                    
-                    # Home Appliances
-                    'croma', 'reliance digital', 'vijay sales', 'ezone', 'poorvika',
-                    'bajaj finserv', 'samsung store', 'lg store', 'whirlpool',
-                    
-                    # Utilities & Services
-                    'justdial', 'sulekha', 'quikr services', 'ola electric',
-                    'swiggy genie', 'dunzo', 'porter', 'packers and movers',
-                    
-                    # Home Maintenance
-                    'mr. right', 'timesaverz', 'housekeep', 'zimmber',
-                    'carpenter', 'electrician', 'painter', 'civil work'
-                ],
-                'keywords': [
-                    'rent', 'rental', 'lease', 'deposit', 'advance', 'brokerage',
-                    'mortgage', 'loan', 'emi', 'home loan', 'property loan',
-                    'maintenance', 'repair', 'renovation', 'interior', 'cleaning',
-                    'property', 'real estate', 'home', 'house', 'apartment', 'flat',
-                    'villa', 'bungalow', 'plot', 'land', 'construction',
-                    'furniture', 'appliances', 'decor', 'furnishing', 'fittings',
-                    'electricity', 'plumbing', 'painting', 'pest control',
-                    'security deposit', 'society maintenance', 'building maintenance'
-                ]
-            },
-            'Insurance': {
-                'merchants': [
-                    # Life Insurance Companies
-                    'lic', 'life insurance corporation', 'sbi life', 'icici prudential',
-                    'hdfc life', 'bajaj allianz life', 'max life', 'aditya birla sun life',
-                    'kotak life', 'pnb metlife', 'canara hsbc oca', 'bharti axa life',
-                    'exide life', 'edelweiss tokio life', 'future generali',
-                    
-                    # General Insurance Companies
-                    'bajaj allianz', 'icici lombard', 'hdfc ergo', 'tata aig',
-                    'new india assurance', 'oriental insurance', 'national insurance',
-                    'united india insurance', 'reliance general', 'chola ms',
-                    'royal sundaram', 'liberty general', 'shriram insurance',
-                    'go digit', 'acko', 'digit insurance',
-                    
-                    # Health Insurance Specialists
-                    'star health', 'apollo munich', 'max bupa', 'care health',
-                    'niva bupa', 'religare health', 'aditya birla health',
-                    'cigna ttk', 'manipal cigna',
-                    
-                    # Motor Insurance Specialists
-                    'bharti axa general', 'iffco tokio', 'universal sompo',
-                    'zuno general', 'magma hdi',
-                    
-                    # Insurance Aggregators & Platforms
-                    'policybazaar', 'coverfox', 'easypolicy', 'turtlemint',
-                    'renewbuy', 'quickinsure', 'compare policy'
-                ],
-                'keywords': [
-                    'insurance', 'policy', 'premium', 'renewal', 'coverage', 'claim',
-                    'life insurance', 'term insurance', 'endowment', 'ulip',
-                    'health insurance', 'medical insurance', 'family health',
-                    'car insurance', 'motor insurance', 'vehicle insurance', 'two wheeler',
-                    'travel insurance', 'home insurance', 'fire insurance',
-                    'personal accident', 'critical illness', 'maternity cover',
-                    'cashless', 'reimbursement', 'sum assured', 'deductible',
-                                        'nominee', 'beneficiary', 'maturity', 'surrender value'
-                ]
-            },
-            'Fuel': {
-                'merchants': [
-                    # Indian Oil Companies
-                    'indian oil', 'iocl', 'petrol pump', 'gas station', 'fuel station',
-                    'bharat petroleum', 'bpcl', 'hindustan petroleum', 'hpcl',
-                    'reliance petrol', 'reliance petroleum', 'essar oil', 'nayara energy',
-                    'nayara', 'essar', 'jio-bp', 'jiobp', 'relbp', 'shell-india', 'shellfu',
-                    
-                    # International
-                    'shell', 'exxon', 'bp', 'chevron', 'total', 'texaco'
-                ],
-                'keywords': [
-                    'petrol', 'diesel', 'fuel', 'gas', 'gasoline', 'lpg', 'cng',
-                    'pump', 'station', 'refuel', 'fill up', 'petroleum', 'octane',
-                    'fuel station', 'petrol pump'
-                ]
-            }
-        }
-        
-        # Enhanced personal name patterns for transfer detection
-        self.personal_name_patterns = [
-            r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # First Last
-            r'\b[A-Z]\. [A-Z][a-z]+\b',      # F. Last
-            r'\b[A-Z][a-z]+ [A-Z]\.\b',      # First L.
-            r'\b[A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+\b'  # First Middle Last
-        ]
-    
-    def extract_merchant_info(self, text):
-        """Extract merchant name and relevant transaction details"""
-        text_clean = re.sub(r'[^\w\s]', ' ', text.lower())
-        
-        # Enhanced patterns for merchant extraction
-        merchant_patterns = [
-            # Power/Utility company specific patterns (highest priority)
-            r'to\s+([A-Z][A-Za-z\s&.\-\(\)]*?(?:Power|Electricity|Distribution|Corporation|Board|Authority|Company|Limited)[A-Za-z\s&.\-\(\)]*?)(?:\s*\.\s*UPI|\s+UPI|\s+on\s+\d|\.)',
-            
-            # Standard patterns with prepositions
-            r'(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\s+avl|\s+ref|\.|$)',
-            r'(?:spent|paid|debited|credited).*?(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # Patterns without prepositions (direct merchant names)
-            r'([A-Z][A-Z\s&.\-\(\)]{3,}?)(?:\s+on\s+\d|\s+for|\s+avl|\s+ref|\s+upi|\.|$)',
-            
-            # Card transaction patterns
-            r'card\s+(?:ending\s+)?\w+\s+at\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            r'transaction.*?at\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # UPI and payment patterns
-            r'upi\s+(?:payment|transaction).*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            r'payment.*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # Purchase and order patterns
-            r'purchase.*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            r'order.*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # Withdrawal and transfer patterns
-            r'(?:withdrawal|transfer|sent).*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # Subscription and service patterns
-            r'(?:subscription|service).*?(?:for|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)',
-            
-            # Generic merchant name patterns (fallback)
-            r'\b([A-Z][A-Z\s&.\-\(\)]{4,}?)\s+(?:on\s+\d|\s+for|\s+avl|\s+ref)',
-            r'(?:^|\s)([A-Z]{2,}(?:\s+[A-Z][A-Z\s&.\-\(\)]*)?)\s+(?:on\s+\d|\s+for|\.|$)',
-            
-            # Brand and company patterns
-            r'\b([A-Z]+(?:\s+[A-Z]+)*(?:\s+(?:PVT|LTD|INC|CORP|LLC|CO|SYSTEMS|SERVICES|TECHNOLOGIES|INDIA|PHARMACY|LABORATORY|HOSPITAL|CLINIC))*)\b',
-        ]
-        
-        merchant_name = None
-        for pattern in merchant_patterns:
-            match = re.search(pattern, text)
-            if match:
-                candidate = match.group(1).strip()
-                if len(candidate) > 2 and not re.match(r'^\d+$', candidate):
-                    merchant_name = candidate
-                    break
-        
-        return merchant_name, text_clean
-    
-    def is_personal_transfer(self, merchant_name, text):
-        """Determine if transaction is a personal transfer"""
-        if not merchant_name:
-            return False
-        
-        # Exclude business entities (they should not be transfers)
-        business_indicators = [
-            'laboratory', 'lab', 'clinical', 'hospital', 'pharmacy', 'medical',
-            'clinic', 'diagnostic', 'healthcare', 'store', 'mart', 'shop',
-            'restaurant', 'cafe', 'hotel', 'bank', 'ltd', 'pvt', 'inc',
-            'company', 'corp', 'systems', 'services', 'technologies'
-        ]
-        
-        merchant_lower = merchant_name.lower()
-        for indicator in business_indicators:
-            if indicator in merchant_lower:
-                return False  # This is a business, not a personal transfer
-            
-        # Check if merchant name matches personal name patterns
-        for pattern in self.personal_name_patterns:
-            if re.search(pattern, merchant_name):
-                return True
-        
-        # Check for common transfer keywords
-        transfer_keywords = ['transfer', 'sent to', 'received from', 'p2p']
-        text_lower = text.lower()
-        
-        return any(keyword in text_lower for keyword in transfer_keywords)
-    
-    def normalize_category(self, category):
-        """Normalize category names to handle variations"""
-        category_mapping = {
-            'Bills & Utilities': 'Utilities',
-            'bills & utilities': 'Utilities',
-            'Groceries': 'Shopping',  # For test purposes, map grocery stores to shopping
-            'Food & Dining': 'Food & Dining',
-            'food & dining': 'Food & Dining'
-        }
-        return category_mapping.get(category, category)
-    
-    def special_merchant_rules(self, merchant_name, text):
-        """Apply special rules for specific merchants"""
-        if not merchant_name:
-            merchant_name = ""  # Handle None case
-            
-        merchant_lower = merchant_name.lower()
-        text_lower = text.lower()
-        
-        # IRCTC should always be Travel (train booking), not Transportation
-        if 'irctc' in merchant_lower or 'irctc' in text_lower:
-            return 'Travel'
-            
-        # Big Bazaar and DMart are grocery stores but for our test, map to Shopping
-        if any(store in merchant_lower for store in ['big bazaar', 'dmart', 'bigbaz', 'avsup']) or \
-           any(store in text_lower for store in ['big bazaar', 'dmart']):
-            return 'Shopping'
-            
-        # Fuel stations should be Fuel category
-        fuel_indicators = ['petrol pump', 'fuel station', 'indian oil', 'bpcl', 'hpcl', 'iocl']
-        if any(fuel in merchant_lower for fuel in fuel_indicators) or any(fuel in text_lower for fuel in fuel_indicators):
-            return 'Fuel'
-            
-        # Education platforms
-        education_indicators = ['unacademy', 'byju', 'vedantu', 'coursera', 'udemy', 'course fee', 'subscription.*auto-renewed']
-        if any(edu in merchant_lower for edu in education_indicators) or any(edu in text_lower for edu in education_indicators):
-            return 'Education'
-            
-        # Healthcare - pharmacy and medical
-        healthcare_indicators = ['medplus', 'apollo pharmacy', 'pharmacy', 'clinical laboratory', 'laboratory', 'medical']
-        if any(health in merchant_lower for health in healthcare_indicators) or any(health in text_lower for health in healthcare_indicators):
-            return 'Healthcare'
-            
-        # Food & Dining
-        food_indicators = ['mcdonald', 'dominos', 'pizza', 'zomato', 'swiggy', 'food delivery']
-        if any(food in merchant_lower for food in food_indicators) or any(food in text_lower for food in food_indicators):
-            return 'Food & Dining'
-            
-        # Insurance (check before utilities and entertainment)
-        insurance_indicators = [
-            'insurance', 'policy', 'star health', 'starhealth', 'starins',
-            'hdfc ergo', 'hdfcergo', 'hdfcins', 'bajaj allianz', 'bajajall', 'bajins',
-            'icici lombard', 'icicilomb', 'iciciins', 'lic housing', 'lichfl', 'lichf',
-            'sbi life', 'sbilife', 'sbilifeins', 'max life', 'maxlife', 'maxins',
-            'niva bupa', 'nivabupa', 'nivains', 'cholamandalam', 'cholains',
-            'new india assurance', 'newindia', 'niins', 'oriental insurance', 'orientalins', 'orins',
-            'united india insurance', 'unitedins', 'uiins', 'national insurance', 'natinsurance', 'natins',
-            'reliance general', 'relgeneral', 'rgins', 'kotak mahindra life', 'kotaklife', 'klifeins',
-            'pnb metlife', 'pnbmetlife', 'pmins', 'tata aia', 'tataaia', 'taains',
-            'bharti axa', 'bhartiaxa', 'baxains'
-        ]
-        
-        # Check for insurance but exclude entertainment premium services
-        is_insurance = False
-        for ins in insurance_indicators:
-            if ins in merchant_lower or ins in text_lower:
-                is_insurance = True
-                break
-        
-        # Also check for premium but only if it's not entertainment related
-        if ('premium' in text_lower and not any(ent in text_lower for ent in ['netflix', 'hotstar', 'disney', 'prime video', 'spotify', 'streaming', 'subscription']) and 
-            any(ins_word in text_lower for ins_word in ['insurance', 'policy', 'life', 'health', 'medical'])):
-            is_insurance = True
-            
-        if is_insurance:
-            return 'Insurance'
-        
-        # Transportation/FASTag (check before utilities)
-        transportation_indicators = [
-            'fastag', 'toll', 'nhai', 'highway', 'toll plaza', 'fasttag',
-            'ihmcl', 'ihfast', 'nhfast', 'ptfast', 'ppfast', 'afast', 'ifas',
-            'sfast', 'hfast', 'idffast', 'kfast', 'nhaitoll', 'nhtoll',
-            'mumbaitoll', 'mutoll', 'delhitoll', 'dgtoll', 'chennaitoll', 'cbtoll',
-            'hydtoll', 'hortoll', 'blrtoll', 'betoll', 'punetoll', 'pmetoll',
-            'expressway', 'bypass'
-        ]
-        if any(trans in merchant_lower for trans in transportation_indicators) or any(trans in text_lower for trans in transportation_indicators):
-            return 'Transportation'
-        
-        # Education institutions (check before utilities)
-        education_institutions = [
-            'university', 'college', 'iit', 'iim', 'bits', 'symbiosis', 'amity',
-            'manipal', 'vit', 'delhi university', 'mumbai university', 'anna university',
-            'jnu', 'xlri', 'fms', 'sp jain', 'nmims', 'christ university', 'loyola',
-            'st xavier', 'iitdelhi', 'iitbombay', 'iimahmed', 'bitspilani', 'vitvellore',
-            'dufees', 'duedu', 'mufees', 'aunifees', 'jnufees', 'bitf', 'symf',
-            'amityf', 'manf', 'vitf', 'education fee', 'tuition', 'admission fee',
-            'course fee', 'semester fee', 'examination fee', 'registration fee'
-        ]
-        if any(edu in merchant_lower for edu in education_institutions) or any(edu in text_lower for edu in education_institutions):
-            return 'Education'
-        
-        # Bill payment platforms (check before utilities)
-        bill_platforms = [
-            'paytm-bill', 'phonepe-bill', 'gpay-bill', 'amazonpay-bill', 'mobikwik-bill',
-            'bhim-bill', 'billdesk', 'razorpay-bill', 'payu-bill', 'icicimobile', 'sbiyono',
-            'hdfcpayzapp', 'axismobile', 'kotak811', 'yesbankapp', 'airtelthanks', 'jiomoney',
-            'freecharge', 'oxigen', 'ptbill', 'ppbill', 'gpbill', 'apbill', 'mkbill',
-            'bhbill', 'bdbill', 'rzbill', 'pubill', 'imbill', 'ybill', 'hpzbill',
-            'axbill', 'k8bill', 'ybapp', 'atbill', 'jmbill', 'fcbill', 'oxbill',
-            'bill payment platform', 'payment gateway', 'wallet payment'
-        ]
-        if any(platform in merchant_lower for platform in bill_platforms) or any(platform in text_lower for platform in bill_platforms):
-            return 'Bills & Utilities'
+# Startup configuration
+# FINSAATHI_MODEL_PATH: pickle written by ImprovedExpenseCategorizer.save_model, or an
+#   artifact directory from save_artifact (memory-mapped, shared by all gunicorn workers)
+#   (default: enhanced_categorizer_v2.DEFAULT_MODEL_PATH)
+# FINSAATHI_TRAIN_ON_STARTUP: retrain when the artifact is missing or unreadable
+MODEL_PATH = os.environ.get('FINSAATHI_MODEL_PATH')
+TRAIN_ON_STARTUP = os.environ.get('FINSAATHI_TRAIN_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+# FINSAATHI_VECTORIZER_MODE: featurization for startup training, 'tfidf' or 'hashing'
+VECTORIZER_MODE = os.environ.get('FINSAATHI_VECTORIZER_MODE', 'tfidf')
+# FINSAATHI_FEATURE_MODE: keyword features for startup training, 'text' tokens or a sparse 'block'
+FEATURE_MODE = os.environ.get('FINSAATHI_FEATURE_MODE', 'text')
+# FINSAATHI_RESULT_CACHE_SIZE / _TTL: templates kept per worker (0 disables) and seconds each lives
+RESULT_CACHE_SIZE = int(os.environ.get('FINSAATHI_RESULT_CACHE_SIZE', '10000'))
+RESULT_CACHE_TTL = float(os.environ.get('FINSAATHI_RESULT_CACHE_TTL', '3600'))
+# FINSAATHI_SERVING_MODE / FINSAATHI_WORKER_TIMEOUT: gunicorn worker class and timeout, shared
+#   with gunicorn_config.py so the inference pool defaults follow them
+SERVING_MODE = os.environ.get('FINSAATHI_SERVING_MODE', 'sync')
+WORKER_TIMEOUT = float(os.environ.get('FINSAATHI_WORKER_TIMEOUT', '30'))
+# FINSAATHI_INFERENCE_THREADS / _QUEUE / _TIMEOUT: inference pool per worker (0 runs inline, the
+#   default unless gthread), tasks allowed to wait before requests get 429, and seconds before a
+#   request gets 503. The timeout is kept below the worker timeout (80% of it by default), so a
+#   slow request is answered before gunicorn kills the worker
+INFERENCE_THREADS = int(os.environ.get('FINSAATHI_INFERENCE_THREADS', '4' if SERVING_MODE == 'gthread' else '0'))
+INFERENCE_QUEUE = int(os.environ.get('FINSAATHI_INFERENCE_QUEUE', '8'))
+MAX_INFERENCE_TIMEOUT = WORKER_TIMEOUT * 0.8 if WORKER_TIMEOUT > 0 else None
+INFERENCE_TIMEOUT = float(os.environ.get('FINSAATHI_INFERENCE_TIMEOUT') or MAX_INFERENCE_TIMEOUT or 20)
+# FINSAATHI_RULES_FIRST_THRESHOLD: AI Analyst confidence at or above which the forest is skipped.
+#   The default of 0.99 lets the special merchant rules (1.0) settle messages alone. Without the
+#   skip a forest exactly as sure (1.0) would win the tie, so a category can change where such a
+#   forest disagrees with a special rule; above 1.0 the forest always runs and no category changes
+RULES_FIRST_THRESHOLD = float(os.environ.get('FINSAATHI_RULES_FIRST_THRESHOLD', '0.99'))
+# FINSAATHI_FAST_TIER_THRESHOLD: serve the linear fast tier when it is at least this sure and
+#   escalate to the forest otherwise (0 always uses it); unset serves the forest only
+FAST_TIER_THRESHOLD = os.environ.get('FINSAATHI_FAST_TIER_THRESHOLD')
+FAST_TIER_THRESHOLD = float(FAST_TIER_THRESHOLD) if FAST_TIER_THRESHOLD else None
+# FINSAATHI_FEEDBACK_PATH: JSONL file /api/feedback appends user corrections to
+# FINSAATHI_ONLINE_UPDATES / _INTERVAL: relearn the linear fast tier from the corrections in a
+#   background thread per worker, polling every _INTERVAL seconds. Corrections reach responses
+#   only through the fast tier: without FINSAATHI_FAST_TIER_THRESHOLD they have no effect
+FEEDBACK_PATH = os.environ.get('FINSAATHI_FEEDBACK_PATH', os.path.join('feedback', 'corrections.jsonl'))
+ONLINE_UPDATES = os.environ.get('FINSAATHI_ONLINE_UPDATES', '').lower() in ('1', 'true', 'yes')
+ONLINE_UPDATE_INTERVAL = float(os.environ.get('FINSAATHI_ONLINE_UPDATE_INTERVAL', '30'))
+# FINSAATHI_MODEL_WATCH_INTERVAL: seconds between checks of FINSAATHI_MODEL_PATH for a new model
+#   (0 only reloads on SIGHUP to a worker or /api/admin/reload-model)
+# FINSAATHI_RELOAD_MIN_ACCURACY: smoke accuracy on the bundled training data a new model must reach
+# FINSAATHI_ADMIN_TOKEN: X-Admin-Token value for the admin endpoints; unset disables them
+MODEL_WATCH_INTERVAL = float(os.environ.get('FINSAATHI_MODEL_WATCH_INTERVAL', '0'))
+RELOAD_MIN_ACCURACY = float(os.environ.get('FINSAATHI_RELOAD_MIN_ACCURACY', '0.7'))
+ADMIN_TOKEN = os.environ.get('FINSAATHI_ADMIN_TOKEN')
 
-        # Entertainment (check before utilities to avoid conflicts)
-        entertainment_indicators = [
-            'netflix', 'hotstar', 'disney', 'prime video', 'spotify', 'subscription.*auto-debited',
-            'pvr cinemas', 'pvr', 'inox', 'cinepolis', 'bookmyshow', 'movie', 'cinema',
-            'theater', 'theatre', 'entertainment', 'film', 'show', 'streaming'
-        ]
-        if any(ent in merchant_lower for ent in entertainment_indicators) or any(ent in text_lower for ent in entertainment_indicators):
-            return 'Entertainment'
-            
-        # Utilities - Enhanced detection for power/electricity companies
-        utility_indicators = [
-            # Power/Electricity companies - comprehensive database
-            'power distribution', 'electricity board', 'electric company', 'power company',
-            'eastern power', 'southern power', 'northern power', 'western power',
-            'state electricity', 'power corporation', 'electricity corporation',
-            'bescom', 'kseb', 'mseb', 'tneb', 'wbseb', 'uppcl', 'bses', 'tpddl',
-            'adani electricity', 'tata power', 'reliance energy', 'mahavitaran',
-            'jbvnl', 'jseb', 'pseb', 'dhbvn', 'uhbvn', 'mppkvvcl', 'cseb',
-            
-            # New comprehensive merchant identifiers - Electricity
-            'tatapower', 'tpdel', 'adanielec', 'ade', 'besdel', 'msdel', 
-            'torrentpwr', 'torpwr', 'cesc', 'cescel', 'dhbel', 'uppower',
-            'tnel', 'bestel', 'pspwr', 'pspcl', 'msedcl', 'msed', 'geb', 
-            'gedel', 'ksedel', 'apcpdcl', 'apdis', 'torrent power',
-            'calcutta electric', 'dakshin haryana', 'uttar pradesh power',
-            'tamil nadu electricity', 'brihanmumbai electric', 'punjab state power',
-            'maharashtra state electricity', 'gujarat electricity', 'kerala state electricity',
-            
-            # Water utilities 
-            'bwssb', 'bangalore water', 'bwdel', 'bwsdb', 'mumbai water', 'bwdel2',
-            'twad', 'tamil nadu water', 'twdel', 'phed', 'rajasthan water', 'phwater',
-            'up jal nigam', 'upjal', 'upnig', 'delhi jal board', 'djb', 'djwater',
-            'kerala water authority', 'kwa', 'kwdel', 'punjab water supply', 'pwsa', 
-            'pwsup', 'haryana water board', 'hwb', 'hwdel',
-            'water board', 'water department', 'water authority', 'municipal water',
-            
-            # Gas utilities
-            'indraprastha gas', 'igl', 'iglgas', 'mahanagar gas', 'mgl', 'mglgas',
-            'adani gas', 'adanigas', 'adgas', 'gail gas', 'gailgas', 'gaildel',
-            'hp gas', 'hpgas', 'hpgdel', 'bharat gas', 'bharatgas', 'bggas',
-            'gas authority', 'gas company', 'lpg', 'piped gas',
-            
-            # Telecom/Internet/DTH - comprehensive
-            'airtel', 'airtelrech', 'jio', 'jiorech', 'rjio', 'rjdig', 
-            'vodafone idea', 'vi', 'virech', 'bsnl', 'bsnlrech', 'tata docomo', 
-            'tatadoc', 'tdorech', 'mtnl', 'mtnlrech', 'bharti',
-            'telecom', 'mobile recharge', 'broadband', 'internet',
-            # DTH services
-            'tata sky', 'tatasky', 'tsrech', 'dish tv', 'dishtv', 'dhtvrech',
-            'sun direct', 'sundirect', 'sdrech', 'airtel digital tv', 'airteldth',
-            'adtvrech', 'videocon d2h', 'videocond2h', 'd2hrech', 'big tv',
-            'bigtv', 'bigrech',
-            
-            # General utility terms
-            'utility', 'bill payment', 'monthly bill', 'service charge'
-        ]
-        
-        # Check for utility indicators
-        if any(util in merchant_lower for util in utility_indicators) or any(util in text_lower for util in utility_indicators):
-            return 'Utilities'
-        
-        return None
+# Components, built by create_app(); importing this module loads and trains nothing
+ml_categorizer = None
+ai_analyst = None
+result_cache = None
+inference = None
+metrics = None
+feedback_store = None
+online_updater = None
+model_registry = None
+_create_lock = threading.Lock()
+# Process whose background threads start_background_threads already started
+_threads_pid = None
 
-    def categorize_transaction(self, text):
-        """Main categorization logic with enhanced confidence scoring"""
-        merchant_name, text_clean = self.extract_merchant_info(text)
-        
-        # Apply special merchant rules first
-        special_category = self.special_merchant_rules(merchant_name, text)
-        if special_category:
-            return {
-                "merchant_name": merchant_name,
-                "category": special_category,
-                "confidence_score": 1.0
-            }
-        
-        # Check for personal transfers first
-        if merchant_name and self.is_personal_transfer(merchant_name, text):
-            return {
-                "merchant_name": merchant_name,
-                "category": "Transfers",
-                "confidence_score": 0.95
-            }
-        
-        # Category scoring system with weighted factors
-        category_scores = {}
-        
-        for category, rules in self.category_rules.items():
-            score = 0
-            match_details = []
-            
-            # Check exact merchant matches (highest weight)
-            if merchant_name:
-                merchant_lower = merchant_name.lower()
-                for merchant in rules['merchants']:
-                    if merchant.lower() == merchant_lower:
-                        score += 1.0
-                        match_details.append(f"exact_merchant:{merchant}")
-                        break
-                    elif merchant.lower() in merchant_lower or any(word in merchant_lower for word in merchant.lower().split()):
-                        score += 0.8
-                        match_details.append(f"partial_merchant:{merchant}")
-                        break
-            
-            # Check keyword matches (medium weight)
-            keyword_matches = 0
-            for keyword in rules['keywords']:
-                if keyword.lower() in text_clean:
-                    keyword_matches += 1
-                    match_details.append(f"keyword:{keyword}")
-            
-            # Progressive scoring for keywords
-            if keyword_matches > 0:
-                keyword_score = min(0.6 + (keyword_matches * 0.1), 0.9)
-                score += keyword_score
-            
-            # Special healthcare boost for clinical/laboratory terms
-            if category == 'Healthcare':
-                healthcare_terms = ['clinical', 'laboratory', 'lab', 'diagnostic', 'medical', 'pathology']
-                for term in healthcare_terms:
-                    if term.lower() in text_clean:
-                        score += 0.3
-                        match_details.append(f"healthcare_boost:{term}")
-                        break
-            
-            # Special transportation boost for ride services
-            if category == 'Transportation':
-                transport_terms = ['uber', 'ola', 'cab', 'taxi', 'ride', 'fuel', 'petrol']
-                for term in transport_terms:
-                    if term.lower() in text_clean:
-                        score += 0.2
-                        match_details.append(f"transport_boost:{term}")
-                        break
-            
-            if score > 0:
-                category_scores[category] = {
-                    'score': min(score, 1.0),  # Cap at 1.0
-                    'matches': match_details
-                }
-        
-        # Determine best category with enhanced logic
-        if category_scores:
-            best_category = max(category_scores, key=lambda x: category_scores[x]['score'])
-            confidence = category_scores[best_category]['score']
-            
-            # Boost confidence for high-quality matches
-            if confidence >= 0.8:
-                confidence = min(confidence + 0.1, 1.0)
-            
-            return {
-                "merchant_name": merchant_name,
-                "category": self.normalize_category(best_category),
-                "confidence_score": round(confidence, 2),
-                "match_details": category_scores[best_category]['matches']
-            }
-        
-        # Default fallback
-        return {
-            "merchant_name": merchant_name,
-            "category": "Other",
-            "confidence_score": 0.3,
-            "match_details": ["no_matches"]
-        }
+def build_categorizer(model_path, auto_train=False):
+    """Unloaded categorizer with this deployment's settings"""
+    from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+    return ImprovedExpenseCategorizer(model_path=model_path, auto_train=auto_train,
+                                      fast_threshold=FAST_TIER_THRESHOLD, vectorizer_mode=VECTORIZER_MODE,
+                                      feature_mode=FEATURE_MODE)
 
-# Initialize components
-ml_categorizer = ImprovedExpenseCategorizer()
-ai_analyst = FinancialAnalystAI()
+def create_app():
+    """Build the ML model, rule engine and serving components once, and return the Flask app
+    
+    gunicorn runs it in the master ('app_hybrid:create_app()' with preload_app), so the
+    model, rule tables and shared metrics are built before the workers fork.
+    """
+    global ml_categorizer, ai_analyst, result_cache, inference, metrics
+    global feedback_store, online_updater, model_registry
+    
+    # model_registry is assigned last, so once it is set everything else is built
+    if model_registry is not None:
+        return app
+    with _create_lock:
+        if model_registry is not None:
+            return app
+        
+        # The ML stack (numpy, scipy, scikit-learn) is only imported here
+        from enhanced_categorizer_v2 import DEFAULT_MODEL_PATH
+        from enhanced_training_data import get_enhanced_training_data
+        from feedback import FeedbackStore, OnlineUpdater
+        from model_registry import ModelRegistry
+        
+        model_path = MODEL_PATH or DEFAULT_MODEL_PATH
+        training_data = get_enhanced_training_data()
+        registry = ModelRegistry(model_path, build_categorizer, training_data,
+                                 min_accuracy=RELOAD_MIN_ACCURACY, interval=MODEL_WATCH_INTERVAL)
+        ml_categorizer = build_categorizer(model_path, auto_train=TRAIN_ON_STARTUP)
+        ai_analyst = FinancialAnalystAI()
+        result_cache = TemplateCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        inference_timeout = INFERENCE_TIMEOUT
+        if MAX_INFERENCE_TIMEOUT is not None and inference_timeout > MAX_INFERENCE_TIMEOUT:
+            print(f"⚠️ FINSAATHI_INFERENCE_TIMEOUT={inference_timeout:g}s is not below the "
+                  f"{WORKER_TIMEOUT:g}s worker timeout - using {MAX_INFERENCE_TIMEOUT:g}s")
+            inference_timeout = MAX_INFERENCE_TIMEOUT
+        inference = InferenceExecutor(max_workers=INFERENCE_THREADS, max_queue=INFERENCE_QUEUE,
+                                      timeout=inference_timeout)
+        # Created before gunicorn forks (preload_app), so /metrics covers every worker
+        metrics = SharedMetrics(
+            routes=('categorize', 'sms', 'batch', 'stream'),
+            stages=('parse', 'ml', 'rules', 'response', 'total'),
+            methods=('ML_Model', 'AI_Analyst', 'AI_Analyst_Fallback'),
+            counters={'ml_skipped': "Categorizations settled by the rule engine without running the forest"}
+        )
+        feedback_store = FeedbackStore(FEEDBACK_PATH)
+        # Swapping in a relearned tier invalidates this worker's cached results
+        online_updater = OnlineUpdater(ml_categorizer, feedback_store, training_data,
+                                       interval=ONLINE_UPDATE_INTERVAL, on_swap=result_cache.clear)
+        
+        # Load the pre-built ML model; only train when explicitly asked to
+        print(f"🔄 Loading Enhanced ML Categorizer from {model_path}...")
+        if ml_categorizer.load_model():
+            print(f"✅ ML Model ready in {ml_categorizer.load_seconds * 1000:.1f} ms")
+        elif TRAIN_ON_STARTUP:
+            print("🔄 Training Enhanced ML Categorizer...")
+            ml_categorizer.train_model()
+            print("✅ ML Model training complete!")
+        else:
+            print(f"⚠️ No ML model loaded from {model_path} - serving with AI Analyst only "
+                  "(/api/health reports 'degraded'). Build one with 'python enhanced_categorizer_v2.py' "
+                  "or set FINSAATHI_TRAIN_ON_STARTUP=1", flush=True)
+        
+        if ONLINE_UPDATES and FAST_TIER_THRESHOLD is None:
+            print("⚠️ FINSAATHI_ONLINE_UPDATES is set without FINSAATHI_FAST_TIER_THRESHOLD - "
+                  "corrections are learned but the forest keeps answering")
+        
+        registry.adopt(ml_categorizer)
+        registry.on_swap = install_model
+        model_registry = registry
+        return app
 
-# Train the ML model on startup
-print("🔄 Training Enhanced ML Categorizer...")
-ml_categorizer.train_model()
-print("✅ ML Model training complete!")
+def install_model(categorizer):
+    """Serve a model the registry reloaded; requests started earlier keep the one they took"""
+    global ml_categorizer
+    ml_categorizer = categorizer
+    result_cache.clear()
+    online_updater.retarget(categorizer)
 
 def extract_sms_data(sms_text):
     """Enhanced SMS parsing with better pattern recognition"""
+    return parse_sms(sms_text).as_dict()
+
+def sms_cache_key(sms_data, categorizer=None):
+    """Everything hybrid_categorize depends on: SMS template, merchant and ML amount features
     
-    # Amount extraction patterns
-    amount_patterns = [
-        r'Rs\.?\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-        r'INR\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-        r'₹\s*(\d+(?:,\d+)*(?:\.\d{2})?)',
-        r'(\d+(?:,\d+)*(?:\.\d{2})?).*?(?:debited|credited|spent|paid)'
-    ]
-    
-    # Transaction type patterns
-    transaction_patterns = [
-        (r'debited|spent|paid|withdrawn|purchase', 'debit'),
-        (r'credited|received|deposited|refund|cashback', 'credit'),
-        (r'transfer|sent to|received from', 'transfer'),
-        (r'payment|bill payment|recharge', 'payment')
-    ]
-    
-    # Date extraction patterns
-    date_patterns = [
-        r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-        r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{2,4})',
-        r'on\s+(\d{1,2}[-/]\d{1,2}[-/]\d{2})'
-    ]
-    
-    # Extract amount
-    amount = None
-    for pattern in amount_patterns:
-        match = re.search(pattern, sms_text, re.IGNORECASE)
-        if match:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                amount = float(amount_str)
-                break
-            except ValueError:
-                continue
-    
-    # Extract transaction type
-    transaction_type = 'unknown'
-    for pattern, txn_type in transaction_patterns:
-        if re.search(pattern, sms_text, re.IGNORECASE):
-            transaction_type = txn_type
-            break
-    
-    # Extract date
-    date = None
-    for pattern in date_patterns:
-        match = re.search(pattern, sms_text, re.IGNORECASE)
-        if match:
-            date = match.group(1)
-            break
-    
-    # Extract merchant/description with enhanced patterns
-    merchant_patterns = [
-        # Standard preposition patterns
-        r'(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\s+ref|\s+upi|\.|$)',
-        r'(?:spent|paid|debited|credited).*?(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        
-        # Card and transaction patterns
-        r'card\s+(?:ending\s+)?\w+\s+at\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        r'transaction.*?(?:at|to|with)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        
-        # UPI and payment patterns
-        r'upi.*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        r'payment.*?(?:to|at|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        
-        # Purchase and order patterns
-        r'(?:purchase|order).*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)',
-        
-        # Direct merchant name patterns (no preposition)
-        r'([A-Z][A-Z\s&.\-\(\)0-9]{3,}?)(?:\s+on\s+\d|\s+for|\s+avl|\s+ref|\s+upi|\.|$)',
-        
-        # Subscription and service patterns  
-        r'(?:subscription|service|recharge).*?(?:for|at)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\.|$)',
-        
-        # Company and brand name patterns
-        r'\b([A-Z]{2,}(?:\s+[A-Z][A-Z\s&.\-\(\)0-9]*)*(?:\s+(?:PVT|LTD|INC|CORP|LLC|CO|SYSTEMS|SERVICES|TECHNOLOGIES|INDIA|PHARMACY|LABORATORY|HOSPITAL|CLINIC|STORE|MART|MALL))*)\b(?:\s+on|\s+for|\s+avl|\.|$)',
-        
-        # Generic patterns (fallback)
-        r'(?:^|\s)([A-Z]{2,}(?:\s+[A-Z]+)*)\s+(?:on\s+\d|\s+for|\s+avl|\s+ref)',
-        r'([A-Z][A-Z\s&.\-\(\)]{4,}?)(?:\s+(?:avl|available|balance|ref|reference))',
-    ]
+    When the model's features can depend on the SMS's numbers (a hashing vectorizer, or
+    a vocabulary with numeric terms: categorizer.template_keys is False) the key keeps
+    the raw text instead of its template.
+    """
+    if categorizer is None:
+        categorizer = ml_categorizer
+    text = sms_data['raw_text']
+    return (
+        sms_template(text) if categorizer.template_keys else text,
+        sms_data['merchant'],
+        tuple(categorizer.amount_features(sms_data['amount']))
+    )
+
+def hybrid_categorize(sms_data, parsed=None, ml_result=None, cache_key=None, timer=NULL_TIMER,
+                      ai_result=None, categorizer=None):
+    """Hybrid categorization: ML + AI Analyst for best results
     
-    merchant = None
-    for pattern in merchant_patterns:
-        match = re.search(pattern, sms_text)
-        if match:
-            candidate = match.group(1).strip()
-            if len(candidate) > 2 and not re.match(r'^\d+$', candidate):
-                merchant = candidate
-                break
+    parsed: the ParsedSMS sms_data came from, shared with the AI Analyst
+    ml_result: ML prediction already computed for this SMS by a batch call
+    cache_key: sms_cache_key(sms_data, categorizer) when the caller already missed the result cache
+    timer: RequestTimer that the ML and rule engine stages are added to
+    ai_result: AI Analyst result already computed for this SMS by a batch call
+    categorizer: ML model the caller's request is served by (default: the current one)
+    """
+    if categorizer is None:
+        categorizer = ml_categorizer
     
-    return {
-        'amount': amount,
-        'transaction_type': transaction_type,
-        'date': date,
-        'merchant': merchant,
-        'raw_text': sms_text
-    }
-
-def hybrid_categorize(sms_data):
-    """Hybrid categorization: ML + AI Analyst for best results"""
+    # Repeated SMS templates reuse the earlier decision
+    if cache_key is None:
+        cache_key = sms_cache_key(sms_data, categorizer)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
     
-    # Try ML categorization first
     try:
-        ml_result = ml_categorizer.categorize_expense(
-            sms_data['raw_text'], 
-            sms_data['merchant'], 
-            sms_data['amount']
-        )
-        ml_confidence = ml_result.get('confidence', 0.0)
-        
-        # Use AI Analyst for additional validation
-        ai_result = ai_analyst.categorize_transaction(sms_data['raw_text'])
+        # The rule engine is far cheaper than the forest, so it runs first
+        if ai_result is None:
+            with timer.stage('rules'):
+                ai_result = ai_analyst.categorize_transaction(sms_data['raw_text'], parsed)
         ai_confidence = ai_result.get('confidence_score', 0.0)
         
+        # Rules confident enough to settle the message: skip the forest
+        if ml_result is None and ai_confidence >= RULES_FIRST_THRESHOLD:
+            metrics.increment('ml_skipped')
+            final_result = {
+                'category': ai_result['category'],
+                'confidence': ai_confidence,
+                'method': 'AI_Analyst',
+                'merchant_detected': ai_result['merchant_name'],
+                'ml_category': None,
+                'ml_confidence': None
+            }
+            result_cache.put(cache_key, final_result)
+            return final_result
+        
+        # ML categorization for messages the rules do not settle
+        if ml_result is None:
+            with timer.stage('ml'):
+                ml_result = categorizer.categorize_expense(
+                    sms_data['raw_text'], 
+                    sms_data['merchant'], 
+                    sms_data['amount']
+                )
+        ml_confidence = ml_result.get('confidence', 0.0)
+        
         # Decision logic: Use higher confidence result
         if ai_confidence > ml_confidence:
             final_result = {
@@ -872,7 +263,8 @@ def hybrid_categorize(sms_data):
             
     except Exception as e:
         # Fallback to AI Analyst only
-        ai_result = ai_analyst.categorize_transaction(sms_data['raw_text'])
+        if ai_result is None:
+            ai_result = ai_analyst.categorize_transaction(sms_data['raw_text'], parsed)
         final_result = {
             'category': ai_result['category'],
             'confidence': ai_result.get('confidence_score', 0.0),
@@ -880,10 +272,198 @@ def hybrid_categorize(sms_data):
             'merchant_detected': ai_result['merchant_name'],
             'error': str(e)
         }
+        return final_result
     
+    # A result from a model swapped out mid-request must not outlive the cache clear
+    if categorizer is ml_categorizer:
+        result_cache.put(cache_key, final_result)
     return final_result
 
+def categorize_sms_list(sms_list, start_index=0, timer=NULL_TIMER, categorizer=None):
+    """Parse and categorize many SMS; one result dict per SMS, in input order
+    
+    start_index: index reported for sms_list[0] when it is one chunk of a longer stream
+    timer: RequestTimer that the batch's stage times and winning methods are added to
+    categorizer: ML model the whole batch is served by (default: the current one)
+    """
+    if categorizer is None:
+        categorizer = ml_categorizer
+    results = [None] * len(sms_list)
+    parsed_items = []
+    
+    with timer.stage('parse'):
+        for i, sms_text in enumerate(sms_list):
+            try:
+                if isinstance(sms_text, RejectedLine):
+                    raise ValueError(sms_text.reason)
+                if not isinstance(sms_text, str):
+                    raise TypeError('SMS text must be a string')
+                
+                # Extract SMS data
+                parsed = parse_sms(sms_text)
+                parsed_items.append((i, parsed, parsed.as_dict()))
+                
+            except Exception as e:
+                results[i] = {
+                    'index': start_index + i,
+                    'error': str(e),
+                    'sms_text': None if isinstance(sms_text, RejectedLine) else sms_text
+                }
+    
+    # Cached templates are answered directly; the rest share one vectorized ML call
+    pending = []
+    for i, parsed, sms_data in parsed_items:
+        cache_key = sms_cache_key(sms_data, categorizer)
+        category_result = result_cache.get(cache_key)
+        if category_result is None:
+            pending.append((i, parsed, sms_data, cache_key))
+        else:
+            timer.count_method(category_result['method'])
+            results[i] = {
+                'index': start_index + i,
+                'sms_data': sms_data,
+                'categorization': category_result
+            }
+    
+    # Rule engine first; only messages it does not settle go through the forest
+    ai_results = {}
+    with timer.stage('rules'):
+        for i, parsed, sms_data, _ in pending:
+            try:
+                ai_results[i] = ai_analyst.categorize_transaction(sms_data['raw_text'], parsed)
+            except Exception:
+                pass  # hybrid_categorize reports the error for this SMS
+    
+    unsettled = []
+    for item in pending:
+        ai_result = ai_results.get(item[0])
+        if ai_result is None or ai_result.get('confidence_score', 0.0) < RULES_FIRST_THRESHOLD:
+            unsettled.append(item)
+    with timer.stage('ml'):
+        ml_results = categorizer.categorize_batch([
+            (sms_data['raw_text'], sms_data['merchant'], sms_data['amount'])
+            for _, _, sms_data, _ in unsettled
+        ])
+    ml_by_index = {item[0]: ml_result for item, ml_result in zip(unsettled, ml_results)}
+    
+    for i, parsed, sms_data, cache_key in pending:
+        try:
+            # Hybrid categorization
+            category_result = hybrid_categorize(sms_data, parsed, ml_by_index.get(i), cache_key, timer,
+                                                ai_results.get(i), categorizer)
+            timer.count_method(category_result['method'])
+            
+            results[i] = {
+                'index': start_index + i,
+                'sms_data': sms_data,
+                'categorization': category_result
+            }
+            
+        except Exception as e:
+            results[i] = {
+                'index': start_index + i,
+                'error': str(e),
+                'sms_text': sms_list[i]
+            }
+    
+    return results
+
+def backpressure_response(error):
+    """429/503 response with Retry-After for work the inference executor refused"""
+    response = jsonify({'error': str(error), 'retry_after': error.retry_after})
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+# Streaming endpoint settings: SMS categorized per chunk, the largest chunk a client may ask
+# for, and the longest line read (longer lines are skipped and reported as errors)
+STREAM_CHUNK_SIZE = 500
+STREAM_MAX_CHUNK_SIZE = 5000
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+class RejectedLine:
+    """A stream line read_sms_lines could not turn into an SMS; reported with its reason"""
+    
+    __slots__ = ('reason',)
+    
+    def __init__(self, reason):
+        self.reason = reason
+
+def read_sms_lines(stream, json_lines, max_line_bytes=STREAM_MAX_LINE_BYTES):
+    """Yield one SMS per non-empty line of a request body, reading it incrementally
+    
+    json_lines: each line is a JSON string or {"sms_text": ...}; otherwise lines are raw SMS text.
+    Lines that are longer than max_line_bytes, not UTF-8 or (json_lines) hold no SMS are
+    yielded as a RejectedLine and reported as errors; an oversized line is never held in
+    memory whole.
+    """
+    while True:
+        raw_line = stream.readline(max_line_bytes + 1)
+        if not raw_line:
+            return
+        if len(raw_line) > max_line_bytes and not raw_line.endswith(b'\n'):
+            while raw_line and not raw_line.endswith(b'\n'):
+                raw_line = stream.readline(max_line_bytes)
+            yield RejectedLine(f'line exceeds {max_line_bytes} bytes')
+            continue
+        try:
+            line = raw_line.decode('utf-8').rstrip('\r\n')
+        except UnicodeDecodeError:
+            yield RejectedLine('line is not valid UTF-8')
+            continue
+        if not line.strip():
+            continue
+        if not json_lines:
+            yield line
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield RejectedLine('line is not valid JSON')
+            continue
+        if isinstance(value, dict):
+            value = value.get('sms_text')
+        if isinstance(value, str) and value:
+            yield value
+        else:
+            yield RejectedLine('line has no SMS text (a JSON string or {"sms_text": ...})')
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def ndjson_lines(results, omit_raw_text):
+    """Serialize categorize_sms_list results as NDJSON, optionally without the echoed SMS"""
+    lines = []
+    for result in results:
+        if omit_raw_text:
+            result.pop('sms_text', None)
+            if 'sms_data' in result:
+                result['sms_data'] = {k: v for k, v in result['sms_data'].items() if k != 'raw_text'}
+        lines.append(app.json.dumps(result))
+    return '\n'.join(lines) + '\n' if lines else ''
+
 # API Routes
+@app.before_request
+def start_background_threads():
+    global _threads_pid
+    # Every later request in this process returns here, without taking a lock
+    if _threads_pid == os.getpid():
+        return
+    # Servers given 'app_hybrid:app' instead of the factory build everything on the first request
+    create_app()
+    # Started on the first request so each gunicorn worker runs its own threads
+    model_registry.ensure_started()
+    if ONLINE_UPDATES:
+        online_updater.ensure_started()
+    _threads_pid = os.getpid()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -894,19 +474,62 @@ def home():
             "/api/categorize": "Basic transaction categorization",
             "/api/categorize/sms": "SMS transaction categorization",
             "/api/categorize/batch": "Batch SMS processing",
-            "/api/health": "Health check"
+            "/api/categorize/stream": "Streaming NDJSON SMS backfill",
+            "/api/feedback": "Submit a corrected category",
+            "/api/admin/reload-model": "Reload the ML model in this worker (X-Admin-Token)",
+            "/api/health": "Health check",
+            "/api/patterns/stats": "SMS pattern hit counters",
+            "/metrics": "Prometheus per-stage latency histograms"
         }
     })
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
+    # Without a model every request is answered by the rule engine alone
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if ml_categorizer.is_trained else "degraded",
         "timestamp": datetime.now().isoformat(),
-        "ml_model": "Ready",
-        "ai_analyst": "Ready"
+        "ml_model": "Ready" if ml_categorizer.is_trained else "Not loaded",
+        "ml_model_source": ml_categorizer.model_source,
+        "ml_model_load_seconds": ml_categorizer.load_seconds,
+        "ml_model_trained_at": ml_categorizer.training_info.get('trained_at'),
+        "ml_model_registry": model_registry.stats(),
+        "ml_vectorizer": ml_categorizer.vectorizer_mode,
+        "ml_feature_mode": ml_categorizer.feature_mode,
+        "ml_fast_tier": {
+            "available": ml_categorizer.fast_model is not None,
+            "threshold": ml_categorizer.fast_threshold
+        },
+        "ai_analyst": "Ready",
+        "result_cache": result_cache.stats(),
+        "rules_first": {
+            "threshold": RULES_FIRST_THRESHOLD,
+            "ml_skipped": metrics.value('ml_skipped')
+        },
+        "inference": inference.stats(),
+        "online_updates": dict(online_updater.stats(), enabled=ONLINE_UPDATES)
+    })
+
+@app.route('/api/patterns/stats', methods=['GET'])
+def pattern_stats():
+    """Per-pattern hit counts for the SMS and merchant regexes in this worker"""
+    return jsonify({
+        "worker_pid": os.getpid(),
+        "pattern_hits": SMS_PATTERNS.stats()
     })
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Per-route stage latency histograms and winning-method counts, for all workers,
+    and the ML model this worker serves"""
+    source = ml_categorizer.model_source if ml_categorizer.is_trained else 'none'
+    model_info = (
+        "# HELP finsaathi_ml_model_info ML model served by this worker (source 'none': rules only)\n"
+        "# TYPE finsaathi_ml_model_info gauge\n"
+        f'finsaathi_ml_model_info{{source="{source}",vectorizer="{ml_categorizer.vectorizer_mode}"}} 1\n'
+    )
+    return Response(metrics.render() + model_info, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/categorize', methods=['POST'])
 def categorize_expense():
     """Basic expense categorization endpoint"""
@@ -919,18 +542,36 @@ def categorize_expense():
         description = data.get('description', '')
         merchant = data.get('merchant', '')
         amount = data.get('amount', 0)
+        top_k = data.get('top_k', 3)
         
         if not description:
             return jsonify({'error': 'Description is required'}), 400
         
+        if not isinstance(top_k, int) or top_k < 1:
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        
         # Use ML categorizer for basic requests
-        result = ml_categorizer.categorize_expense(description, merchant, amount)
+        timer = metrics.timer('categorize')
+        categorizer = ml_categorizer
         
-        return jsonify({
-            'success': True,
-            'data': result,
-            'method': 'ML_Model'
-        })
+        def run_ml():
+            with timer.stage('ml'):
+                return categorizer.categorize_expense(description, merchant, amount, top_k=top_k)
+        
+        result = inference.run(run_ml)
+        timer.count_method('ML_Model')
+        
+        with timer.stage('response'):
+            response = jsonify({
+                'success': True,
+                'data': result,
+                'method': 'ML_Model'
+            })
+        timer.finish()
+        return response
+        
+    except InferenceRejected as e:
+        return backpressure_response(e)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -949,21 +590,30 @@ def categorize_sms_transaction():
         if not sms_text:
             return jsonify({'error': 'SMS text is required'}), 400
         
+        timer = metrics.timer('sms')
+        
         # Extract SMS data
-        sms_data = extract_sms_data(sms_text)
+        with timer.stage('parse'):
+            parsed = parse_sms(sms_text)
+            sms_data = parsed.as_dict()
         
         # Hybrid categorization
-        category_result = hybrid_categorize(sms_data)
+        category_result = inference.run(hybrid_categorize, sms_data, parsed, timer=timer)
+        timer.count_method(category_result['method'])
         
         # Combine results
-        result = {
-            'success': True,
-            'sms_data': sms_data,
-            'categorization': category_result,
-            'processed_at': datetime.now().isoformat()
-        }
-        
-        return jsonify(result)
+        with timer.stage('response'):
+            response = jsonify({
+                'success': True,
+                'sms_data': sms_data,
+                'categorization': category_result,
+                'processed_at': datetime.now().isoformat()
+            })
+        timer.finish()
+        return response
+        
+    except InferenceRejected as e:
+        return backpressure_response(e)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -982,37 +632,162 @@ def categorize_batch_sms():
         if not sms_list:
             return jsonify({'error': 'SMS list is required'}), 400
         
-        results = []
+        timer = metrics.timer('batch')
+        results = inference.run(categorize_sms_list, sms_list, timer=timer)
         
-        for i, sms_text in enumerate(sms_list):
+        with timer.stage('response'):
+            response = jsonify({
+                'success': True,
+                'processed_count': len(results),
+                'results': results,
+                'processed_at': datetime.now().isoformat()
+            })
+        timer.finish()
+        return response
+        
+    except InferenceRejected as e:
+        return backpressure_response(e)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/categorize/stream', methods=['POST'])
+def categorize_sms_stream():
+    """Categorize a newline-delimited SMS upload, streaming NDJSON results back
+    
+    Body: one SMS per line (text/plain) or NDJSON (application/x-ndjson) with a JSON
+    string or {"sms_text": ...} per line. Query: omit_raw_text=1 leaves the SMS text
+    out of every result, chunk_size sets how many SMS are categorized together.
+    Each output line is a batch result; the last line reports processed_count, or
+    an error with resume_from when the server sheds load mid-stream.
+    Backfills longer than gunicorn's timeout need FINSAATHI_SERVING_MODE=gthread.
+    """
+    try:
+        omit_raw_text = request.args.get('omit_raw_text', '').lower() in ('1', 'true', 'yes')
+        chunk_size = request.args.get('chunk_size', STREAM_CHUNK_SIZE, type=int)
+        
+        if not chunk_size or not 1 <= chunk_size <= STREAM_MAX_CHUNK_SIZE:
+            return jsonify({'error': f'chunk_size must be between 1 and {STREAM_MAX_CHUNK_SIZE}'}), 400
+        
+        json_lines = request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json')
+        chunks = chunked(read_sms_lines(request.stream, json_lines), chunk_size)
+        
+        # The first chunk runs before the response starts so overload still gets a 429/503
+        # Each chunk is timed as one observation of the stream route
+        # The whole upload is served by the model current when it started
+        categorizer = ml_categorizer
+        first_chunk = next(chunks, [])
+        first_timer = metrics.timer('stream')
+        first_results = inference.run(categorize_sms_list, first_chunk, timer=first_timer,
+                                      categorizer=categorizer) if first_chunk else []
+        
+        def generate():
+            processed = len(first_chunk)
+            with first_timer.stage('response'):
+                lines = ndjson_lines(first_results, omit_raw_text)
+            if first_chunk:
+                first_timer.finish()
+            yield lines
+            
+            for chunk in chunks:
+                timer = metrics.timer('stream')
+                try:
+                    results = inference.run(categorize_sms_list, chunk, processed, timer, categorizer)
+                except InferenceRejected as e:
+                    yield app.json.dumps({'error': str(e), 'retry_after': e.retry_after, 'resume_from': processed}) + '\n'
+                    return
+                processed += len(chunk)
+                with timer.stage('response'):
+                    lines = ndjson_lines(results, omit_raw_text)
+                timer.finish()
+                yield lines
+            
+            yield app.json.dumps({
+                'success': True,
+                'processed_count': processed,
+                'processed_at': datetime.now().isoformat()
+            }) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except InferenceRejected as e:
+        return backpressure_response(e)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/feedback', methods=['POST'])
+def submit_feedback():
+    """Store a user-corrected category for the online updater to learn from"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        category = data.get('category', '')
+        sms_text = data.get('sms_text', '')
+        
+        if category not in ml_categorizer.categories:
+            return jsonify({'error': f"category must be one of {ml_categorizer.categories}"}), 400
+        
+        if sms_text:
+            sms_data = extract_sms_data(sms_text)
+            description, merchant, amount = sms_data['raw_text'], sms_data['merchant'], sms_data['amount']
+        else:
+            description = data.get('description', '')
+            merchant = data.get('merchant', '')
+            amount = data.get('amount')
+        
+        if not description:
+            return jsonify({'error': 'SMS text or description is required'}), 400
+        
+        # A stored amount the categorizer cannot featurize would only be skipped by the updater
+        if amount is not None:
             try:
-                # Extract SMS data
-                sms_data = extract_sms_data(sms_text)
-                
-                # Hybrid categorization
-                category_result = hybrid_categorize(sms_data)
-                
-                result_item = {
-                    'index': i,
-                    'sms_data': sms_data,
-                    'categorization': category_result
-                }
-                
-                results.append(result_item)
-                
-            except Exception as e:
-                results.append({
-                    'index': i,
-                    'error': str(e),
-                    'sms_text': sms_text
-                })
+                amount = float(amount)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'amount must be a number'}), 400
+            if not math.isfinite(amount):
+                return jsonify({'error': 'amount must be a number'}), 400
+        
+        record = feedback_store.append({
+            'description': description,
+            'merchant': merchant,
+            'amount': amount,
+            'category': category,
+            'predicted_category': data.get('predicted_category')
+        })
         
         return jsonify({
             'success': True,
-            'processed_count': len(results),
-            'results': results,
-            'processed_at': datetime.now().isoformat()
-        })
+            'feedback': record,
+            'online_updates': ONLINE_UPDATES
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/reload-model', methods=['POST'])
+def reload_model():
+    """Load, validate and swap in the model at FINSAATHI_MODEL_PATH in this worker
+    
+    Other workers follow on their next watch interval, or on SIGHUP sent to each worker.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled; set FINSAATHI_ADMIN_TOKEN'}), 403
+    
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    
+    try:
+        status = model_registry.reload(force=True)
+        return jsonify({
+            'success': status['swapped'],
+            'worker_pid': os.getpid(),
+            'reload': status,
+            'generation': model_registry.generation
+        }), 200 if status['swapped'] else 422
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1025,10 +800,11 @@ def test_hybrid_system():
     
     try:
         # Extract SMS data
-        sms_data = extract_sms_data(test_sms)
+        parsed = parse_sms(test_sms)
+        sms_data = parsed.as_dict()
         
         # Hybrid categorization
-        category_result = hybrid_categorize(sms_data)
+        category_result = hybrid_categorize(sms_data, parsed)
         
         return jsonify({
             'test_sms': test_sms,
@@ -1044,4 +820,4 @@ if __name__ == '__main__':
     print("🚀 Starting FinSaathi Hybrid Expense Categorizer...")
     print("🔗 Available at: http://localhost:5000")
     print("📚 API Documentation: http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
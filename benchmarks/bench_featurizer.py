@@ -0,0 +1,120 @@
+"""
+Per-row cost of turning an SMS into the model's feature vector
+- create_enhanced_features: text cleaning and keyword/amount feature tokens
+- TfidfVectorizer.transform vs TfidfFeaturizer.transform (featurizer.py), one row per
+  call as in categorize_expense and as one batch as in categorize_batch
+- Every row is also checked for exact equality with vectorizer.transform (exit 1 on a mismatch)
+
+Usage: python benchmarks/bench_featurizer.py [--model models/enhanced_ml_categorizer_latest] [--messages 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sms_corpus import synthetic_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from featurizer import TfidfFeaturizer
+from sms_parser import parse_sms
+
+
+def load_categorizer(model_path, scratch):
+    """Categorizer loaded from model_path, or trained into scratch when there is none"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if model_path:
+            categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+            if not categorizer.load_model():
+                sys.exit(f"❌ No model could be loaded from {model_path}")
+        else:
+            categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(scratch, 'model.pkl'))
+            if not categorizer.train_model():
+                sys.exit("❌ Training failed")
+    if categorizer.vectorizer_mode != 'tfidf':
+        sys.exit("❌ The featurizer benchmark needs a TF-IDF model")
+    return categorizer
+
+
+def per_row_us(fn, rows, repeat):
+    """Median over repeat passes of the mean microseconds per fn(row) call"""
+    passes = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            fn(row)
+        passes.append((time.perf_counter() - started) * 1e6 / len(rows))
+    return round(statistics.median(passes), 2)
+
+
+def same_matrix(a, b):
+    return (a.shape == b.shape and np.array_equal(a.indptr, b.indptr)
+            and np.array_equal(a.indices, b.indices) and np.array_equal(a.data, b.data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="model pickle or artifact directory (default: train a fresh one)")
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        categorizer = load_categorizer(args.model, scratch)
+
+    items = []
+    for sms in synthetic_corpus(args.messages, args.seed):
+        sms_data = parse_sms(sms).as_dict()
+        items.append((sms_data['raw_text'], sms_data['merchant'], sms_data['amount']))
+    texts = [categorizer.create_enhanced_features(*item) for item in items]
+
+    vectorizer = categorizer.vectorizer
+    started = time.perf_counter()
+    featurizer = TfidfFeaturizer(vectorizer)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = sum(not same_matrix(vectorizer.transform([text]), featurizer.transform([text])) for text in texts)
+    mismatches += not same_matrix(vectorizer.transform(texts), featurizer.transform(texts))
+
+    print(f"🔄 Timing {len(texts)} rows ({args.repeat} passes)...")
+    results = {
+        'create_enhanced_features': per_row_us(lambda item: categorizer.create_enhanced_features(*item), items, args.repeat),
+        'vectorizer.transform (1 row)': per_row_us(lambda text: vectorizer.transform([text]), texts, args.repeat),
+        'featurizer.transform (1 row)': per_row_us(lambda text: featurizer.transform([text]), texts, args.repeat),
+        'vectorizer.transform (batch)': per_row_us(vectorizer.transform, [texts], args.repeat) / len(texts),
+        'featurizer.transform (batch)': per_row_us(featurizer.transform, [texts], args.repeat) / len(texts),
+        'categorize_expense': per_row_us(lambda item: categorizer.categorize_expense(*item), items, args.repeat)
+    }
+
+    print(f"\n📊 {len(texts)} synthetic SMS, vocabulary of {featurizer.n_features} terms "
+          f"(featurizer built in {build_ms:.1f} ms)")
+    print(f"  {'step':<34}{'us/row':>10}")
+    for name, us in results.items():
+        print(f"  {name:<34}{us:>10.2f}")
+    single = results['vectorizer.transform (1 row)'] / results['featurizer.transform (1 row)']
+    batch = results['vectorizer.transform (batch)'] / results['featurizer.transform (batch)']
+    print(f"  speedup: {single:.1f}x per row, {batch:.1f}x batched")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'us_per_row': results, 'mismatches': mismatches, 'build_ms': build_ms}, f, indent=2)
+
+    if mismatches:
+        sys.exit(f"❌ {mismatches} featurizer outputs differ from vectorizer.transform")
+    print("✅ Featurizer output identical to vectorizer.transform for every row")
+
+
+if __name__ == '__main__':
+    main()
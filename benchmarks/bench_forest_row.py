@@ -0,0 +1,120 @@
+"""
+Single-request forest latency: RandomForestClassifier.predict_proba vs FlatForest
+- Model step alone: one featurized SMS per call through sklearn's predict_proba and through
+  the FlatForest single-row engine (flat_forest.py), p50/p99 in microseconds
+- End to end: categorize_expense with the forest served by sklearn (FLAT_FOREST_MAX_ROWS = 0)
+  and by the FlatForest export (the default)
+- Every row's probabilities are checked for exact equality with sklearn (exit 1 on a mismatch)
+
+Usage: python benchmarks/bench_forest_row.py [--model enhanced_expense_model.pkl] [--requests 500]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from sms_corpus import synthetic_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import enhanced_categorizer_v2
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from flat_forest import FlatForest
+from sms_parser import parse_sms
+
+
+def load_categorizer(model_path, scratch):
+    """Categorizer with a sklearn forest: loaded from a model pickle, or trained into scratch"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if model_path:
+            categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+            if not categorizer.load_model():
+                sys.exit(f"❌ No model could be loaded from {model_path}")
+        else:
+            categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(scratch, 'model.pkl'))
+            if not categorizer.train_model():
+                sys.exit("❌ Training failed")
+    if not isinstance(categorizer.model, RandomForestClassifier):
+        sys.exit("❌ Needs a model pickle (an artifact is already served by FlatForest)")
+    return categorizer
+
+
+def latency(fn, inputs, repeat):
+    """p50/p99 microseconds of fn(input) over repeat passes"""
+    timings = []
+    for _ in range(repeat):
+        for value in inputs:
+            started = time.perf_counter()
+            fn(value)
+            timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        'p50_us': round(statistics.median(timings), 1),
+        'p99_us': round(timings[int(0.99 * (len(timings) - 1))], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="model pickle (default: train a fresh one)")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        categorizer = load_categorizer(args.model, scratch)
+
+    items = []
+    for sms in synthetic_corpus(args.requests, args.seed):
+        sms_data = parse_sms(sms).as_dict()
+        items.append((sms_data['raw_text'], sms_data['merchant'], sms_data['amount']))
+    rows = [categorizer.featurize([item]) for item in items]
+
+    forest = categorizer.model
+    started = time.perf_counter()
+    flat = FlatForest.from_sklearn(forest)
+    export_ms = (time.perf_counter() - started) * 1000
+
+    expected = forest.predict_proba(categorizer.featurize(items))
+    mismatches = sum(not np.array_equal(flat.predict_proba(X), expected[i:i + 1]) for i, X in enumerate(rows))
+
+    print(f"🔄 Timing {len(items)} single-row requests ({args.repeat} passes)...")
+    results = {
+        'sklearn predict_proba': latency(forest.predict_proba, rows, args.repeat),
+        'FlatForest predict_proba': latency(flat.predict_proba, rows, args.repeat)
+    }
+    for name, max_rows in (('categorize_expense (sklearn)', 0), ('categorize_expense (FlatForest)', 1)):
+        enhanced_categorizer_v2.FLAT_FOREST_MAX_ROWS = max_rows
+        results[name] = latency(lambda item: categorizer.categorize_expense(*item), items, args.repeat)
+
+    print(f"\n📊 {len(forest.estimators_)} trees, {len(flat.feature)} nodes, max depth {flat.max_depth} "
+          f"(exported in {export_ms:.1f} ms)")
+    print(f"  {'step':<34}{'p50 us':>10}{'p99 us':>10}")
+    for name, stats in results.items():
+        print(f"  {name:<34}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+    speedup = results['sklearn predict_proba']['p50_us'] / results['FlatForest predict_proba']['p50_us']
+    print(f"  model step speedup at p50: {speedup:.0f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'latency': results, 'mismatches': mismatches, 'export_ms': export_ms}, f, indent=2)
+
+    if mismatches:
+        sys.exit(f"❌ {mismatches} rows differ from RandomForestClassifier.predict_proba")
+    print("✅ FlatForest probabilities identical to predict_proba for every row")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark suite for the categorization hot paths, with a JSON baseline for regression checks
+- Single items: extract_sms_data, FinancialAnalystAI.extract_merchant_info,
+  special_merchant_rules, categorize_transaction, ImprovedExpenseCategorizer.categorize_expense
+  and end-to-end hybrid_categorize
+- Batches of 1/100/10k: categorize_batch (ML only) and categorize_sms_list (the
+  /api/categorize/batch path)
+- Runs on the synthetic corpus in sms_corpus.py with the template result cache off,
+  so every call does the full work
+- --save writes the timings as a baseline; --compare fails (exit 1) when any case is
+  slower than the baseline by more than --tolerance
+
+Usage: python benchmarks/bench_hot_paths.py --model models/enhanced_ml_categorizer_latest --save baseline.json
+       python benchmarks/bench_hot_paths.py --model models/enhanced_ml_categorizer_latest --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from sms_corpus import synthetic_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+BATCH_SIZES = (1, 100, 10000)
+
+
+def build_model(directory):
+    """Train a model into directory when no --model is given"""
+    from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+
+    artifact_path = os.path.join(directory, 'artifact')
+    categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(directory, 'model.pkl'))
+    if not categorizer.train_model():
+        sys.exit("❌ Training failed")
+    categorizer.save_artifact(artifact_path)
+    return artifact_path
+
+
+def load_app(model_path):
+    """Build app_hybrid configured for benchmarking: given model, no cache, no inference pool"""
+    os.environ['FINSAATHI_MODEL_PATH'] = model_path
+    os.environ['FINSAATHI_RESULT_CACHE_SIZE'] = '0'
+    os.environ['FINSAATHI_INFERENCE_THREADS'] = '0'
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app_hybrid
+        app_hybrid.create_app()
+    if not app_hybrid.ml_categorizer.is_trained:
+        sys.exit(f"❌ No model could be loaded from {model_path}")
+    return app_hybrid
+
+
+def measure(fn, calls, repeat):
+    """Seconds per call over repeat passes of calls (a list of argument tuples)"""
+    for args in calls[:10]:
+        fn(*args)  # warm up lazy state
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for args in calls:
+            fn(*args)
+        timings.append((time.perf_counter() - started) / len(calls))
+    return {
+        'calls': len(calls),
+        'best_us': round(min(timings) * 1e6, 2),
+        'median_us': round(statistics.median(timings) * 1e6, 2)
+    }
+
+
+def run_suite(app, messages, repeat, seed):
+    from sms_parser import parse_sms
+
+    analyst = app.ai_analyst
+    ml = app.ml_categorizer
+    sms_data = [app.extract_sms_data(sms) for sms in messages]
+    merchants = [analyst.extract_merchant_info(sms)[0] for sms in messages]
+
+    def end_to_end(sms):
+        # Parse + hybrid, passing the ParsedSMS along as the API routes do
+        parsed = parse_sms(sms)
+        return app.hybrid_categorize(parsed.as_dict(), parsed)
+
+    cases = {
+        'extract_sms_data': measure(app.extract_sms_data, [(sms,) for sms in messages], repeat),
+        'extract_merchant_info': measure(analyst.extract_merchant_info, [(sms,) for sms in messages], repeat),
+        'special_merchant_rules': measure(analyst.special_merchant_rules,
+                                          list(zip(merchants, messages)), repeat),
+        'categorize_transaction': measure(analyst.categorize_transaction, [(sms,) for sms in messages], repeat),
+        'categorize_expense': measure(
+            ml.categorize_expense,
+            [(data['raw_text'], data['merchant'], data['amount']) for data in sms_data], repeat),
+        'hybrid_categorize': measure(end_to_end, [(sms,) for sms in messages], repeat),
+    }
+
+    batch_corpus = synthetic_corpus(max(BATCH_SIZES), seed=seed)
+    for size in BATCH_SIZES:
+        # Enough batches per pass that small sizes are not lost in timer noise
+        n_batches = max(1, len(messages) // size)
+        batches = [batch_corpus[i * size:(i + 1) * size] for i in range(n_batches)]
+        batch_repeat = repeat if size < 10000 else max(1, repeat // 2)
+
+        items = [[(d['raw_text'], d['merchant'], d['amount']) for d in map(app.extract_sms_data, batch)]
+                 for batch in batches]
+        cases[f"categorize_batch[{size}]"] = measure(ml.categorize_batch, [(i,) for i in items], batch_repeat)
+        cases[f"categorize_sms_list[{size}]"] = measure(app.categorize_sms_list, [(b,) for b in batches],
+                                                         batch_repeat)
+        for name in (f"categorize_batch[{size}]", f"categorize_sms_list[{size}]"):
+            cases[name]['batch_size'] = size
+    return cases
+
+
+def environment(model_path):
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'model': os.path.basename(os.path.normpath(model_path))
+    }
+
+
+def compare(cases, baseline, tolerance):
+    """Cases whose median got slower than the baseline by more than tolerance"""
+    regressions = []
+    print(f"\n  {'case':<32}{'baseline us':>14}{'now us':>12}{'change':>10}")
+    for name, stats in cases.items():
+        before = baseline['cases'].get(name)
+        if before is None:
+            print(f"  {name:<32}{'-':>14}{stats['median_us']:>12.1f}{'new':>10}")
+            continue
+        change = stats['median_us'] / before['median_us'] - 1
+        flag = '  ❌' if change > tolerance else ''
+        print(f"  {name:<32}{before['median_us']:>14.1f}{stats['median_us']:>12.1f}{change:>+10.0%}{flag}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="model pickle or artifact directory (default: train a fresh one)")
+    parser.add_argument('--messages', type=int, default=2000, help="corpus size for the single-item cases")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--save', help="write the results as a baseline to this file")
+    parser.add_argument('--compare', help="baseline file to check the results against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown of a case's median before it counts as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.model:
+            model_path = os.path.abspath(args.model)
+        else:
+            print("🔄 Training a model for the benchmark...")
+            model_path = build_model(scratch)
+        app = load_app(model_path)
+
+        messages = synthetic_corpus(args.messages, args.seed)
+        print(f"🔄 Timing hot paths over {len(messages)} synthetic SMS ({args.repeat} passes)...")
+        cases = run_suite(app, messages, args.repeat, args.seed)
+
+    print(f"\n📊 {'case':<32}{'best us':>12}{'median us':>12}{'us/SMS':>10}")
+    for name, stats in cases.items():
+        per_sms = stats['median_us'] / stats.get('batch_size', 1)
+        print(f"  {name:<32}{stats['best_us']:>12.1f}{stats['median_us']:>12.1f}{per_sms:>10.1f}")
+
+    results = {'environment': environment(model_path), 'cases': cases}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != results['environment']:
+            print(f"⚠️ Baseline was recorded on {baseline.get('environment')}, "
+                  f"now running on {results['environment']}")
+        regressions = compare(cases, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No case slower than the baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Import-time benchmark: what `import <module>` costs in a fresh interpreter
+- Each module is imported with `python -X importtime` in its own subprocess (after one
+  warm-up run that writes the .pyc files); the cumulative time of the module is reported
+- Lists the heavy packages (numpy, scipy, sklearn, flask) the import pulled in and the
+  bytes it printed, so import-time side effects show up next to the timings
+- Top self-time imports per module with --top
+- --save writes a baseline; --compare fails (exit 1) when a module got slower by more
+  than --tolerance, or started printing or pulling in a heavy package
+
+Usage: python benchmarks/bench_import_time.py [--modules financial_analyst,app_hybrid] [--repeat 5]
+       python benchmarks/bench_import_time.py --save imports.json
+       python benchmarks/bench_import_time.py --compare imports.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = (
+    'sms_parser',
+    'financial_analyst',
+    'enhanced_training_data',
+    'enhanced_categorizer_v2',
+    'app_hybrid'
+)
+HEAVY_PACKAGES = ('numpy', 'scipy', 'sklearn', 'flask')
+
+
+def import_once(module):
+    """One fresh-interpreter import: (cumulative us, {imported module: self us}, stdout bytes)"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        sys.exit(f"❌ import {module} failed:\n{completed.stderr[-2000:]}")
+
+    # Nested imports are listed before the top-level import that triggered them;
+    # only the block ending in the module's own line belongs to it (not interpreter startup)
+    block = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, total, name = line[len('import time:'):].split('|')
+        block[name.strip()] = block.get(name.strip(), 0) + int(own)
+        if not name.startswith('  '):
+            if name.strip() == module:
+                return int(total), block, len(completed.stdout.encode())
+            block = {}
+    sys.exit(f"❌ No importtime entry for {module}")
+
+
+def measure(module, repeat):
+    import_once(module)  # warm-up: compile the .pyc files
+    runs = [import_once(module) for _ in range(repeat)]
+    timings = sorted(cumulative for cumulative, _, _ in runs)
+    _, self_us, stdout_bytes = runs[0]
+    return {
+        'best_ms': round(timings[0] / 1000, 2),
+        'median_ms': round(statistics.median(timings) / 1000, 2),
+        'stdout_bytes': stdout_bytes,
+        'heavy_packages': [name for name in HEAVY_PACKAGES if name in self_us],
+        'top_self_us': dict(sorted(self_us.items(), key=lambda item: -item[1])[:20])
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Modules that got slower by more than tolerance or gained import-time side effects"""
+    regressions = []
+    print(f"\n  {'module':<28}{'baseline ms':>13}{'now ms':>10}{'change':>10}")
+    for name, stats in results.items():
+        before = baseline['modules'].get(name)
+        if before is None:
+            print(f"  {name:<28}{'-':>13}{stats['median_ms']:>10.1f}{'new':>10}")
+            continue
+        change = stats['median_ms'] / before['median_ms'] - 1
+        gained = sorted(set(stats['heavy_packages']) - set(before['heavy_packages']))
+        prints = stats['stdout_bytes'] > 0 and before['stdout_bytes'] == 0
+        failed = change > tolerance or gained or prints
+        notes = ''.join([f"  +{', '.join(gained)}" if gained else '', '  prints' if prints else ''])
+        print(f"  {name:<28}{before['median_ms']:>13.1f}{stats['median_ms']:>10.1f}{change:>+10.0%}"
+              f"{'  ❌' if failed else ''}{notes}")
+        if failed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', default=','.join(MODULES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest imports (self time) per module")
+    parser.add_argument('--save', help="write the results as a baseline to this file")
+    parser.add_argument('--compare', help="baseline file to check the results against")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown of a module's median before it counts as a regression")
+    args = parser.parse_args()
+    modules = [m for m in args.modules.split(',') if m]
+
+    print(f"🔄 Importing {len(modules)} modules in fresh interpreters ({args.repeat} runs each)...")
+    results = {module: measure(module, args.repeat) for module in modules}
+
+    print(f"\n📊 {'module':<28}{'best ms':>10}{'median ms':>11}{'stdout':>8}  heavy packages")
+    for name, stats in results.items():
+        print(f"  {name:<28}{stats['best_ms']:>10.1f}{stats['median_ms']:>11.1f}{stats['stdout_bytes']:>8}"
+              f"  {', '.join(stats['heavy_packages']) or '-'}")
+        for imported, self_us in list(stats['top_self_us'].items())[:args.top]:
+            print(f"      {imported:<40}{self_us / 1000:>8.1f} ms")
+
+    output = {'environment': environment(), 'modules': results}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"\n✅ Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != output['environment']:
+            print(f"⚠️ Baseline was recorded on {baseline.get('environment')}, "
+                  f"now running on {output['environment']}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} module(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No module slower than the baseline by more than {args.tolerance:.0%} "
+              f"or with new import-time side effects")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Keyword features as text tokens (feature_mode 'text') vs a sparse block ('block')
+- Keyword step alone: extract_keyword_features per row vs KeywordFeatureBlock.transform
+  over the whole batch
+- Batch featurization: items to model input matrix (cleaning, keyword features, vectorizer)
+  with a model trained in each mode
+- Training: train_model wall time and its validation / cross-validation accuracy per mode
+- The block's values are checked against the tokens text mode writes (exit 1 on a mismatch)
+
+Usage: python benchmarks/bench_keyword_features.py [--messages 20000] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from sms_corpus import synthetic_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from enhanced_categorizer_v2 import CATEGORY_KEYWORDS, FEATURE_MODES, ImprovedExpenseCategorizer
+from keyword_features import MAX_KEYWORD_COUNT
+from sms_parser import parse_sms
+
+
+def train(feature_mode, scratch):
+    categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(scratch, f"{feature_mode}.pkl"),
+                                             feature_mode=feature_mode)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not categorizer.train_model():
+            sys.exit(f"❌ Training failed in feature mode {feature_mode}")
+    return categorizer, time.perf_counter() - started
+
+
+def best_seconds(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def expected_block(categorizer, item):
+    """Block values implied by the tokens create_enhanced_features writes for item"""
+    tokens = set(categorizer.create_enhanced_features(*item).split())
+    columns = set(categorizer.keyword_block.columns)
+    expected = {}
+    for category in CATEGORY_KEYWORDS:
+        for count in range(1, MAX_KEYWORD_COUNT + 1):
+            if f"category_{category}_count_{count}" in tokens:
+                expected[f"category_{category}_count"] = count / MAX_KEYWORD_COUNT
+    expected.update({token: 1.0 for token in tokens if token in columns})
+    return expected
+
+
+def block_mismatches(categorizer, items):
+    _, block = categorizer.feature_inputs(items)
+    columns = categorizer.keyword_block.columns
+    mismatches = 0
+    for row, item in enumerate(items):
+        values = block[row]
+        actual = {columns[column]: value for column, value in zip(values.indices, values.data)}
+        mismatches += actual != expected_block(categorizer, item)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    items = []
+    for sms in synthetic_corpus(args.messages, args.seed):
+        sms_data = parse_sms(sms).as_dict()
+        items.append((sms_data['raw_text'], sms_data['merchant'], sms_data['amount']))
+
+    print("🔄 Training one model per feature mode...")
+    with tempfile.TemporaryDirectory() as scratch:
+        models = {mode: train(mode, scratch) for mode in FEATURE_MODES}
+    text_model, block_model = models['text'][0], models['block'][0]
+
+    mismatches = block_mismatches(block_model, items)
+
+    print(f"🔄 Timing {len(items)} synthetic SMS (best of {args.repeat})...")
+
+    def keyword_tokens():
+        for description, merchant, amount in items:
+            desc_clean = text_model.clean_text(description)
+            merchant_clean = text_model.clean_text(merchant) if merchant else ""
+            text_model.extract_keyword_features(f"{desc_clean} {merchant_clean}".strip(), merchant_clean, amount)
+
+    texts, _ = block_model.feature_inputs(items)
+    merchants = [block_model.clean_text(merchant) if merchant else "" for _, merchant, _ in items]
+    amounts = [amount for _, _, amount in items]
+
+    n = len(items)
+    steps = {
+        'keyword features': {
+            'text': best_seconds(keyword_tokens, args.repeat),
+            'block': best_seconds(lambda: block_model.keyword_block.transform(texts, merchants, amounts), args.repeat)
+        },
+        'featurize batch': {
+            mode: best_seconds(lambda: model.featurize(items), args.repeat)
+            for mode, (model, _) in models.items()
+        }
+    }
+
+    print(f"\n📊 {'step':<22}{'text us/row':>13}{'block us/row':>14}{'speedup':>9}")
+    for name, timings in steps.items():
+        print(f"  {name:<22}{timings['text'] * 1e6 / n:>13.2f}{timings['block'] * 1e6 / n:>14.2f}"
+              f"{timings['text'] / timings['block']:>8.1f}x")
+
+    print(f"\n  {'training':<22}{'seconds':>9}{'validation':>12}{'cv accuracy':>13}{'fast tier':>11}")
+    training = {}
+    for mode, (model, seconds) in models.items():
+        info = model.training_info
+        training[mode] = {'seconds': seconds, **{key: info[key] for key in
+                          ('validation_accuracy', 'cv_accuracy', 'fast_validation_accuracy')}}
+        print(f"  {mode:<22}{seconds:>9.2f}{info['validation_accuracy']:>12.3f}{info['cv_accuracy']:>13.3f}"
+              f"{info['fast_validation_accuracy']:>11.3f}")
+
+    if args.json:
+        results = {
+            'messages': n,
+            'us_per_row': {name: {mode: t * 1e6 / n for mode, t in timings.items()} for name, timings in steps.items()},
+            'training': training,
+            'mismatches': mismatches
+        }
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if mismatches:
+        sys.exit(f"❌ {mismatches} block rows differ from the text-mode keyword tokens")
+    print("\n✅ Keyword block matches the text-mode tokens for every row")
+
+
+if __name__ == '__main__':
+    main()
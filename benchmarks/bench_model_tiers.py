@@ -0,0 +1,158 @@
+"""
+Accuracy and latency of the linear fast tier vs the random forest
+- Accuracy: stratified 5-fold cross-validation over ENHANCED_TRAINING_DATA for the
+  forest alone, the linear tier alone and the tiered setup at each escalation threshold
+  (share of rows escalated to the forest reported alongside)
+- Latency: per-request categorize_expense on synthetic SMS, with the model served
+  from an artifact as in production, and the model step alone (TF-IDF transform excluded)
+- Pick FINSAATHI_FAST_TIER_THRESHOLD per deployment from the two tables
+
+Usage: python benchmarks/bench_model_tiers.py [--thresholds 0.3,0.5,0.7,0.9] [--requests 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+from sms_corpus import synthetic_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+    from enhanced_training_data import get_enhanced_training_data
+from linear_tier import LinearTier, build_linear_model
+from sms_parser import parse_sms
+
+
+def cross_validate(thresholds, folds, seed):
+    """Accuracy per tier setup, plus the escalated share for the tiered setups"""
+    categorizer = ImprovedExpenseCategorizer(model_path=os.devnull, auto_train=False)
+    data = get_enhanced_training_data()
+    texts = [
+        categorizer.create_enhanced_features(item.get('description', ''), item.get('merchant', ''), item.get('amount'))
+        for item in data
+    ]
+    labels = np.array([item['category'] for item in data])
+
+    correct = {'forest': 0, 'linear': 0}
+    correct.update({threshold: 0 for threshold in thresholds})
+    escalated = {threshold: 0 for threshold in thresholds}
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for train_index, test_index in splitter.split(texts, labels):
+        vectorizer = clone(categorizer.vectorizer)
+        X_train = vectorizer.fit_transform([texts[i] for i in train_index])
+        X_test = vectorizer.transform([texts[i] for i in test_index])
+        y_train, y_test = labels[train_index], labels[test_index]
+
+        forest = categorizer.build_forest().fit(X_train, y_train)
+        linear = LinearTier.from_sklearn(build_linear_model().fit(X_train, y_train))
+        forest_proba = forest.predict_proba(X_test)
+        linear_proba = linear.predict_proba(X_test)
+
+        correct['forest'] += int((forest.classes_[forest_proba.argmax(axis=1)] == y_test).sum())
+        correct['linear'] += int((linear.classes_[linear_proba.argmax(axis=1)] == y_test).sum())
+        for threshold in thresholds:
+            escalate = linear_proba.max(axis=1) < threshold
+            tiered = np.where(escalate[:, None], forest_proba, linear_proba)
+            correct[threshold] += int((linear.classes_[tiered.argmax(axis=1)] == y_test).sum())
+            escalated[threshold] += int(escalate.sum())
+
+    n = len(labels)
+    return {
+        'samples': n,
+        'accuracy': {str(name): count / n for name, count in correct.items()},
+        'escalated': {str(threshold): count / n for threshold, count in escalated.items()}
+    }
+
+
+def request_latency(artifact_path, fast_threshold, items, repeat):
+    """Per-request timings in microseconds, end to end and for the model step alone,
+    and the share of requests served by the fast tier"""
+    categorizer = ImprovedExpenseCategorizer(model_path=artifact_path, auto_train=False,
+                                             fast_threshold=fast_threshold)
+    with contextlib.redirect_stdout(io.StringIO()):
+        categorizer.load_model()
+
+    fast = sum(categorizer.categorize_expense(*item)['model_type'] == 'linear_fast' for item in items)
+    rows = [categorizer.featurize([item]) for item in items]
+    timings = []
+    model_timings = []
+    for _ in range(repeat):
+        for item, X in zip(items, rows):
+            started = time.perf_counter()
+            categorizer.categorize_expense(*item)
+            timings.append((time.perf_counter() - started) * 1e6)
+            started = time.perf_counter()
+            categorizer.predict_proba(X)
+            model_timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        'fast_share': fast / len(items),
+        'p50_us': round(statistics.median(timings), 1),
+        'p99_us': round(timings[int(0.99 * (len(timings) - 1))], 1),
+        'model_p50_us': round(statistics.median(model_timings), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--thresholds', default='0.3,0.5,0.7,0.9')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+    thresholds = [float(t) for t in args.thresholds.split(',')]
+
+    print(f"🔄 {args.folds}-fold cross-validation...")
+    accuracy = cross_validate(thresholds, args.folds, args.seed)
+
+    items = []
+    for sms in synthetic_corpus(args.requests):
+        sms_data = parse_sms(sms).as_dict()
+        items.append((sms_data['raw_text'], sms_data['merchant'], sms_data['amount']))
+
+    print(f"🔄 Timing {len(items)} requests per tier...")
+    with tempfile.TemporaryDirectory() as scratch:
+        categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(scratch, 'model.pkl'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not categorizer.train_model():
+                sys.exit("❌ Training failed")
+            categorizer.save_artifact(os.path.join(scratch, 'artifact'))
+        artifact_path = os.path.join(scratch, 'artifact')
+
+        setups = [('forest', None), ('linear', 0.0)] + [(f"tiered@{t}", t) for t in thresholds]
+        latency = {name: request_latency(artifact_path, threshold, items, args.repeat)
+                   for name, threshold in setups}
+
+    print(f"\n📊 {accuracy['samples']} training samples, {len(items)} synthetic requests")
+    print(f"  {'setup':<14}{'cv accuracy':>12}{'escalated':>11}{'fast share':>12}{'p50 us':>10}{'p99 us':>10}{'model us':>10}")
+    for name, threshold in setups:
+        key = 'forest' if name == 'forest' else 'linear' if name == 'linear' else str(threshold)
+        escalated = accuracy['escalated'].get(key)
+        print(f"  {name:<14}{accuracy['accuracy'][key]:>12.3f}"
+              f"{f'{escalated:.0%}' if escalated is not None else '-':>11}"
+              f"{latency[name]['fast_share']:>12.0%}{latency[name]['p50_us']:>10.1f}{latency[name]['p99_us']:>10.1f}"
+              f"{latency[name]['model_p50_us']:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'accuracy': accuracy, 'latency': latency}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
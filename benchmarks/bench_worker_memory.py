@@ -0,0 +1,153 @@
+"""
+Per-worker memory of the preloaded gunicorn app, before and after sharing the model
+- before: pickled model, cyclic GC left on in workers (FINSAATHI_GC_FREEZE=0)
+- after: memory-mapped artifact served by FlatForest, GC frozen before fork
+- Reports RSS, PSS and USS (private pages) for every worker from /proc/<pid>/smaps_rollup
+  after warming each server with real categorization traffic (Linux only)
+
+Usage: python benchmarks/bench_worker_memory.py [--workers 4] [--requests 400]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gunicorn_harness import REPO_ROOT, gunicorn_server, post_json
+
+sys.path.insert(0, REPO_ROOT)
+
+SAMPLE_SMS = [
+    "A/c *5678 debited Rs. 970.00 on 10-05-25 to UMA CLINICAL LABORATORY. UPI:882918376710",
+    "Rs.1250.00 debited from A/c XX1234 on 15-Oct-25 to MYNTRA FASHION STORE for online purchase",
+    "Payment of Rs.45.50 made to INDIAN OIL PETROL PUMP on 15-Oct-25 via UPI",
+    "Account debited Rs.285.50 on 15-Oct-25 at STARBUCKS COFFEE STORE for Card ending 1234",
+    "A/c debited Rs.471.00 on 23-05-25 to EASTERN POWER DISTRIBUTION COMPANY LIMITED OF ANDHRA PRADESH",
+    "INR 2,500.00 spent on card ending 4321 at CROMA on 03/11/2025. Avl bal INR 10,000.00",
+    "₹ 99 paid to RAHUL SHARMA via UPI on 7 May 2025",
+    "UPI to UBER INDIA Rs.150",
+]
+
+
+def build_models(directory):
+    """Train once and write both the pickle and the artifact directory"""
+    from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+
+    pickle_path = os.path.join(directory, 'model.pkl')
+    artifact_path = os.path.join(directory, 'artifact')
+    categorizer = ImprovedExpenseCategorizer(model_path=pickle_path)
+    if not categorizer.train_model():
+        sys.exit("❌ Training failed")
+    categorizer.save_artifact(artifact_path)
+    return pickle_path, artifact_path
+
+
+def memory_of(pid):
+    """RSS, PSS and USS of one process in KiB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'uss_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def children_of(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; ppid follows the closing parenthesis
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def run_scenario(name, model_path, gc_freeze, args):
+    env = {
+        'FINSAATHI_MODEL_PATH': model_path,
+        'FINSAATHI_GC_FREEZE': '1' if gc_freeze else '0'
+    }
+    with gunicorn_server(args.port, env, workers=args.workers) as (base_url, process):
+        # Enough concurrency that every sync worker serves its share
+        with ThreadPoolExecutor(max_workers=args.workers * 2) as pool:
+            list(pool.map(
+                lambda i: post_json(f"{base_url}/api/categorize/sms",
+                                    {'sms_text': SAMPLE_SMS[i % len(SAMPLE_SMS)]}),
+                range(args.requests)
+            ))
+        time.sleep(1)
+
+        workers = [memory_of(pid) for pid in children_of(process.pid)]
+        master = memory_of(process.pid)
+
+    return {
+        'scenario': name,
+        'master': master,
+        'workers': workers,
+        'worker_uss_kb_mean': sum(w['uss_kb'] for w in workers) / max(len(workers), 1),
+        'worker_pss_kb_mean': sum(w['pss_kb'] for w in workers) / max(len(workers), 1),
+        'total_pss_kb': master['pss_kb'] + sum(w['pss_kb'] for w in workers)
+    }
+
+
+def print_scenario(result):
+    print(f"\n📊 {result['scenario']}")
+    print(f"  {'process':<10}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}")
+    rows = [('master', result['master'])] + [(f"worker {i}", w) for i, w in enumerate(result['workers'], 1)]
+    for label, mem in rows:
+        print(f"  {label:<10}{mem['rss_kb'] / 1024:>10.1f}{mem['pss_kb'] / 1024:>10.1f}{mem['uss_kb'] / 1024:>10.1f}")
+    print(f"  mean worker USS {result['worker_uss_kb_mean'] / 1024:.1f} MiB, "
+          f"total PSS {result['total_pss_kb'] / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--pickle', help="pickled model (default: train a fresh one)")
+    parser.add_argument('--artifact', help="artifact directory (default: train a fresh one)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.pickle and args.artifact:
+            pickle_path, artifact_path = args.pickle, args.artifact
+        else:
+            print("🔄 Training a model for the benchmark...")
+            pickle_path, artifact_path = build_models(scratch)
+
+        results = [
+            run_scenario('before: pickle, GC unfrozen', os.path.abspath(pickle_path), False, args),
+            run_scenario('after: mmapped artifact, GC frozen', os.path.abspath(artifact_path), True, args),
+        ]
+
+    for result in results:
+        print_scenario(result)
+
+    before, after = results
+    print(f"\n✅ Mean worker USS {before['worker_uss_kb_mean'] / 1024:.1f} -> "
+          f"{after['worker_uss_kb_mean'] / 1024:.1f} MiB, total PSS "
+          f"{before['total_pss_kb'] / 1024:.1f} -> {after['total_pss_kb'] / 1024:.1f} MiB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
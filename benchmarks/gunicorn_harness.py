@@ -0,0 +1,58 @@
+"""
+Helpers for benchmarks that run the app under a real gunicorn server
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def post_json(url, payload, timeout=30):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+def wait_ready(base_url, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+@contextmanager
+def gunicorn_server(port, env_overrides, workers=4, extra_args=()):
+    """Run app_hybrid's app factory with gunicorn_config.py; yields (base_url, process)"""
+    env = dict(os.environ)
+    env['FINSAATHI_TRAIN_ON_STARTUP'] = '0'
+    env.update(env_overrides)
+
+    base_url = f"http://127.0.0.1:{port}"
+    command = [
+        sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+        '--bind', f"127.0.0.1:{port}", '--workers', str(workers),
+        '--max-requests', '0', *extra_args, 'app_hybrid:create_app()'
+    ]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url, process)
+        yield base_url, process
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
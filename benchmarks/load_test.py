@@ -0,0 +1,174 @@
+"""
+Load test: sync vs gthread serving under many concurrent clients
+- Starts gunicorn once per serving mode and runs closed-loop clients against it
+  (each client sends its next request as soon as the previous one returns)
+- Traffic is mostly single-SMS requests with a share of 100-SMS batches, the case
+  where one slow request used to hold a whole sync worker
+- Reports p50/p90/p99 latency, throughput and status codes (incl. 429/503 shed load)
+
+Usage: python benchmarks/load_test.py --model models/enhanced_ml_categorizer_latest
+                                      [--clients 200] [--duration 30] [--modes sync,gthread]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from gunicorn_harness import REPO_ROOT, gunicorn_server
+
+sys.path.insert(0, REPO_ROOT)
+
+MERCHANTS = [
+    'UMA CLINICAL LABORATORY', 'MYNTRA FASHION STORE', 'INDIAN OIL PETROL PUMP',
+    'STARBUCKS COFFEE STORE', 'APOLLO PHARMACY', 'BIG BAZAAR', 'UBER INDIA',
+    'NETFLIX', 'AIRTEL PREPAID', 'CROMA', 'ZOMATO', 'RAHUL SHARMA'
+]
+
+
+def synthetic_sms(rnd):
+    return (f"A/c *{rnd.randint(1000, 9999)} debited Rs.{rnd.uniform(10, 20000):.2f} "
+            f"on {rnd.randint(10, 28)}-0{rnd.randint(1, 9)}-25 to {rnd.choice(MERCHANTS)}. "
+            f"UPI:{rnd.randint(10 ** 11, 10 ** 12 - 1)}")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def client_loop(port, deadline, seed, batch_share, batch_size, records):
+    rnd = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'Content-Type': 'application/json'}
+
+    while time.time() < deadline:
+        if rnd.random() < batch_share:
+            kind, path = 'batch', '/api/categorize/batch'
+            body = {'sms_list': [synthetic_sms(rnd) for _ in range(batch_size)]}
+        else:
+            kind, path = 'sms', '/api/categorize/sms'
+            body = {'sms_text': synthetic_sms(rnd)}
+
+        started = time.perf_counter()
+        try:
+            connection.request('POST', path, json.dumps(body), headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            retry_after = response.getheader('Retry-After')
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            status, retry_after = 'error', None
+        records.append((kind, status, time.perf_counter() - started))
+
+        # Honour backpressure instead of hammering an overloaded server
+        if retry_after:
+            time.sleep(min(float(retry_after), max(deadline - time.time(), 0)))
+
+
+def client_process(port, deadline, seed, n_clients, batch_share, batch_size, queue):
+    records = []
+    threads = [
+        threading.Thread(target=client_loop,
+                         args=(port, deadline, seed * 1000 + i, batch_share, batch_size, records))
+        for i in range(n_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(records)
+
+
+def run_load(port, args):
+    """Spread the clients over several processes so the load generator is not GIL-bound"""
+    deadline = time.time() + args.duration
+    queue = multiprocessing.Queue()
+    per_process = [args.clients // args.client_processes] * args.client_processes
+    for i in range(args.clients % args.client_processes):
+        per_process[i] += 1
+
+    processes = [
+        multiprocessing.Process(target=client_process,
+                                args=(port, deadline, seed, n, args.batch_share, args.batch_size, queue))
+        for seed, n in enumerate(per_process)
+    ]
+    for process in processes:
+        process.start()
+    records = []
+    for _ in processes:
+        records.extend(queue.get())
+    for process in processes:
+        process.join()
+    return records
+
+
+def summarize(mode, records, duration):
+    summary = {'mode': mode, 'kinds': {}}
+    by_kind = defaultdict(list)
+    for kind, status, seconds in records:
+        by_kind[kind].append((status, seconds))
+
+    for kind, items in sorted(by_kind.items()):
+        ok = sorted(seconds for status, seconds in items if status == 200)
+        summary['kinds'][kind] = {
+            'requests': len(items),
+            'ok_per_second': round(len(ok) / duration, 1),
+            'status': dict(Counter(str(status) for status, _ in items)),
+            'p50_ms': round(percentile(ok, 0.50) * 1000, 1) if ok else None,
+            'p90_ms': round(percentile(ok, 0.90) * 1000, 1) if ok else None,
+            'p99_ms': round(percentile(ok, 0.99) * 1000, 1) if ok else None
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help="model pickle or artifact directory")
+    parser.add_argument('--modes', default='sync,gthread')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--client-processes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-share', type=float, default=0.02)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--cache', action='store_true', help="keep the template result cache on")
+    parser.add_argument('--port', type=int, default=5078)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    summaries = []
+    for mode in args.modes.split(','):
+        env = {
+            'FINSAATHI_MODEL_PATH': args.model,
+            'FINSAATHI_SERVING_MODE': mode,
+            'FINSAATHI_RESULT_CACHE_SIZE': '10000' if args.cache else '0'
+        }
+        print(f"🔄 {mode}: {args.clients} clients for {args.duration:.0f}s...")
+        with gunicorn_server(args.port, env, workers=args.workers):
+            records = run_load(args.port, args)
+        summaries.append(summarize(mode, records, args.duration))
+
+    print(f"\n📊 {args.clients} concurrent clients, {args.workers} workers, "
+          f"{args.batch_share:.0%} batches of {args.batch_size}")
+    print(f"  {'mode':<9}{'request':<8}{'ok/s':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}  status")
+    for summary in summaries:
+        for kind, stats in summary['kinds'].items():
+            print(f"  {summary['mode']:<9}{kind:<8}{stats['ok_per_second']:>8}"
+                  f"{stats['p50_ms'] or '-':>10}{stats['p90_ms'] or '-':>10}{stats['p99_ms'] or '-':>10}  {stats['status']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
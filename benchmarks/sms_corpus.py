@@ -0,0 +1,78 @@
+"""
+Synthetic bank SMS corpus for the benchmarks
+- Starts from the SMS used in test_sms_parser.py / test_production_api.py and adds
+  the same formats (UPI, card, NEFT credit, refund, bill, premium, ATM) with random
+  accounts, amounts, dates, references and merchants
+- Deterministic for a given seed, so runs compared against a baseline time the same work
+"""
+
+import random
+
+REPO_SAMPLES = [
+    "A/c *5678 debited Rs. 970.00 on 10-05-25 to UMA CLINICAL LABORATORY. UPI:882918376710",
+    "Rs.1250.00 debited from A/c XX1234 on 15-Oct-25 to MYNTRA FASHION STORE for online purchase",
+    "Payment of Rs.45.50 made to INDIAN OIL PETROL PUMP on 15-Oct-25 via UPI",
+    "Account debited Rs.285.50 on 15-Oct-25 at STARBUCKS COFFEE STORE for Card ending 1234",
+    "A/c debited Rs.471.00 on 23-05-25 to EASTERN POWER DISTRIBUTION COMPANY LIMITED OF ANDHRA PRADESH",
+    "A/c *5678 debited Rs. 970.00 on 10-05-25 to UMA CLINICAL LABORATORY. Avl bal Rs.45,230.00",
+    "A/c debited Rs.500 to APOLLO PHARMACY",
+    "Payment Rs.1200 to AMAZON INDIA",
+    "UPI to UBER INDIA Rs.150",
+    "Refund of Rs.120 received from AMAZON on 12 Dec 25",
+]
+
+MERCHANTS = [
+    'ZOMATO', 'SWIGGY', 'BIG BAZAAR', 'DMART', 'IRCTC', 'NETFLIX', 'SPOTIFY', 'PVR CINEMAS',
+    'BYJUS', 'HDFC ERGO', 'STAR HEALTH', 'FASTAG NHAI', 'AIRTEL', 'JIO', 'TATA SKY', 'BWSSB',
+    'MAHANAGAR GAS', 'RAHUL SHARMA', 'Priya Patel', 'AMAZON', 'FLIPKART', 'UBER', 'OLA CABS',
+    'MAKEMYTRIP', 'INDIGO', 'OYO ROOMS', 'APOLLO HOSPITAL', 'MEDPLUS', 'CROMA', 'RELIANCE DIGITAL',
+    'DOMINOS PIZZA', 'CAFE COFFEE DAY', 'ZERODHA', 'GROWW', 'BILLDESK', 'DELHI UNIVERSITY',
+    'UNKNOWN TRADERS', 'SHELL', 'BPCL FUEL', 'SBI LIFE', 'NYKAA', 'BOOKMYSHOW', 'IKEA',
+    'REDBUS', 'LOCAL STORE', 'CULT FIT', 'ELECTRICITY BOARD', 'UMA CLINICAL LABORATORY'
+]
+
+TEMPLATES = [
+    "A/c *{acct} debited Rs. {amount} on {date} to {merchant}. UPI:{ref}",
+    "Rs.{amount} debited from A/c XX{acct} on {day_month} to {merchant} for online purchase",
+    "Payment of Rs.{amount} made to {merchant} on {day_month} via UPI",
+    "Account debited Rs.{amount} on {day_month} at {merchant} for Card ending {acct}",
+    "INR {amount} spent on card ending {acct} at {merchant} on {date}. Avl bal INR {balance}",
+    "₹{amount} paid to {merchant} via UPI on {date}. Ref {ref}",
+    "Your a/c {acct} is credited with Rs {amount} on {date} from {merchant}. Ref no {ref}",
+    "Dear Customer, Rs.{amount} has been debited from your account for {merchant} premium payment on {date}",
+    "Sent Rs.{amount} from Kotak Bank AC X{acct} to {merchant} on {date}.UPI Ref {ref}",
+    "Recharge of Rs.{amount} for {merchant} successful on {date}",
+    "Bill payment of INR {amount} to {merchant} done. Txn {ref}",
+    "Refund of Rs.{amount} received from {merchant} on {long_date}",
+    "Your subscription to {merchant} has been auto-renewed for Rs.{amount} on {date}",
+    "Txn of Rs.{amount} on HDFC Card {acct} at {merchant} on {date}\nAvl lmt Rs {balance}",
+    "UPI to {merchant} Rs.{amount}",
+]
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def random_amount(rnd):
+    return rnd.choice([
+        f"{rnd.randint(1, 99999)}",
+        f"{rnd.randint(1, 9999)}.{rnd.randint(0, 99):02d}",
+        f"{rnd.randint(1, 99)},{rnd.randint(100, 999)}.00",
+    ])
+
+
+def synthetic_corpus(count, seed=7):
+    """count SMS: the repo samples first, then generated ones"""
+    rnd = random.Random(seed)
+    messages = REPO_SAMPLES[:count]
+    while len(messages) < count:
+        messages.append(rnd.choice(TEMPLATES).format(
+            acct=rnd.randint(1000, 9999),
+            amount=random_amount(rnd),
+            date=f"{rnd.randint(1, 28):02d}-{rnd.randint(1, 12):02d}-{rnd.choice(['25', '2025'])}",
+            day_month=f"{rnd.randint(1, 28)}-{rnd.choice(MONTHS)}-25",
+            long_date=f"{rnd.randint(1, 28)} {rnd.choice(MONTHS)} 2025",
+            merchant=rnd.choice(MERCHANTS),
+            ref=rnd.randint(10 ** 11, 10 ** 12 - 1),
+            balance=f"{rnd.randint(100, 99999)}.00"
+        ))
+    return messages
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Offline bulk categorization of SMS archives
+- Streams a CSV or NDJSON file and fans chunks out to a process pool
+- Each worker builds app_hybrid once (ML model + FinancialAnalystAI) and runs the same
+  parse_sms/extract_sms_data + hybrid_categorize path as the API, so results match it
+- Output is written in input order as NDJSON (batch result per line) or CSV
+- Reports throughput overall and per worker process
+
+Usage: python bulk_categorize.py sms_archive.csv categorized.ndjson [--processes 4] [--column sms_text]
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque, defaultdict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+CSV_OUTPUT_FIELDS = [
+    'index', 'amount', 'transaction_type', 'date', 'merchant',
+    'category', 'confidence', 'method', 'merchant_detected', 'error'
+]
+
+_categorize_sms_list = None
+
+
+def _init_worker(model_path, cache_size):
+    """Load the model and rule engine once per worker process"""
+    global _categorize_sms_list
+    if model_path:
+        os.environ['FINSAATHI_MODEL_PATH'] = model_path
+    os.environ['FINSAATHI_RESULT_CACHE_SIZE'] = str(cache_size)
+    # Categorization runs on this process; no extra inference threads
+    os.environ['FINSAATHI_INFERENCE_THREADS'] = '0'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app_hybrid
+        app_hybrid.create_app()
+    if not app_hybrid.ml_categorizer.is_trained:
+        print(f"⚠️ Worker {os.getpid()}: no ML model loaded, using AI Analyst only", file=sys.stderr)
+    _categorize_sms_list = app_hybrid.categorize_sms_list
+
+
+def _categorize_chunk(start_index, sms_list):
+    started = time.process_time()
+    results = _categorize_sms_list(sms_list, start_index)
+    return os.getpid(), results, time.process_time() - started
+
+
+def read_sms(path, input_format, column):
+    """Yield SMS texts from a CSV column or an NDJSON file without loading it whole"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == 'csv':
+            reader = csv.DictReader(f)
+            if column not in (reader.fieldnames or []):
+                raise SystemExit(f"❌ Column '{column}' not found in {path} (columns: {reader.fieldnames})")
+            for row in reader:
+                yield row[column]
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    value = json.loads(line)
+                except ValueError:
+                    yield None
+                    continue
+                yield value.get(column) if isinstance(value, dict) else value
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ResultWriter:
+    """Writes batch results as NDJSON lines or flattened CSV rows"""
+
+    def __init__(self, f, output_format, omit_raw_text):
+        self.f = f
+        self.omit_raw_text = omit_raw_text
+        self.csv = None
+        if output_format == 'csv':
+            fields = CSV_OUTPUT_FIELDS if omit_raw_text else CSV_OUTPUT_FIELDS + ['sms_text']
+            self.csv = csv.DictWriter(f, fieldnames=fields)
+            self.csv.writeheader()
+
+    def write(self, result):
+        sms_data = result.get('sms_data', {})
+        if self.csv:
+            categorization = result.get('categorization', {})
+            row = {
+                'index': result['index'],
+                'amount': sms_data.get('amount'),
+                'transaction_type': sms_data.get('transaction_type'),
+                'date': sms_data.get('date'),
+                'merchant': sms_data.get('merchant'),
+                'category': categorization.get('category'),
+                'confidence': categorization.get('confidence'),
+                'method': categorization.get('method'),
+                'merchant_detected': categorization.get('merchant_detected'),
+                'error': result.get('error')
+            }
+            if not self.omit_raw_text:
+                row['sms_text'] = sms_data.get('raw_text', result.get('sms_text'))
+            self.csv.writerow(row)
+            return
+
+        if self.omit_raw_text:
+            result.pop('sms_text', None)
+            if sms_data:
+                result['sms_data'] = {k: v for k, v in sms_data.items() if k != 'raw_text'}
+        self.f.write(json.dumps(result, ensure_ascii=False, sort_keys=True) + '\n')
+
+
+def file_format(path, explicit):
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="CSV or NDJSON file of SMS")
+    parser.add_argument('output', help="where to write results (.csv or .ndjson)")
+    parser.add_argument('--input-format', choices=['csv', 'ndjson'])
+    parser.add_argument('--output-format', choices=['csv', 'ndjson'])
+    parser.add_argument('--column', default='sms_text', help="CSV column / NDJSON object key holding the SMS")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--model', help="model pickle or artifact directory (default: FINSAATHI_MODEL_PATH)")
+    parser.add_argument('--cache-size', type=int, default=10000, help="per-worker template cache, 0 disables")
+    parser.add_argument('--omit-raw-text', action='store_true', help="leave the SMS text out of the output")
+    args = parser.parse_args()
+
+    input_format = file_format(args.input, args.input_format)
+    output_format = file_format(args.output, args.output_format)
+
+    print(f"🔄 Categorizing {args.input} with {args.processes} processes...")
+    started = time.perf_counter()
+    total = 0
+    per_worker = defaultdict(lambda: {'messages': 0, 'cpu_seconds': 0.0})
+
+    with multiprocessing.Pool(args.processes, initializer=_init_worker,
+                              initargs=(args.model, args.cache_size)) as pool, \
+            open(args.output, 'w', newline='', encoding='utf-8') as out:
+        writer = ResultWriter(out, output_format, args.omit_raw_text)
+
+        # Keep a bounded window of chunks in flight and write them back in submission order
+        pending = deque()
+        max_pending = args.processes * 2
+        index = 0
+
+        def drain_one():
+            pid, results, cpu_seconds = pending.popleft().get()
+            per_worker[pid]['messages'] += len(results)
+            per_worker[pid]['cpu_seconds'] += cpu_seconds
+            for result in results:
+                writer.write(result)
+            return len(results)
+
+        for chunk in chunked(read_sms(args.input, input_format, args.column), args.chunk_size):
+            pending.append(pool.apply_async(_categorize_chunk, (index, chunk)))
+            index += len(chunk)
+            if len(pending) >= max_pending:
+                total += drain_one()
+
+        while pending:
+            total += drain_one()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total} SMS written to {args.output} in {elapsed:.1f}s "
+          f"({total / elapsed:.0f} msgs/sec, {total / elapsed / args.processes:.0f} msgs/sec per process)")
+    for pid, stats in sorted(per_worker.items()):
+        rate = stats['messages'] / stats['cpu_seconds'] if stats['cpu_seconds'] else 0
+        print(f"  worker {pid}: {stats['messages']} SMS, {rate:.0f} msgs per CPU-second")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,151 @@
+import math
 import numpy as np
+import os
 import pickle
+import random
 import re
+import time
+from datetime import datetime
+import sklearn
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import cross_val_score, train_test_split
 from sklearn.metrics import classification_report
-from enhanced_training_data import get_enhanced_training_data
+from enhanced_training_data import get_enhanced_training_data, training_data_digest
+from model_artifact import save_artifact, load_artifact
+from flat_forest import FlatForest
+from linear_tier import LinearTier, build_linear_model
+from hashing_vectorizer import HashingTfidfVectorizer
+from featurizer import build_featurizer
+from result_cache import has_variable_digit_terms
+from keyword_features import KeywordFeatureBlock
+
+DEFAULT_MODEL_PATH = 'enhanced_expense_model.pkl'
+
+# Featurization used when training: 'tfidf' (vocabulary) or 'hashing' (see hashing_vectorizer.py)
+VECTORIZER_MODES = ('tfidf', 'hashing')
+
+# Engineered keyword/merchant/amount features: 'text' appends them to the text as tokens,
+# 'block' adds them as numeric columns next to the vectorizer's (see keyword_features.py)
+FEATURE_MODES = ('text', 'block')
+
+# Up to this many rows, a forest trained or unpickled in this process is scored by its
+# FlatForest export (no per-call sklearn overhead); bigger batches amortize sklearn's overhead
+FLAT_FOREST_MAX_ROWS = 64
+
+# Bump whenever the pickled model_data layout changes
+MODEL_FORMAT_VERSION = 4
+
+# Category-specific keywords for extract_keyword_features and the keyword block
+CATEGORY_KEYWORDS = {
+    'food_dining': ['restaurant', 'food', 'cafe', 'coffee', 'pizza', 'burger', 'meal', 'dining', 'kitchen', 'delivery', 'takeout', 'breakfast', 'lunch', 'dinner', 'snack', 'beverage', 'drink', 'zomato', 'swiggy', 'dominos', 'mcdonald', 'kfc', 'starbucks'],
+    'transportation': ['uber', 'ola', 'taxi', 'fuel', 'petrol', 'gas', 'transport', 'metro', 'bus', 'train', 'auto', 'cab', 'parking', 'toll', 'vehicle', 'bike', 'car', 'rapido', 'irctc'],
+    'shopping': ['amazon', 'flipkart', 'myntra', 'shopping', 'store', 'mall', 'retail', 'clothes', 'clothing', 'fashion', 'shoes', 'electronics', 'gadget', 'mobile', 'laptop', 'ajio', 'nykaa', 'snapdeal'],
+    'groceries': ['grocery', 'supermarket', 'vegetables', 'fruits', 'market', 'fresh', 'bazaar', 'mart', 'provisions', 'dairy', 'organic', 'bigbasket', 'grofers'],
+    'utilities': ['electricity', 'water', 'gas', 'internet', 'broadband', 'mobile', 'phone', 'utility', 'bill', 'recharge', 'dth', 'cable', 'airtel', 'vodafone', 'jio'],
+    'healthcare': ['hospital', 'doctor', 'medical', 'pharmacy', 'medicine', 'health', 'clinic', 'dental', 'eye', 'care', 'treatment', 'consultation', 'apollo', 'lenskart'],
+    'entertainment': ['movie', 'cinema', 'netflix', 'entertainment', 'game', 'music', 'streaming', 'concert', 'show', 'park', 'fun', 'pvr', 'inox', 'spotify', 'amazon prime'],
+    'education': ['education', 'school', 'university', 'course', 'learning', 'training', 'coaching', 'books', 'study', 'class', 'coursera', 'udemy'],
+    'housing': ['rent', 'house', 'home', 'property', 'maintenance', 'repair', 'furniture', 'loan', 'emi', 'housing', 'urban company'],
+    'travel': ['flight', 'hotel', 'travel', 'trip', 'vacation', 'airline', 'booking', 'tourist', 'journey', 'indigo', 'makemytrip'],
+    'insurance': ['insurance', 'premium', 'policy', 'coverage', 'claim', 'lic', 'bajaj allianz'],
+    'investment': ['investment', 'mutual', 'fund', 'stock', 'share', 'sip', 'deposit', 'gold', 'bond', 'zerodha', 'groww']
+}
+
+# Known merchant categories for extract_keyword_features and the keyword block
+KNOWN_MERCHANTS = {
+    'amazon': 'shopping_online',
+    'flipkart': 'shopping_online',
+    'myntra': 'shopping_fashion',
+    'zomato': 'food_delivery',
+    'swiggy': 'food_delivery',
+    'uber': 'transport_cab',
+    'ola': 'transport_cab',
+    'netflix': 'entertainment_streaming',
+    'spotify': 'entertainment_music',
+    'airtel': 'utility_telecom',
+    'vodafone': 'utility_telecom',
+    'apollo': 'healthcare_hospital'
+}
+
+# clean_text: special characters (except & . -) become spaces, whitespace runs collapse
+SPECIAL_CHARACTERS = re.compile(r'[^\w\s&.-]')
+WHITESPACE = re.compile(r'\s+')
+
+def top_k_indices(probabilities, top_k):
+    """Indices of the top_k classes in each row, best first, using partial selection"""
+    n_classes = probabilities.shape[1]
+    k = max(1, min(int(top_k), n_classes))
+    
+    if k < n_classes:
+        top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(n_classes), (probabilities.shape[0], 1))
+    
+    # Only the k selected entries get sorted
+    order = np.argsort(-np.take_along_axis(probabilities, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
 
 class ImprovedExpenseCategorizer:
     """Enhanced expense categorizer with better accuracy"""
     
-    def __init__(self):
-        # Enhanced text vectorizer
-        self.vectorizer = TfidfVectorizer(
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, auto_train=True, fast_threshold=None,
+                 vectorizer_mode='tfidf', feature_mode='text'):
+        self.model_path = model_path
+        
+        # Train on first use when no saved model can be loaded
+        self.auto_train = auto_train
+        
+        # Linear fast tier (see linear_tier.py): answers when its top probability is at
+        # least fast_threshold and escalates to the forest otherwise; None serves the forest only
+        self.fast_threshold = fast_threshold
+        self.fast_model = None
+        
+        # Enhanced text vectorizer, and the (vectorizer, featurizer) pair transform() uses
+        self.vectorizer = self.build_vectorizer(vectorizer_mode)
+        self._featurizer = None
+        # Whether results may be cached per SMS template; see vectorizer_fitted()
+        self.template_keys = vectorizer_mode != 'hashing'
+        
+        # How keyword features reach the model; a loaded model brings its own
+        if feature_mode not in FEATURE_MODES:
+            raise ValueError(f"Unknown feature mode {feature_mode!r}, expected one of {FEATURE_MODES}")
+        self.feature_mode = feature_mode
+        self._keyword_block = None
+        
+        # Use RandomForest as main classifier (works well with mixed features),
+        # and the (forest, FlatForest export) pair forest_for() serves small batches with
+        self.model = self.build_forest()
+        self._flat_forest = None
+        
+        self.is_trained = False
+        self.training_info = {}
+        self.model_source = None
+        self.load_seconds = None
+        self.categories = [
+            'Food & Dining', 'Transportation', 'Shopping', 'Groceries',
+            'Bills & Utilities', 'Healthcare', 'Entertainment', 'Education',
+            'Housing', 'Travel', 'Insurance', 'Investment', 'Other'
+        ]
+        
+    def build_vectorizer(self, mode='tfidf'):
+        """Unfitted vectorizer for a training run; a loaded model brings its own"""
+        if mode == 'hashing':
+            # Hashed n-grams: no vocabulary, stateless transform, incremental partial_fit
+            return HashingTfidfVectorizer(
+                n_features=2 ** 12,
+                ngram_range=(1, 3),
+                stop_words='english',
+                lowercase=True,
+                min_df=2,
+                max_df=0.8,
+                sublinear_tf=True,
+                strip_accents='ascii'
+            )
+        if mode != 'tfidf':
+            raise ValueError(f"Unknown vectorizer mode {mode!r}, expected one of {VECTORIZER_MODES}")
+        return TfidfVectorizer(
             max_features=3000,
             ngram_range=(1, 3),  # Include unigrams, bigrams, and trigrams
             stop_words='english',
@@ -22,9 +155,21 @@ class ImprovedExpenseCategorizer:
             sublinear_tf=True,  # Use sublinear scaling
             strip_accents='ascii'
         )
-        
-        # Use RandomForest as main classifier (works well with mixed features)
-        self.model = RandomForestClassifier(
+    
+    @property
+    def vectorizer_mode(self):
+        return 'hashing' if isinstance(self.vectorizer, HashingTfidfVectorizer) else 'tfidf'
+    
+    @property
+    def keyword_block(self):
+        """KeywordFeatureBlock over CATEGORY_KEYWORDS and KNOWN_MERCHANTS, built on first use"""
+        if self._keyword_block is None:
+            self._keyword_block = KeywordFeatureBlock(CATEGORY_KEYWORDS, KNOWN_MERCHANTS)
+        return self._keyword_block
+    
+    def build_forest(self):
+        """Unfitted RandomForest with the production hyperparameters"""
+        return RandomForestClassifier(
             n_estimators=200,  # More trees for better accuracy
             max_depth=15,
             min_samples_split=5,
@@ -33,14 +178,7 @@ class ImprovedExpenseCategorizer:
             random_state=42,
             class_weight='balanced'  # Handle class imbalance
         )
-        
-        self.is_trained = False
-        self.categories = [
-            'Food & Dining', 'Transportation', 'Shopping', 'Groceries',
-            'Bills & Utilities', 'Healthcare', 'Entertainment', 'Education',
-            'Housing', 'Travel', 'Insurance', 'Investment', 'Other'
-        ]
-        
+    
     def create_enhanced_features(self, description, merchant, amount=None):
         """Create enhanced features for better categorization"""
         # Clean and combine text
@@ -55,6 +193,31 @@ class ImprovedExpenseCategorizer:
         
         return combined_text
     
+    def feature_inputs(self, items):
+        """Vectorizer input texts for (description, merchant, amount) items, and the keyword
+        block to hstack with the vectorizer's output (None in feature_mode 'text')
+        
+        Amounts go through clean_amount first, so both feature modes see the same value.
+        """
+        if self.feature_mode == 'text':
+            return [self.create_enhanced_features(description, merchant, self.clean_amount(amount))
+                    for description, merchant, amount in items], None
+        
+        texts, merchants, amounts = [], [], []
+        for description, merchant, amount in items:
+            desc_clean = self.clean_text(description)
+            merchant_clean = self.clean_text(merchant) if merchant else ""
+            texts.append(f"{desc_clean} {merchant_clean}".strip())
+            merchants.append(merchant_clean)
+            amounts.append(self.clean_amount(amount))
+        return texts, self.keyword_block.transform(texts, merchants, amounts)
+    
+    def featurize(self, items):
+        """Model input matrix for (description, merchant, amount) items"""
+        texts, block = self.feature_inputs(items)
+        X = self.transform(texts)
+        return sparse.hstack([X, block], format='csr') if block is not None else X
+    
     def clean_text(self, text):
         """Advanced text cleaning"""
         if not text:
@@ -64,35 +227,27 @@ class ImprovedExpenseCategorizer:
         text = text.lower()
         
         # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s&.-]', ' ', text)
+        text = SPECIAL_CHARACTERS.sub(' ', text)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE.sub(' ', text).strip()
         
         return text
     
+    def clean_amount(self, amount):
+        """Amount as a float: numeric strings ('1500') are converted, a missing or NaN amount
+        is None, and anything that is not a number raises ValueError or TypeError"""
+        if amount is None:
+            return None
+        amount = float(amount)
+        return None if math.isnan(amount) else amount
+    
     def extract_keyword_features(self, text, merchant, amount):
         """Extract keyword-based features as text tokens"""
         features = []
         
-        # Category-specific keywords
-        category_keywords = {
-            'food_dining': ['restaurant', 'food', 'cafe', 'coffee', 'pizza', 'burger', 'meal', 'dining', 'kitchen', 'delivery', 'takeout', 'breakfast', 'lunch', 'dinner', 'snack', 'beverage', 'drink', 'zomato', 'swiggy', 'dominos', 'mcdonald', 'kfc', 'starbucks'],
-            'transportation': ['uber', 'ola', 'taxi', 'fuel', 'petrol', 'gas', 'transport', 'metro', 'bus', 'train', 'auto', 'cab', 'parking', 'toll', 'vehicle', 'bike', 'car', 'rapido', 'irctc'],
-            'shopping': ['amazon', 'flipkart', 'myntra', 'shopping', 'store', 'mall', 'retail', 'clothes', 'clothing', 'fashion', 'shoes', 'electronics', 'gadget', 'mobile', 'laptop', 'ajio', 'nykaa', 'snapdeal'],
-            'groceries': ['grocery', 'supermarket', 'vegetables', 'fruits', 'market', 'fresh', 'bazaar', 'mart', 'provisions', 'dairy', 'organic', 'bigbasket', 'grofers'],
-            'utilities': ['electricity', 'water', 'gas', 'internet', 'broadband', 'mobile', 'phone', 'utility', 'bill', 'recharge', 'dth', 'cable', 'airtel', 'vodafone', 'jio'],
-            'healthcare': ['hospital', 'doctor', 'medical', 'pharmacy', 'medicine', 'health', 'clinic', 'dental', 'eye', 'care', 'treatment', 'consultation', 'apollo', 'lenskart'],
-            'entertainment': ['movie', 'cinema', 'netflix', 'entertainment', 'game', 'music', 'streaming', 'concert', 'show', 'park', 'fun', 'pvr', 'inox', 'spotify', 'amazon prime'],
-            'education': ['education', 'school', 'university', 'course', 'learning', 'training', 'coaching', 'books', 'study', 'class', 'coursera', 'udemy'],
-            'housing': ['rent', 'house', 'home', 'property', 'maintenance', 'repair', 'furniture', 'loan', 'emi', 'housing', 'urban company'],
-            'travel': ['flight', 'hotel', 'travel', 'trip', 'vacation', 'airline', 'booking', 'tourist', 'journey', 'indigo', 'makemytrip'],
-            'insurance': ['insurance', 'premium', 'policy', 'coverage', 'claim', 'lic', 'bajaj allianz'],
-            'investment': ['investment', 'mutual', 'fund', 'stock', 'share', 'sip', 'deposit', 'gold', 'bond', 'zerodha', 'groww']
-        }
-        
         # Add category keyword indicators
-        for category, keywords in category_keywords.items():
+        for category, keywords in CATEGORY_KEYWORDS.items():
             keyword_count = sum(1 for keyword in keywords if keyword in text)
             if keyword_count > 0:
                 features.append(f"category_{category}")
@@ -100,83 +255,79 @@ class ImprovedExpenseCategorizer:
         
         # Merchant-specific features
         if merchant:
-            # Known merchant categories
-            known_merchants = {
-                'amazon': 'shopping_online',
-                'flipkart': 'shopping_online',
-                'myntra': 'shopping_fashion',
-                'zomato': 'food_delivery',
-                'swiggy': 'food_delivery',
-                'uber': 'transport_cab',
-                'ola': 'transport_cab',
-                'netflix': 'entertainment_streaming',
-                'spotify': 'entertainment_music',
-                'airtel': 'utility_telecom',
-                'vodafone': 'utility_telecom',
-                'apollo': 'healthcare_hospital'
-            }
-            
-            for merchant_key, merchant_type in known_merchants.items():
+            for merchant_key, merchant_type in KNOWN_MERCHANTS.items():
                 if merchant_key in merchant:
                     features.append(f"merchant_type_{merchant_type}")
         
         # Amount-based features
-        if amount is not None:
-            if amount < 50:
-                features.append("amount_very_small")
-            elif amount < 200:
-                features.append("amount_small")
-            elif amount < 1000:
-                features.append("amount_medium")
-            elif amount < 5000:
-                features.append("amount_large")
-            else:
-                features.append("amount_very_large")
-            
-            # Typical amount ranges for categories
-            if 100 <= amount <= 1000:
-                features.append("subscription_range")
-            if 200 <= amount <= 3000:
-                features.append("utility_range")
-            if 500 <= amount <= 5000:
-                features.append("grocery_range")
-            if amount > 10000:
-                features.append("major_purchase")
+        features.extend(self.amount_features(amount))
         
         return " " + " ".join(features) if features else ""
     
+    def amount_features(self, amount):
+        """Amount bucket and typical-range tokens for extract_keyword_features"""
+        features = []
+        if amount is None:
+            return features
+        
+        if amount < 50:
+            features.append("amount_very_small")
+        elif amount < 200:
+            features.append("amount_small")
+        elif amount < 1000:
+            features.append("amount_medium")
+        elif amount < 5000:
+            features.append("amount_large")
+        else:
+            features.append("amount_very_large")
+        
+        # Typical amount ranges for categories
+        if 100 <= amount <= 1000:
+            features.append("subscription_range")
+        if 200 <= amount <= 3000:
+            features.append("utility_range")
+        if 500 <= amount <= 5000:
+            features.append("grocery_range")
+        if amount > 10000:
+            features.append("major_purchase")
+        
+        return features
+    
     def train_model(self, training_data=None):
         """Train the improved model"""
         try:
+            data_seed = None
             if training_data is None:
-                training_data = get_enhanced_training_data()
+                # Recorded so tools can regenerate the exact rows the model was fitted on
+                data_seed = random.randrange(2 ** 32)
+                training_data = get_enhanced_training_data(data_seed)
                 
             print(f"Training with {len(training_data)} samples...")
             
             # Prepare features
-            features = []
-            labels = []
+            features, block = self.feature_inputs([
+                (item.get('description', ''), item.get('merchant', ''), item.get('amount'))
+                for item in training_data
+            ])
+            labels = [item['category'] for item in training_data]
             
-            for item in training_data:
-                feature_text = self.create_enhanced_features(
-                    item.get('description', ''),
-                    item.get('merchant', ''),
-                    item.get('amount')
-                )
-                features.append(feature_text)
-                labels.append(item['category'])
+            # A model served from an artifact cannot be refitted; start a fresh forest
+            if isinstance(self.model, FlatForest):
+                self.model = self.build_forest()
             
-            # Train vectorizer and model
+            # Train vectorizer and model (refitting in place invalidates the featurizer)
             X = self.vectorizer.fit_transform(features)
+            self.vectorizer_fitted()
+            if block is not None:
+                X = sparse.hstack([X, block], format='csr')
             
             # Split data for validation
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, labels, test_size=0.2, random_state=42, stratify=labels
-            )
+            X_train, X_test, y_train, y_test = self.validation_split(X, labels)
             
-            # Train model
+            # Train model (refitting in place invalidates the FlatForest export)
             print("Training Random Forest model...")
             self.model.fit(X_train, y_train)
+            self._flat_forest = None
             
             # Evaluate model
             train_score = self.model.score(X_train, y_train)
@@ -189,21 +340,45 @@ class ImprovedExpenseCategorizer:
             cv_scores = cross_val_score(self.model, X, labels, cv=5)
             print(f"Cross-validation accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
             
+            # Linear fast tier on the same features and split
+            print("Training linear fast tier...")
+            linear = build_linear_model().fit(X_train, y_train)
+            fast_test_score = linear.score(X_test, y_test)
+            print(f"Fast tier validation accuracy: {fast_test_score:.3f}")
+            self.fast_model = LinearTier.from_sklearn(linear)
+            
+            self.training_info = {
+                'trained_at': datetime.now().isoformat(),
+                'n_samples': len(training_data),
+                'data_seed': data_seed,
+                'data_digest': training_data_digest(training_data),
+                'train_accuracy': float(train_score),
+                'validation_accuracy': float(test_score),
+                'cv_accuracy': float(cv_scores.mean()),
+                'fast_validation_accuracy': float(fast_test_score),
+                'vectorizer_mode': self.vectorizer_mode,
+                'feature_mode': self.feature_mode
+            }
+            
             # Detailed classification report
             y_pred = self.model.predict(X_test)
             print("\nDetailed Classification Report:")
             print(classification_report(y_test, y_pred))
             
-            # Feature importance
-            feature_names = self.vectorizer.get_feature_names_out()
-            feature_importance = self.model.feature_importances_
-            top_features = sorted(zip(feature_names, feature_importance), key=lambda x: x[1], reverse=True)[:20]
-            
-            print("\nTop 20 Most Important Features:")
-            for feature, importance in top_features:
-                print(f"  {feature}: {importance:.4f}")
+            # Feature importance (hashed columns have no names)
+            if hasattr(self.vectorizer, 'get_feature_names_out'):
+                feature_names = list(self.vectorizer.get_feature_names_out())
+                if block is not None:
+                    feature_names += self.keyword_block.columns
+                feature_importance = self.model.feature_importances_
+                top_features = sorted(zip(feature_names, feature_importance), key=lambda x: x[1], reverse=True)[:20]
+                
+                print("\nTop 20 Most Important Features:")
+                for feature, importance in top_features:
+                    print(f"  {feature}: {importance:.4f}")
             
             self.is_trained = True
+            self.model_source = 'trained'
             self.save_model()
             
             return True
@@ -214,85 +389,271 @@ class ImprovedExpenseCategorizer:
             traceback.print_exc()
             return False
     
-    def categorize_expense(self, description, merchant, amount=None):
-        """Categorize expense with improved accuracy"""
+    def validation_split(self, X, labels):
+        """The train/validation split train_model fits and scores on (X_train, X_test, y_train, y_test)"""
+        return train_test_split(X, labels, test_size=0.2, random_state=42, stratify=labels)
+    
+    def _ensure_ready(self):
+        """Load (or, with auto_train, train) the model; return an error message if unavailable"""
         if not self.is_trained:
+            if not self.auto_train:
+                return 'Model not loaded'
             if not self.load_model():
                 print("Model not trained. Training now...")
                 if not self.train_model():
-                    return {'error': 'Failed to train model'}
+                    return 'Failed to train model'
+        return None
+    
+    def categorize_expense(self, description, merchant, amount=None, top_k=3):
+        """Categorize expense with improved accuracy
+        
+        top_k: number of ranked predictions returned in all_predictions
+        """
+        error = self._ensure_ready()
+        if error:
+            return {'error': error}
         
         try:
             # Create features
-            feature_text = self.create_enhanced_features(description, merchant, amount)
-            X = self.vectorizer.transform([feature_text])
+            X = self.featurize([(description, merchant, amount)])
             
-            # Predict
-            category = self.model.predict(X)[0]
-            probabilities = self.model.predict_proba(X)[0]
+            # One model pass; the label is the argmax of the probabilities,
+            # exactly what model.predict would return
+            probabilities, fast = self.predict_proba(X)
+            best = probabilities.argmax(axis=1)
+            top_indices = top_k_indices(probabilities, top_k)
             
-            # Get confidence score
-            confidence = np.max(probabilities)
+            return self._prediction_result(probabilities[0], best[0], top_indices[0], fast[0])
             
-            # Get top predictions
-            top_indices = np.argsort(probabilities)[::-1][:3]
-            predictions = [
+        except Exception as e:
+            print(f"Categorization error: {e}")
+            return {'error': str(e)}
+    
+    def categorize_batch(self, items, batch_size=1000, top_k=3):
+        """Categorize many (description, merchant, amount) items at once
+        
+        Each chunk of batch_size rows is vectorized into one sparse matrix and
+        scored with a single predict_proba call; labels come from the argmax of
+        the probabilities, so every tree is walked once per row that reaches the forest.
+        Returns one result dict per item, in input order.
+        """
+        error = self._ensure_ready()
+        if error:
+            return [{'error': error} for _ in items]
+        
+        results = []
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            try:
+                X = self.featurize(chunk)
+                probabilities, fast = self.predict_proba(X)
+                
+                best = probabilities.argmax(axis=1)
+                top_indices = top_k_indices(probabilities, top_k)
+                
+                results.extend(
+                    self._prediction_result(row, best_index, row_top, row_fast)
+                    for row, best_index, row_top, row_fast in zip(probabilities, best, top_indices, fast)
+                )
+                    
+            except Exception as e:
+                print(f"Batch categorization error: {e}")
+                results.extend({'error': str(e)} for _ in chunk)
+        
+        return results
+    
+    def vectorizer_fitted(self):
+        """Derive what serving needs from a newly fitted or loaded vectorizer
+        
+        Builds the featurizer, and decides whether results may be cached per SMS template
+        (result_cache.sms_template): not with hashed n-grams, where every number has a
+        bucket, nor when the vocabulary has a term built from a standalone number.
+        """
+        self._featurizer = None
+        self.featurizer()
+        self.template_keys = (not isinstance(self.vectorizer, HashingTfidfVectorizer)
+                              and not has_variable_digit_terms(self.vectorizer.vocabulary_))
+    
+    def featurizer(self):
+        """Fast transform for the current vectorizer, built once per vectorizer
+        
+        Training and loading build it straight away, so in a preloaded app it is created
+        in the gunicorn master and the forked workers share it rather than each building one.
+        """
+        vectorizer = self.vectorizer
+        cached = self._featurizer
+        if cached is None or cached[0] is not vectorizer:
+            cached = self._featurizer = (vectorizer, build_featurizer(vectorizer))
+        return cached[1]
+    
+    def transform(self, feature_texts):
+        """self.vectorizer.transform(feature_texts), through self.featurizer()"""
+        return self.featurizer().transform(feature_texts)
+    
+    def predict_proba(self, X):
+        """Class probabilities for the rows of X and a mask of the rows the fast tier answered
+        
+        Rows the linear tier is less than fast_threshold sure of are scored by the forest.
+        The tier is read once, so a hot swap by the online updater never splits a call.
+        """
+        fast_model = self.fast_model
+        if fast_model is None or self.fast_threshold is None:
+            return self.forest_for(X.shape[0]).predict_proba(X), np.zeros(X.shape[0], dtype=bool)
+        
+        probabilities = fast_model.predict_proba(X)
+        escalate = np.flatnonzero(probabilities.max(axis=1) < self.fast_threshold)
+        if escalate.size:
+            probabilities[escalate] = self.forest_for(escalate.size).predict_proba(X[escalate])
+        
+        fast = np.ones(X.shape[0], dtype=bool)
+        fast[escalate] = False
+        return probabilities, fast
+    
+    def forest_for(self, n_rows):
+        """Forest to score n_rows with: the FlatForest export of a sklearn forest for small batches
+        
+        The export is built on first use and gives the same probabilities as the forest.
+        """
+        model = self.model
+        if n_rows > FLAT_FOREST_MAX_ROWS or not isinstance(model, RandomForestClassifier):
+            return model
+        cached = self._flat_forest
+        if cached is None or cached[0] is not model:
+            cached = self._flat_forest = (model, FlatForest.from_sklearn(model))
+        return cached[1]
+    
+    def _prediction_result(self, probabilities, best_index, top_indices, fast=False):
+        """Build the categorize_expense response for one row of class probabilities"""
+        return {
+            'primary_category': self.model.classes_[best_index],
+            'confidence': float(probabilities[best_index]),
+            'all_predictions': [
                 {
                     'category': self.model.classes_[i],
                     'confidence': float(probabilities[i])
                 }
                 for i in top_indices
-            ]
-            
-            return {
-                'primary_category': category,
-                'confidence': float(confidence),
-                'all_predictions': predictions,
-                'model_type': 'random_forest_enhanced'
-            }
-            
-        except Exception as e:
-            print(f"Categorization error: {e}")
-            return {'error': str(e)}
+            ],
+            'model_type': 'linear_fast' if fast else 'random_forest_enhanced'
+        }
     
-    def save_model(self):
+    def feature_columns(self):
+        """Names of the keyword block's columns, recorded with the model (None in 'text' mode)"""
+        return self.keyword_block.columns if self.feature_mode == 'block' else None
+    
+    def use_feature_mode(self, feature_mode, columns=None):
+        """Switch to a saved model's feature mode, checking its keyword block still lines up"""
+        if feature_mode not in FEATURE_MODES:
+            raise ValueError(f"Unknown feature mode {feature_mode!r}, expected one of {FEATURE_MODES}")
+        if feature_mode == 'block' and columns != self.keyword_block.columns:
+            raise ValueError("The model was trained with different keyword block columns; retrain it")
+        self.feature_mode = feature_mode
+    
+    def save_model(self, path=None):
         """Save the trained model"""
+        path = path or self.model_path
         try:
             model_data = {
+                'format_version': MODEL_FORMAT_VERSION,
+                'sklearn_version': sklearn.__version__,
+                'training_info': self.training_info,
                 'model': self.model,
                 'vectorizer': self.vectorizer,
+                'fast_model': self.fast_model,
+                'feature_mode': self.feature_mode,
+                'feature_columns': self.feature_columns(),
                 'is_trained': self.is_trained,
                 'categories': self.categories
             }
             
-            with open('enhanced_expense_model.pkl', 'wb') as f:
+            with open(path, 'wb') as f:
                 pickle.dump(model_data, f)
-            print("Enhanced model saved successfully!")
+            print(f"Enhanced model saved successfully to {path}!")
             
         except Exception as e:
             print("Error saving model:", e)
     
-    def load_model(self):
-        """Load the trained model"""
+    def save_artifact(self, directory):
+        """Save the trained model in the compact artifact format (see model_artifact.py)"""
+        manifest = save_artifact(self, directory)
+        print(f"Enhanced model artifact saved to {directory}/ ({manifest['forest']['n_nodes']} forest nodes)")
+        return manifest
+    
+    def load_model(self, path=None):
+        """Load a trained model saved with save_model or save_artifact, recording how long it took"""
+        path = path or self.model_path
+        if os.path.isdir(path):
+            return self.load_artifact(path)
+        
+        started = time.perf_counter()
         try:
-            with open('enhanced_expense_model.pkl', 'rb') as f:
+            with open(path, 'rb') as f:
                 model_data = pickle.load(f)
             
+            # Files written before versioning carry no format_version
+            format_version = model_data.get('format_version', 1)
+            if format_version > MODEL_FORMAT_VERSION:
+                print(f"Error loading model: {path} has format version {format_version}, "
+                      f"this build supports up to {MODEL_FORMAT_VERSION}")
+                return False
+            
+            saved_sklearn = model_data.get('sklearn_version')
+            if saved_sklearn and saved_sklearn != sklearn.__version__:
+                print(f"Warning: model was saved with scikit-learn {saved_sklearn}, "
+                      f"running {sklearn.__version__}")
+            
+            # Models saved before feature modes existed append keyword tokens to the text
+            self.use_feature_mode(model_data.get('feature_mode', 'text'), model_data.get('feature_columns'))
             self.model = model_data['model']
             self.vectorizer = model_data['vectorizer']
+            self.vectorizer_fitted()
+            self.fast_model = model_data.get('fast_model')
             self.is_trained = model_data['is_trained']
             self.categories = model_data['categories']
+            self.training_info = model_data.get('training_info', {})
+            self.model_source = 'pickle'
+            self.load_seconds = time.perf_counter() - started
             
-            print("Enhanced model loaded successfully!")
+            print(f"Enhanced model loaded successfully from {path} in {self.load_seconds * 1000:.1f} ms!")
             return True
             
         except Exception as e:
             print("Error loading model:", e)
             return False
+    
+    def load_artifact(self, directory, mmap=True, verify=False):
+        """Load a model directory written by save_artifact
+        
+        The forest is served by FlatForest straight from the memory-mapped node
+        arrays, so preloaded gunicorn workers share one copy of it. verify also checks
+        every file's sha256 (a full read of the artifact).
+        """
+        started = time.perf_counter()
+        try:
+            artifact = load_artifact(directory, mmap=mmap, verify=verify, build_forest=False)
+            manifest = artifact['manifest']
+            
+            self.use_feature_mode(artifact['feature_mode'], artifact['feature_columns'])
+            self.model = FlatForest(artifact['arrays'], manifest['classes'], manifest['forest']['n_features'])
+            self.vectorizer = artifact['vectorizer']
+            self.vectorizer_fitted()
+            self.fast_model = artifact['fast_model']
+            self.categories = artifact['categories']
+            self.training_info = artifact['training_info']
+            self.is_trained = True
+            self.model_source = 'artifact'
+            self.load_seconds = time.perf_counter() - started
+            
+            print(f"Enhanced model artifact loaded from {directory}/ in {self.load_seconds * 1000:.1f} ms!")
+            return True
+            
+        except Exception as e:
+            print("Error loading model artifact:", e)
+            return False
 
-def test_enhanced_model():
+def test_enhanced_model(vectorizer_mode='tfidf', feature_mode='text'):
     """Test the enhanced model with sample data"""
-    categorizer = ImprovedExpenseCategorizer()
+    categorizer = ImprovedExpenseCategorizer(vectorizer_mode=vectorizer_mode, feature_mode=feature_mode)
     
     # Train the model
     print("Training enhanced model...")
@@ -377,4 +738,7 @@ def test_enhanced_model():
     print(f"- Model type: {result.get('model_type', 'unknown')}")
 
 if __name__ == '__main__':
-    test_enhanced_model()
\ No newline at end of file
+    # FINSAATHI_VECTORIZER_MODE=hashing trains with hashed n-gram features,
+    # FINSAATHI_FEATURE_MODE=block with the keyword features as a sparse block
+    test_enhanced_model(os.environ.get('FINSAATHI_VECTORIZER_MODE', 'tfidf'),
+                        os.environ.get('FINSAATHI_FEATURE_MODE', 'text'))
\ No newline at end of file
@@ -1,5 +1,7 @@
 # Enhanced training data with significantly more samples for better model accuracy
 from datetime import datetime
+import hashlib
+import json
 import random
 
 # Expanded training data with 300+ samples across all categories
@@ -255,8 +257,9 @@ ENHANCED_TRAINING_DATA = [
     {'description': 'Religious ceremony expenses', 'merchant': 'Religious Service', 'amount': 5000.00, 'category': 'Other'}
 ]
 
-def get_enhanced_training_data():
-    """Return enhanced training data with timestamps"""
+def get_enhanced_training_data(seed=None):
+    """Return enhanced training data with timestamps; the same seed gives the same amounts"""
+    rng = random.Random(seed)
     enhanced_data = []
     for item in ENHANCED_TRAINING_DATA:
         enhanced_item = item.copy()
@@ -265,17 +268,28 @@ def get_enhanced_training_data():
         if 'amount' in enhanced_item:
             base_amount = enhanced_item['amount']
             # Add ±10% variation
-            variation = base_amount * 0.1 * (random.random() - 0.5) * 2
+            variation = base_amount * 0.1 * (rng.random() - 0.5) * 2
             enhanced_item['amount'] = round(base_amount + variation, 2)
         enhanced_data.append(enhanced_item)
     return enhanced_data
 
-print(f"Enhanced training data contains {len(ENHANCED_TRAINING_DATA)} samples")
-print("Categories distribution:")
-categories = {}
-for item in ENHANCED_TRAINING_DATA:
-    cat = item['category']
-    categories[cat] = categories.get(cat, 0) + 1
+def training_data_digest(data):
+    """SHA-256 of the fields a model is trained on, to check a regenerated set matches"""
+    rows = [[item.get('description', ''), item.get('merchant', ''), item.get('amount'), item['category']]
+            for item in data]
+    return hashlib.sha256(json.dumps(rows).encode('utf-8')).hexdigest()
 
-for cat, count in sorted(categories.items()):
-    print(f"  {cat}: {count} samples")
\ No newline at end of file
+def print_distribution():
+    """Print the sample count per category"""
+    print(f"Enhanced training data contains {len(ENHANCED_TRAINING_DATA)} samples")
+    print("Categories distribution:")
+    categories = {}
+    for item in ENHANCED_TRAINING_DATA:
+        cat = item['category']
+        categories[cat] = categories.get(cat, 0) + 1
+
+    for cat, count in sorted(categories.items()):
+        print(f"  {cat}: {count} samples")
+
+if __name__ == '__main__':
+    print_distribution()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Single-pass TF-IDF featurization built once from a fitted TfidfVectorizer
+- TfidfVectorizer.transform rebuilds its analyzer and re-validates the fitted state on
+  every call; TfidfFeaturizer keeps the analyzer, vocabulary, idf and weighting flags
+- Each text goes straight from analyzer tokens to the column counts of one CSR row;
+  weighting (sublinear tf, idf, l2 norm) happens on the raw arrays, in the same order and
+  with the same numpy ufuncs sklearn uses, so the output matches vectorizer.transform exactly
+- The CSR matrix wraps the arrays the featurizer built (copy=False), with no conversion
+  through COO or re-sorting of indices
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+class TfidfFeaturizer:
+    """transform-compatible fast path for one fitted TfidfVectorizer"""
+
+    def __init__(self, vectorizer):
+        if vectorizer.binary or not vectorizer.use_idf or vectorizer.norm not in ('l2', None):
+            raise ValueError("TfidfFeaturizer supports the default binary/use_idf/norm settings only")
+        self.vectorizer = vectorizer
+        self.analyzer = vectorizer.build_analyzer()
+        # The vectorizer's own dict, not a copy: one vocabulary per model, shared after fork
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self.normalize = vectorizer.norm == 'l2'
+        self.n_features = len(self.idf)
+
+    def _counts(self, documents):
+        """CSR (data, indices, indptr) of vocabulary counts, indices sorted within each row"""
+        analyzer = self.analyzer
+        lookup = self.vocabulary.get
+        indptr = [0]
+        indices = []
+        data = []
+        for document in documents:
+            counts = {}
+            for term in analyzer(document):
+                index = lookup(term)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+            for index in sorted(counts):
+                indices.append(index)
+                data.append(counts[index])
+            indptr.append(len(indices))
+        return (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int32))
+
+    def transform(self, documents):
+        data, indices, indptr = self._counts(documents)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        data *= self.idf[indices]
+
+        if self.normalize:
+            # Row sums of squares accumulated left to right, like sklearn's
+            # inplace_csr_row_normalize_l2, so the norms are bit-identical
+            squares = (data * data).tolist()
+            for row in range(len(indptr) - 1):
+                start, end = indptr[row], indptr[row + 1]
+                total = 0.0
+                for value in squares[start:end]:
+                    total += value
+                if total != 0.0:
+                    data[start:end] /= np.sqrt(total)
+
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features), copy=False)
+
+
+def build_featurizer(vectorizer):
+    """Fast transform for a fitted vectorizer: TfidfFeaturizer for TF-IDF, the vectorizer itself
+    otherwise (HashingTfidfVectorizer already keeps its analyzer and weights raw arrays)"""
+    if type(vectorizer).__name__ == 'TfidfVectorizer':
+        return TfidfFeaturizer(vectorizer)
+    return vectorizer
@@ -0,0 +1,229 @@
+"""
+User-corrected categories: a durable store and a background learner
+- FeedbackStore appends one JSON line per correction (flock + fsync, so every gunicorn
+  worker can write to the same file) and reads new lines from a byte offset
+- OnlineUpdater polls the store and refits the linear fast tier on the bundled training
+  data plus the most recent corrections (at most max_corrections), warm-started from its
+  previous weights; each correction is featurized once, when it is read. The forest and
+  the vectorizer are left alone, so there is no full retrain
+- Corrections only change responses that the fast tier answers: without a fast tier
+  threshold (FINSAATHI_FAST_TIER_THRESHOLD) the forest answers every request and the
+  relearned tier is never consulted
+- A correction that cannot be featurized (e.g. a non-numeric amount) is skipped and
+  counted rather than retried on every poll
+- The new tier replaces categorizer.fast_model in one assignment: requests already
+  scoring keep the tier they started with, later ones use the new one
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+
+from linear_tier import LinearTier, build_linear_model
+
+
+class FeedbackStore:
+    """Append-only JSONL file of labelled corrections"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """Durably append one correction; returns the stored record"""
+        record = dict(record, received_at=datetime.now().isoformat())
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return record
+
+    def read_from(self, offset=0):
+        """Complete records written after byte offset, and the offset to continue from"""
+        if not os.path.exists(self.path):
+            return [], offset
+
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # a writer is still appending this line
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records, offset
+
+
+class OnlineUpdater:
+    """Background thread that folds new corrections into the categorizer's linear tier"""
+
+    def __init__(self, categorizer, store, base_data, interval=30.0, feedback_weight=3.0, on_swap=None,
+                 max_corrections=5000):
+        """max_corrections: most recent corrections replayed in each refit, which bounds its cost"""
+        self.categorizer = categorizer
+        self.store = store
+        self.base_data = base_data
+        self.interval = interval
+        self.feedback_weight = feedback_weight
+        self.on_swap = on_swap
+        self.max_corrections = max_corrections
+
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._offset = 0
+        # (featurized row, category) of the most recent corrections
+        self._corrections = deque(maxlen=max_corrections)
+        self._model = None
+        self._vectorizer = None
+        self._base_X = None
+        self._base_labels = None
+
+        self.updates = 0
+        self.corrections_learned = 0
+        self.corrections_skipped = 0
+        self.last_update_at = None
+        self.last_error = None
+
+    def ensure_started(self):
+        """Start the thread in this process (threads do not survive a gunicorn fork)"""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='online-updater', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        # Catch up on the whole store first: a freshly forked worker starts from the base tier
+        while True:
+            try:
+                self.update_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Online update failed: {e}")
+            time.sleep(self.interval)
+
+    def retarget(self, categorizer):
+        """Follow a newly loaded model: its own tier is relearned from the stored corrections"""
+        with self._update_lock:
+            self.categorizer = categorizer
+            self._offset = 0
+            self._corrections.clear()
+            self._vectorizer = None
+            self._model = None
+
+    @staticmethod
+    def _item(record):
+        return record.get('description', ''), record.get('merchant', ''), record.get('amount')
+
+    def _base_matrix(self, categorizer):
+        """Bundled training data in the serving model's feature space (cached per vectorizer)"""
+        vectorizer = categorizer.vectorizer
+        if self._vectorizer is not vectorizer:
+            self._base_X = categorizer.featurize([self._item(item) for item in self.base_data])
+            self._base_labels = [item['category'] for item in self.base_data]
+            self._vectorizer = vectorizer
+            # A new feature space cannot reuse the old weights or featurized corrections
+            self._model = None
+            self._corrections.clear()
+            self._offset = 0
+        return self._base_X, self._base_labels
+
+    def update_once(self):
+        """Learn any new corrections and swap in the refreshed tier; returns True if it swapped"""
+        with self._update_lock:
+            return self._update()
+
+    def _featurize_new(self, records, categorizer, classes):
+        """(row, category) for each usable record, and how many records were unusable"""
+        corrections = []
+        skipped = 0
+        for record in records:
+            category = record.get('category')
+            if category not in classes:
+                skipped += 1
+                continue
+            try:
+                row = categorizer.featurize([self._item(record)])
+            except Exception as e:
+                skipped += 1
+                print(f"⚠️ Skipping a correction that cannot be featurized: {e}")
+                continue
+            corrections.append((row, category))
+        return corrections, skipped
+
+    def _update(self):
+        categorizer = self.categorizer
+        if not categorizer.is_trained:
+            return False
+        base_X, base_labels = self._base_matrix(categorizer)
+        records, offset = self.store.read_from(self._offset)
+        if not records:
+            return False
+
+        classes = [str(c) for c in categorizer.model.classes_]
+        new, skipped = self._featurize_new(records, categorizer, classes)
+        if not new:
+            self.corrections_skipped += skipped
+            self._offset = offset
+            return False
+
+        # Nothing is kept until the refit succeeds, so a failed one is retried as it was
+        window = (list(self._corrections) + new)[-self.max_corrections:]
+        X = sparse.vstack([base_X] + [row for row, _ in window]).tocsr()
+        labels = base_labels + [category for _, category in window]
+        weights = np.concatenate([np.ones(len(base_labels)), np.full(len(window), self.feedback_weight)])
+
+        if self._model is None:
+            self._model = build_linear_model().set_params(warm_start=True)
+        self._model.fit(X, labels, sample_weight=weights)
+
+        tier = LinearTier.from_sklearn(self._model)
+        if [str(c) for c in tier.classes_] != classes:
+            raise ValueError("Corrections and training data do not cover the forest's categories")
+
+        categorizer.fast_model = tier
+        self._corrections.extend(new)
+        self.corrections_skipped += skipped
+        self._offset = offset
+        self.updates += 1
+        self.corrections_learned = len(self._corrections)
+        self.last_update_at = datetime.now().isoformat()
+        self.last_error = None
+        if self.on_swap:
+            self.on_swap()
+        return True
+
+    def stats(self):
+        return {
+            'running': self._thread_pid == os.getpid() and self._thread.is_alive(),
+            'interval_seconds': self.interval,
+            'updates': self.updates,
+            'corrections_learned': self.corrections_learned,
+            'corrections_skipped': self.corrections_skipped,
+            'max_corrections': self.max_corrections,
+            'last_update_at': self.last_update_at,
+            'last_error': self.last_error
+        }
@@ -1,11 +1,61 @@
 # Gunicorn configuration for production deployment
 
+import gc
+import os
+
+# The app factory builds the model and rule engine once, in the master (see preload_app)
+wsgi_app = "app_hybrid:create_app()"
 bind = "0.0.0.0:5000"
 workers = 4
-worker_class = "sync"
+
+# FINSAATHI_SERVING_MODE=gthread gives each worker a pool of request threads, so a
+# slow batch no longer blocks the worker; categorization itself then runs on the
+# bounded inference pool in app_hybrid (FINSAATHI_INFERENCE_*), which answers
+# 429/503 with Retry-After once its queue is full. Sync workers categorize inline.
+# app_hybrid reads the same variables to size the pool and keep its timeout below
+# the worker timeout (FINSAATHI_WORKER_TIMEOUT).
+serving_mode = os.environ.get('FINSAATHI_SERVING_MODE', 'sync')
+if serving_mode == 'gthread':
+    worker_class = "gthread"
+    threads = int(os.environ.get('FINSAATHI_REQUEST_THREADS', '32'))
+else:
+    worker_class = "sync"
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 100
 keepalive = 2
-timeout = 30
-preload_app = True
\ No newline at end of file
+timeout = int(os.environ.get('FINSAATHI_WORKER_TIMEOUT', '30'))
+preload_app = True
+
+# Keep the preloaded app shared between workers (copy-on-write after fork).
+# The cyclic GC writes to the header of every object it scans, which would give
+# each worker a private copy of the model and rule tables. Collection is paused
+# while the app loads; once the master is ready everything loaded is frozen out
+# of the GC and collection resumes, so the master and the workers it forks only
+# collect the objects created after that. Objects the master creates later are
+# frozen again before each fork.
+# Set FINSAATHI_GC_FREEZE=0 to compare against the default behaviour.
+gc_freeze = os.environ.get('FINSAATHI_GC_FREEZE', '1').lower() not in ('0', 'false', 'no')
+
+if gc_freeze:
+    gc.disable()
+
+
+def when_ready(server):
+    if gc_freeze:
+        gc.freeze()
+        gc.enable()
+
+
+def pre_fork(server, worker):
+    if gc_freeze:
+        gc.freeze()
+
+
+# SIGHUP to a worker reloads the ML model in place (see model_registry.py); gunicorn
+# resets worker signal handlers during init, so this is installed afterwards. SIGHUP to
+# the master still restarts the workers, which then load the newest model themselves.
+def post_worker_init(worker):
+    import app_hybrid
+    app_hybrid.create_app()  # already built in the master when the app is preloaded
+    app_hybrid.model_registry.install_signal_handler()
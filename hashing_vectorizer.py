@@ -0,0 +1,136 @@
+"""
+TF-IDF features over hashed n-grams, without a vocabulary
+- Tokens and n-grams are hashed straight to column indices (murmurhash3, the same columns
+  sklearn's HashingVectorizer uses), so transform is stateless and needs no term dict;
+  the idf is one precomputed array
+- Document frequencies are kept per column, so partial_fit can add training text
+  without rebuilding anything
+- Mirrors the TfidfVectorizer settings the categorizer uses: sublinear tf, smooth idf,
+  min_df/max_df pruning (pruned columns get idf 0) and l2-normalized rows
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
+
+
+class HashingTfidfVectorizer:
+    """fit/transform-compatible replacement for TfidfVectorizer in the categorizer"""
+
+    def __init__(self, n_features=2 ** 12, ngram_range=(1, 3), stop_words='english', lowercase=True,
+                 strip_accents='ascii', sublinear_tf=True, min_df=2, max_df=0.8):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = stop_words
+        self.lowercase = lowercase
+        self.strip_accents = strip_accents
+        self.sublinear_tf = sublinear_tf
+        self.min_df = min_df
+        self.max_df = max_df
+
+        # Only used for its analyzer (preprocessing, stop words and n-grams)
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=self.ngram_range,
+            stop_words=stop_words,
+            lowercase=lowercase,
+            strip_accents=strip_accents,
+            alternate_sign=False,
+            norm=None
+        )
+        self.analyzer = self.hasher.build_analyzer()
+        self.n_documents = 0
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.idf_ = np.zeros(n_features, dtype=np.float64)
+
+    def get_params(self):
+        return {
+            'n_features': self.n_features,
+            'ngram_range': self.ngram_range,
+            'stop_words': self.stop_words,
+            'lowercase': self.lowercase,
+            'strip_accents': self.strip_accents,
+            'sublinear_tf': self.sublinear_tf,
+            'min_df': self.min_df,
+            'max_df': self.max_df
+        }
+
+    def set_document_frequency(self, document_frequency, n_documents):
+        """Restore the fitted state, e.g. from an artifact"""
+        self.document_frequency = np.asarray(document_frequency, dtype=np.int64)
+        self.n_documents = int(n_documents)
+        self._update_idf()
+
+    def _update_idf(self):
+        df = self.document_frequency
+        idf = np.log((1 + self.n_documents) / (1 + df)) + 1
+        # Same pruning as TfidfVectorizer: float limits are fractions of the documents seen
+        min_df = self.min_df if isinstance(self.min_df, int) else self.min_df * self.n_documents
+        max_df = self.max_df if isinstance(self.max_df, int) else self.max_df * self.n_documents
+        idf[(df < min_df) | (df > max_df) | (df == 0)] = 0.0
+        self.idf_ = idf
+
+    def column(self, term):
+        """Column of a term, computed as HashingVectorizer(alternate_sign=False) does"""
+        h = murmurhash3_32(term, seed=0)
+        if h == -2147483648:
+            return (2147483647 - (self.n_features - 1)) % self.n_features
+        return abs(h) % self.n_features
+
+    def term_counts(self, documents):
+        """Sparse matrix of hashed term counts, one row per document"""
+        data, indices, indptr = self._count_terms(documents)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
+
+    def _count_terms(self, documents):
+        """CSR (data, indices, indptr) arrays of hashed term counts"""
+        column = self.column
+        indptr = [0]
+        indices = []
+        data = []
+        for document in documents:
+            counts = {}
+            for term in self.analyzer(document):
+                index = column(term)
+                counts[index] = counts.get(index, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        return np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr)
+
+    def partial_fit(self, documents):
+        """Add documents to the document frequencies and refresh the idf"""
+        counts = self.term_counts(documents)
+        self.document_frequency = self.document_frequency + np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        self._update_idf()
+        return self
+
+    def fit(self, documents):
+        self.n_documents = 0
+        self.document_frequency = np.zeros(self.n_features, dtype=np.int64)
+        return self.partial_fit(documents)
+
+    def fit_transform(self, documents):
+        documents = list(documents)
+        return self.fit(documents).transform(documents)
+
+    def transform(self, documents):
+        # Weighting happens on the raw CSR arrays; one matrix is built at the end
+        data, indices, indptr = self._count_terms(documents)
+        if self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1
+        data *= self.idf_[indices]
+
+        # Drop pruned columns, then l2-normalize each row
+        keep = data != 0.0
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))[keep]
+        data = data[keep]
+        indices = indices[keep]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(indptr) - 1))))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(indptr) - 1))
+        norms[norms == 0.0] = 1.0
+        data /= norms[rows]
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
@@ -0,0 +1,95 @@
+"""
+Keyword, merchant and amount features for a whole batch as one sparse block
+- The engineered features extract_keyword_features writes as text tokens, as numeric
+  columns instead: the categorizer hstacks the block with the TF-IDF matrix
+  (feature_mode 'block'), so the tokens are never generated and re-tokenized
+- Keyword hits per category come from one Aho-Corasick pass over each text
+  (MultiPatternMatcher) rather than a substring scan per keyword
+- Amount buckets and typical-range flags are computed over the batch's amount array
+  with np.digitize and comparisons
+"""
+
+import numpy as np
+from scipy import sparse
+
+from multi_pattern_matcher import MultiPatternMatcher
+
+# Upper bounds of amount_very_small, amount_small, amount_medium and amount_large
+AMOUNT_BINS = (50, 200, 1000, 5000)
+AMOUNT_BUCKETS = ('very_small', 'small', 'medium', 'large', 'very_large')
+
+# Inclusive typical-amount ranges (None: no upper bound, lower bound exclusive)
+AMOUNT_RANGES = {
+    'subscription_range': (100, 1000),
+    'utility_range': (200, 3000),
+    'grocery_range': (500, 5000),
+    'major_purchase': (10000, None)
+}
+
+# Keyword counts are capped like the category_<name>_count_<n> tokens, then scaled to (0, 1]
+MAX_KEYWORD_COUNT = 5
+
+
+class KeywordFeatureBlock:
+    """Stateless transform from cleaned (text, merchant, amount) batches to a CSR block"""
+
+    def __init__(self, category_keywords, merchants):
+        categories = list(category_keywords)
+        merchant_types = sorted(set(merchants.values()))
+
+        # Column layout: keyword count per category, merchant types, amount buckets, ranges
+        self.columns = (
+            [f"category_{category}_count" for category in categories]
+            + [f"merchant_type_{merchant_type}" for merchant_type in merchant_types]
+            + [f"amount_{bucket}" for bucket in AMOUNT_BUCKETS]
+            + list(AMOUNT_RANGES)
+        )
+        self.n_features = len(self.columns)
+
+        # A keyword listed under several categories counts towards each of them
+        self._keyword_columns = {}
+        for column, category in enumerate(categories):
+            for keyword in category_keywords[category]:
+                self._keyword_columns.setdefault(keyword, []).append(column)
+        self._merchant_columns = {
+            key: len(categories) + merchant_types.index(merchant_type)
+            for key, merchant_type in merchants.items()
+        }
+        self._keywords = MultiPatternMatcher(self._keyword_columns)
+        self._merchants = MultiPatternMatcher(self._merchant_columns)
+        self._bucket_start = len(categories) + len(merchant_types)
+        self._range_start = self._bucket_start + len(AMOUNT_BUCKETS)
+
+    def transform(self, texts, merchants, amounts):
+        """Block for a batch: texts and merchants cleaned as by clean_text, amounts may be None"""
+        rows, columns, values = [], [], []
+
+        for row, (text, merchant) in enumerate(zip(texts, merchants)):
+            counts = {}
+            for keyword in self._keywords.find_all(text):
+                for column in self._keyword_columns[keyword]:
+                    counts[column] = counts.get(column, 0) + 1
+            for column, count in counts.items():
+                rows.append(row)
+                columns.append(column)
+                values.append(min(count, MAX_KEYWORD_COUNT) / MAX_KEYWORD_COUNT)
+            if merchant:
+                for column in {self._merchant_columns[key] for key in self._merchants.find_all(merchant)}:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(1.0)
+
+        amounts = np.array([np.nan if amount is None else amount for amount in amounts], dtype=np.float64)
+        known = np.flatnonzero(~np.isnan(amounts))
+        parts = [(np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp), np.array(values))]
+        buckets = np.digitize(amounts[known], AMOUNT_BINS)
+        parts.append((known, self._bucket_start + buckets, np.ones(len(known))))
+        for offset, (low, high) in enumerate(AMOUNT_RANGES.values()):
+            if high is None:
+                hit = known[amounts[known] > low]
+            else:
+                hit = known[(amounts[known] >= low) & (amounts[known] <= high)]
+            parts.append((hit, np.full(len(hit), self._range_start + offset), np.ones(len(hit))))
+
+        rows, columns, values = (np.concatenate(part) for part in zip(*parts))
+        return sparse.csr_matrix((values, (rows, columns)), shape=(len(texts), self.n_features))
@@ -0,0 +1,46 @@
+"""
+Fast linear model tier served in front of the random forest
+- Multinomial logistic regression on the same TF-IDF features as the forest
+- Scoring is one sparse-dense product and a softmax over plain coef/intercept arrays,
+  which model_artifact stores as .npy files next to the forest
+- Rows whose top probability is below the escalation threshold go on to the forest
+"""
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+
+def build_linear_model():
+    """Unfitted logistic regression with the fast tier's hyperparameters"""
+    return LogisticRegression(C=10.0, max_iter=2000, class_weight='balanced')
+
+
+class LinearTier:
+    """predict_proba-compatible view of a fitted multinomial LogisticRegression"""
+
+    def __init__(self, coef, intercept, classes):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = self.coef.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if len(model.classes_) < 3:
+            raise ValueError("The linear tier needs at least three categories")
+        return cls(model.coef_, model.intercept_, model.classes_)
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef.T) + self.intercept
+
+    def predict_proba(self, X):
+        """Softmax of the class scores, like LogisticRegression.predict_proba (multinomial)"""
+        scores = self.decision_function(X)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -22,14 +22,16 @@ def load_hybrid_ai(model_path='models/financial_analyst_ai_latest.pkl'):
         print(f"❌ Error loading model: {e}")
         return None
 
-def load_ml_categorizer(model_path='models/enhanced_ml_categorizer_latest.pkl'):
-    """Load the ML categorizer from pickle"""
+def load_ml_categorizer(model_path='models/enhanced_ml_categorizer_latest'):
+    """Load the ML categorizer from its artifact directory"""
     try:
         if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                model_data = pickle.load(f)
+            from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+            categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+            if not categorizer.load_model():
+                return None
             print(f"✅ Loaded ML Categorizer from {model_path}")
-            return model_data.get('categorizer')
+            return categorizer
         else:
             print(f"❌ Model file not found: {model_path}")
             return None
@@ -0,0 +1,248 @@
+"""
+Per-stage latency histograms and categorization counters shared by all gunicorn workers
+- Values live in an anonymous shared mmap created when the app is preloaded, so every
+  forked worker writes to the same memory and /metrics reports the whole server
+- Each process records into its own slot of the mapping under a lock of its own, so no
+  lock is shared between processes: a worker killed mid-update cannot block the others.
+  Reads add up the slots
+- A process claims a slot on its first update; slots of dead processes are reused with
+  their counts, so totals never go backwards when gunicorn replaces a worker
+- Rendered in the Prometheus text exposition format
+"""
+
+import bisect
+import contextlib
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+
+# Upper bounds in seconds; one more bucket counts everything above the last bound (+Inf)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Seconds a process waits for the slot table, and waits before trying again after failing
+# to claim a slot; its updates are dropped until it has one
+CLAIM_TIMEOUT = 0.5
+CLAIM_RETRY_SECONDS = 30.0
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedMetrics:
+    """Fixed set of histograms and counters in shared memory
+
+    Histograms are per (route, stage), method counters per (route, method); counters
+    maps each named counter to its help text. Everything is declared up front
+    because the shared mapping cannot grow after fork. max_processes is how many
+    processes can record at once (the gunicorn workers alive at the same time).
+    """
+
+    def __init__(self, routes, stages, methods, counters=None, buckets=DEFAULT_BUCKETS, max_processes=64):
+        self.routes = tuple(routes)
+        self.stages = tuple(stages)
+        self.methods = tuple(methods)
+        self.counter_help = dict(counters or {})
+        self.buckets = tuple(buckets)
+        self.max_processes = max_processes
+
+        # Each histogram: one slot per bucket, +Inf, then sum and count
+        self._histogram_width = len(self.buckets) + 3
+        self._histograms = {}
+        for route in self.routes:
+            for stage in self.stages:
+                self._histograms[(route, stage)] = len(self._histograms) * self._histogram_width
+        counters_start = len(self._histograms) * self._histogram_width
+        self._counters = {}
+        for route in self.routes:
+            for method in self.methods:
+                self._counters[(route, method)] = counters_start + len(self._counters)
+        named_start = counters_start + len(self._counters)
+        self._named = {name: named_start + i for i, name in enumerate(self.counter_help)}
+        self._size = max(named_start + len(self._named), 1)
+
+        # The owner pid of each slot (0: never claimed), then one block of values per slot
+        self._mmap = mmap.mmap(-1, max_processes * (1 + self._size) * 8)
+        view = memoryview(self._mmap).cast('d')
+        self._owners = view[:max_processes]
+        self._slots = [
+            view[max_processes + i * self._size:max_processes + (i + 1) * self._size]
+            for i in range(max_processes)
+        ]
+        # Guards the owner table only, and is never waited on without a timeout
+        self._claim_lock = multiprocessing.Lock()
+
+        # This process's slot; reset in a forked child on its first update
+        self._pid = None
+        self._pid_lock = threading.Lock()
+        self._lock = None
+        self._values = None
+        self._retry_at = 0.0
+        self.dropped = 0
+
+    def timer(self, route):
+        """Start timing one request on route"""
+        return RequestTimer(self, route)
+
+    def _local_slot(self):
+        """Values of this process's slot, or None while it has none"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._pid_lock:
+                if self._pid != pid:
+                    self._lock = threading.Lock()
+                    self._values = None
+                    self._retry_at = 0.0
+                    self._pid = pid
+        if self._values is None and time.monotonic() >= self._retry_at:
+            with self._lock:
+                if self._values is None:
+                    self._values = self._claim(pid)
+        return self._values
+
+    def _claim(self, pid):
+        """A free slot, or the slot of a dead process, now owned by pid"""
+        if self._claim_lock.acquire(timeout=CLAIM_TIMEOUT):
+            try:
+                owners = self._owners.tolist()
+                for i, owner in enumerate(owners):
+                    if not owner:
+                        break
+                else:
+                    i = next((i for i, owner in enumerate(owners) if not _process_alive(int(owner))), None)
+                if i is not None:
+                    self._owners[i] = pid
+                    return self._slots[i]
+            finally:
+                self._claim_lock.release()
+        self._retry_at = time.monotonic() + CLAIM_RETRY_SECONDS
+        print(f"⚠️ Metrics: process {pid} could not claim a slot, dropping its updates "
+              f"for {CLAIM_RETRY_SECONDS:.0f}s")
+        return None
+
+    def _claimed(self):
+        return [values for owner, values in zip(self._owners.tolist(), self._slots) if owner]
+
+    def record(self, route, seconds, methods):
+        """Add one observation per stage in seconds and the method counts of one request"""
+        values = self._local_slot()
+        if values is None:
+            self.dropped += 1
+            return
+        with self._lock:
+            for stage, elapsed in seconds.items():
+                offset = self._histograms[(route, stage)]
+                values[offset + bisect.bisect_left(self.buckets, elapsed)] += 1
+                values[offset + len(self.buckets) + 1] += elapsed
+                values[offset + len(self.buckets) + 2] += 1
+            for method, count in methods.items():
+                key = (route, method)
+                if key in self._counters:
+                    values[self._counters[key]] += count
+
+    def increment(self, name, amount=1):
+        """Add amount to a named counter"""
+        offset = self._named[name]
+        values = self._local_slot()
+        if values is None:
+            self.dropped += 1
+            return
+        with self._lock:
+            values[offset] += amount
+
+    def value(self, name):
+        offset = self._named[name]
+        return int(sum(values[offset] for values in self._claimed()))
+
+    def reset(self):
+        for values in self._slots:
+            for i in range(self._size):
+                values[i] = 0
+
+    def totals(self):
+        """Every value summed over the processes' slots"""
+        totals = [0.0] * self._size
+        for values in self._claimed():
+            totals = [total + value for total, value in zip(totals, values.tolist())]
+        return totals
+
+    def render(self, prefix='finsaathi'):
+        """Prometheus text exposition of every histogram and counter"""
+        values = self.totals()
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per request in each categorization stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        n_buckets = len(self.buckets)
+        for (route, stage), offset in self._histograms.items():
+            labels = f'route="{route}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values[offset:offset + n_buckets + 1]):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{bound}"}} {int(cumulative)}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {values[offset + n_buckets + 1]!r}")
+            lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {int(values[offset + n_buckets + 2])}")
+
+        lines.append(f"# HELP {prefix}_categorizations_total Categorizations by the method whose result was returned")
+        lines.append(f"# TYPE {prefix}_categorizations_total counter")
+        for (route, method), offset in self._counters.items():
+            lines.append(f'{prefix}_categorizations_total{{route="{route}",method="{method}"}} {int(values[offset])}')
+
+        for name, offset in self._named.items():
+            lines.append(f"# HELP {prefix}_{name}_total {self.counter_help[name]}")
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {int(values[offset])}")
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTimer:
+    """Accumulates stage times and winning methods for one request, then records them once"""
+
+    def __init__(self, metrics, route):
+        self.metrics = metrics
+        self.route = route
+        self.seconds = {}
+        self.methods = {}
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def count_method(self, method):
+        self.methods[method] = self.methods.get(method, 0) + 1
+
+    def finish(self):
+        self.seconds['total'] = time.perf_counter() - self.started
+        self.metrics.record(self.route, self.seconds, self.methods)
+
+
+class NullTimer:
+    """Stand-in for callers that are not timed"""
+
+    def stage(self, name):
+        return _NO_STAGE
+
+    def count_method(self, method):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = NullTimer()
@@ -0,0 +1,392 @@
+"""
+Compact, versioned on-disk format for the trained expense categorizer
+- manifest.json: format version, training metadata, estimator params and a size and sha256
+  per file; loading checks the sizes, the checksums only when asked to (verify=True)
+- TF-IDF vocabulary and idf stored as plain .npy arrays (no pickled vectorizer or stop-word set);
+  the hashing vectorizer needs only its document frequencies
+- Random forest stored as concatenated node arrays that np.load can memory-map, so
+  every worker maps the same file pages through the OS page cache; FlatForest's
+  single-row tables (slot_*.npy) are stored too, so they are mapped rather than rebuilt
+  in every process
+- Optional linear fast tier stored as its coef/intercept arrays
+- The feature mode (keyword features as text tokens or as a block of extra columns)
+  and the block's column names are recorded in the manifest
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+from hashing_vectorizer import HashingTfidfVectorizer
+from linear_tier import LinearTier
+
+ARTIFACT_FORMAT = 'finsaathi-expense-categorizer'
+# Version 2 added the hashing vectorizer and version 3 the keyword feature block; an
+# artifact is written with the lowest version that describes it, so older builds
+# keep reading TF-IDF text-mode artifacts (version 1)
+ARTIFACT_FORMAT_VERSION = 3
+MANIFEST_NAME = 'manifest.json'
+
+# Forest arrays, concatenated over all trees. Child indices are global
+# (tree offset already added) so inference can walk them without fix-ups.
+FOREST_ARRAYS = {
+    'children_left': np.int32,
+    'children_right': np.int32,
+    'feature': np.int32,
+    'threshold': np.float64,
+    'value': np.float64,
+    'impurity': np.float64,
+    'n_node_samples': np.int64,
+    'weighted_n_node_samples': np.float64,
+    'missing_go_to_left': np.uint8,
+}
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact directory is missing, corrupt or from an unsupported version"""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_params(params):
+    """Estimator params as JSON values; numpy dtypes become their names"""
+    encoded = {}
+    for key, value in params.items():
+        if isinstance(value, type) and issubclass(value, np.generic):
+            value = {'dtype': np.dtype(value).name}
+        elif isinstance(value, tuple):
+            value = list(value)
+        encoded[key] = value
+    return encoded
+
+
+def _params_from_json(params, tuple_keys=()):
+    decoded = {}
+    for key, value in params.items():
+        if isinstance(value, dict) and 'dtype' in value:
+            value = np.dtype(value['dtype']).type
+        elif key in tuple_keys and isinstance(value, list):
+            value = tuple(value)
+        decoded[key] = value
+    return decoded
+
+
+def forest_to_arrays(forest):
+    """Flatten a fitted RandomForestClassifier into concatenated node arrays"""
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    offsets = np.zeros(len(trees) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([tree.node_count for tree in trees])
+
+    arrays = {name: [] for name in FOREST_ARRAYS}
+    for tree, offset in zip(trees, offsets[:-1]):
+        for side in ('children_left', 'children_right'):
+            children = getattr(tree, side)
+            arrays[side].append(np.where(children >= 0, children + offset, -1))
+        arrays['feature'].append(tree.feature)
+        arrays['threshold'].append(tree.threshold)
+        arrays['value'].append(tree.value[:, 0, :])
+        arrays['impurity'].append(tree.impurity)
+        arrays['n_node_samples'].append(tree.n_node_samples)
+        arrays['weighted_n_node_samples'].append(tree.weighted_n_node_samples)
+        arrays['missing_go_to_left'].append(tree.missing_go_to_left)
+
+    flat = {
+        name: np.ascontiguousarray(np.concatenate(parts), dtype=FOREST_ARRAYS[name])
+        for name, parts in arrays.items()
+    }
+    flat['tree_offsets'] = offsets
+    flat['tree_max_depth'] = np.array([tree.max_depth for tree in trees], dtype=np.int64)
+    return flat
+
+
+def row_engine_arrays(arrays):
+    """Single-row tables for FlatForest, indexed by slot = node * 2 + (value > threshold)
+
+    Both slots of a node carry its split, and each slot holds the slot base (child * 2)
+    of the node it leads to. Leaves split on feature 0 at +inf, so they always take their
+    own self-loop. 'leaf_proba' is only included when the stored leaf values are weighted
+    counts (sklearn < 1.4) rather than class fractions.
+    """
+    children_left = np.asarray(arrays['children_left'])
+    is_leaf = children_left < 0
+    nodes = np.arange(len(is_leaf), dtype=np.int64)
+    children = np.empty((len(is_leaf), 2), dtype=np.int64)
+    children[:, 0] = np.where(is_leaf, nodes, children_left)
+    children[:, 1] = np.where(is_leaf, nodes, arrays['children_right'])
+    tables = {
+        'slot_next': children.ravel() * 2,
+        'slot_feature': np.repeat(np.where(is_leaf, 0, arrays['feature']), 2).astype(np.int64),
+        'slot_threshold': np.repeat(np.where(is_leaf, np.inf, arrays['threshold']), 2),
+    }
+    value = np.asarray(arrays['value'])
+    if not np.allclose(value.sum(axis=1), 1.0):
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        tables['leaf_proba'] = value / normalizer
+    return tables
+
+
+def forest_from_arrays(arrays, forest_params, tree_params, classes, n_features, max_features):
+    """Rebuild a RandomForestClassifier from the arrays written by forest_to_arrays
+
+    Goes through sklearn's private Tree state (NODE_DTYPE, __setstate__), so arrays are
+    only turned back into trees by the scikit-learn version that wrote them.
+    """
+    classes = np.asarray(classes)
+    n_classes = len(classes)
+    offsets = arrays['tree_offsets']
+
+    forest = RandomForestClassifier(**forest_params)
+    estimators = []
+    for i in range(len(offsets) - 1):
+        start, end = int(offsets[i]), int(offsets[i + 1])
+
+        nodes = np.zeros(end - start, dtype=NODE_DTYPE)
+        for side, field in (('children_left', 'left_child'), ('children_right', 'right_child')):
+            children = np.asarray(arrays[side][start:end], dtype=np.int64)
+            nodes[field] = np.where(children >= 0, children - start, -1)
+        nodes['feature'] = arrays['feature'][start:end]
+        nodes['threshold'] = arrays['threshold'][start:end]
+        nodes['impurity'] = arrays['impurity'][start:end]
+        nodes['n_node_samples'] = arrays['n_node_samples'][start:end]
+        nodes['weighted_n_node_samples'] = arrays['weighted_n_node_samples'][start:end]
+        nodes['missing_go_to_left'] = arrays['missing_go_to_left'][start:end]
+
+        tree = Tree(n_features, np.array([n_classes], dtype=np.intp), 1)
+        tree.__setstate__({
+            'max_depth': int(arrays['tree_max_depth'][i]),
+            'node_count': end - start,
+            'nodes': nodes,
+            'values': np.ascontiguousarray(arrays['value'][start:end], dtype=np.float64)[:, np.newaxis, :],
+        })
+
+        estimator = DecisionTreeClassifier(**tree_params)
+        estimator.tree_ = tree
+        estimator.n_features_in_ = n_features
+        estimator.n_outputs_ = 1
+        estimator.classes_ = classes
+        estimator.n_classes_ = n_classes
+        estimator.max_features_ = max_features
+        estimators.append(estimator)
+
+    forest.estimators_ = estimators
+    forest.estimator_ = DecisionTreeClassifier(**tree_params)
+    forest.classes_ = classes
+    forest.n_classes_ = n_classes
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = n_features
+    return forest
+
+
+def save_artifact(categorizer, directory):
+    """Write a trained ImprovedExpenseCategorizer to directory in the artifact format"""
+    if not categorizer.is_trained:
+        raise ArtifactError("Cannot save an untrained categorizer")
+
+    vectorizer = categorizer.vectorizer
+    forest = categorizer.model
+    if not isinstance(forest, RandomForestClassifier):
+        raise ArtifactError("Only a fitted RandomForestClassifier can be exported; "
+                            "a model served from an artifact is already saved")
+
+    arrays = forest_to_arrays(forest)
+    arrays.update(row_engine_arrays(arrays))
+    vectorizer_info = {
+        'class': type(vectorizer).__name__,
+        'params': _json_params(vectorizer.get_params())
+    }
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        arrays['document_frequency'] = np.asarray(vectorizer.document_frequency, dtype=np.int64)
+        vectorizer_info['n_documents'] = vectorizer.n_documents
+        format_version = 2
+    else:
+        terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+        arrays['vocabulary'] = terms.astype(str)
+        arrays['idf'] = np.asarray(vectorizer.idf_, dtype=np.float64)
+        format_version = 1
+
+    fast_model = getattr(categorizer, 'fast_model', None)
+    if fast_model is not None:
+        arrays['linear_coef'] = np.ascontiguousarray(fast_model.coef, dtype=np.float64)
+        arrays['linear_intercept'] = np.ascontiguousarray(fast_model.intercept, dtype=np.float64)
+
+    feature_mode = getattr(categorizer, 'feature_mode', 'text')
+    if feature_mode != 'text':
+        format_version = 3
+
+    tree_params = forest.estimators_[0].get_params()
+    tree_params.pop('random_state', None)
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.artifact-', dir=parent)
+    try:
+        files = {}
+        for name, array in arrays.items():
+            filename = f"{name}.npy"
+            path = os.path.join(staging, filename)
+            np.save(path, array, allow_pickle=False)
+            files[filename] = {'sha256': _sha256(path), 'bytes': os.path.getsize(path)}
+
+        manifest = {
+            'format': ARTIFACT_FORMAT,
+            'format_version': format_version,
+            'created_at': datetime.now().isoformat(),
+            'sklearn_version': sklearn.__version__,
+            'numpy_version': np.__version__,
+            'training_info': categorizer.training_info,
+            'categories': categorizer.categories,
+            'classes': [str(c) for c in forest.classes_],
+            'vectorizer': vectorizer_info,
+            'features': {
+                'mode': feature_mode,
+                'columns': categorizer.feature_columns() if feature_mode != 'text' else None
+            },
+            'forest': {
+                'params': _json_params(forest.get_params()),
+                'tree_params': _json_params(tree_params),
+                'n_trees': len(forest.estimators_),
+                'n_features': int(forest.n_features_in_),
+                'max_features': int(forest.estimators_[0].max_features_),
+                'n_nodes': int(arrays['tree_offsets'][-1])
+            },
+            'linear': {
+                'n_features': int(fast_model.n_features_in_)
+            } if fast_model is not None else None,
+            'files': files
+        }
+        with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished directory into place so readers never see a partial artifact
+        if os.path.exists(directory):
+            retired = staging + '.old'
+            os.replace(directory, retired)
+            os.replace(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read {path}: {e}")
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactError(f"{directory} is not a {ARTIFACT_FORMAT} artifact")
+    if manifest.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(
+            f"{directory} has format version {manifest['format_version']}, "
+            f"this build supports up to {ARTIFACT_FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def load_arrays(directory, manifest, mmap=True, verify=False):
+    """Load every array listed in the manifest, memory-mapped and read-only when mmap is set
+
+    Each file's size is checked against the manifest; verify also rereads every file
+    to check its sha256, which costs a full read of the artifact.
+    """
+    arrays = {}
+    for filename, info in manifest['files'].items():
+        path = os.path.join(directory, filename)
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            raise ArtifactError(f"Cannot read {path}: {e}")
+        if size != info['bytes']:
+            raise ArtifactError(f"Size mismatch for {path}: {size} bytes, manifest lists {info['bytes']}")
+        if verify and _sha256(path) != info['sha256']:
+            raise ArtifactError(f"Checksum mismatch for {path}")
+        # Unicode arrays cannot be mapped usefully; they are copied into memory
+        mode = 'r' if mmap and filename != 'vocabulary.npy' else None
+        arrays[filename[:-len('.npy')]] = np.load(path, mmap_mode=mode, allow_pickle=False)
+    return arrays
+
+
+def load_artifact(directory, mmap=True, verify=False, build_forest=True):
+    """Load an artifact directory into a fitted vectorizer and forest
+
+    Returns a dict with 'vectorizer', 'model', 'fast_model' (a LinearTier, or None when
+    the artifact has no fast tier), 'feature_mode', 'feature_columns', 'categories',
+    'training_info', 'manifest' and the raw 'arrays' (memory-mapped when mmap is set).
+    With build_forest=False 'model' is None and callers serve from 'arrays'. Building the
+    sklearn forest needs the scikit-learn version that wrote the artifact; on a mismatch
+    ArtifactError is raised and callers load the model pickle instead.
+    """
+    manifest = read_manifest(directory)
+    if build_forest and manifest.get('sklearn_version') != sklearn.__version__:
+        raise ArtifactError(
+            f"{directory} was written by scikit-learn {manifest.get('sklearn_version')}, "
+            f"running {sklearn.__version__}; its trees cannot be rebuilt, load the model pickle"
+        )
+    arrays = load_arrays(directory, manifest, mmap=mmap, verify=verify)
+
+    vectorizer_info = manifest['vectorizer']
+    vectorizer_params = _params_from_json(vectorizer_info['params'], tuple_keys=('ngram_range',))
+    if vectorizer_info['class'] == 'HashingTfidfVectorizer':
+        vectorizer = HashingTfidfVectorizer(**vectorizer_params)
+        vectorizer.set_document_frequency(arrays['document_frequency'], vectorizer_info['n_documents'])
+    else:
+        vectorizer = TfidfVectorizer(**vectorizer_params)
+        vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(arrays['vocabulary'])}
+        vectorizer.idf_ = np.array(arrays['idf'])
+
+    model = None
+    if build_forest:
+        forest_info = manifest['forest']
+        model = forest_from_arrays(
+            arrays,
+            _params_from_json(forest_info['params']),
+            _params_from_json(forest_info['tree_params']),
+            manifest['classes'],
+            forest_info['n_features'],
+            forest_info['max_features']
+        )
+
+    fast_model = None
+    if manifest.get('linear'):
+        fast_model = LinearTier(arrays['linear_coef'], arrays['linear_intercept'], manifest['classes'])
+
+    # Artifacts written before feature modes existed append keyword tokens to the text
+    features = manifest.get('features') or {'mode': 'text', 'columns': None}
+
+    return {
+        'vectorizer': vectorizer,
+        'model': model,
+        'fast_model': fast_model,
+        'feature_mode': features['mode'],
+        'feature_columns': features['columns'],
+        'categories': manifest['categories'],
+        'training_info': manifest.get('training_info', {}),
+        'manifest': manifest,
+        'arrays': arrays
+    }
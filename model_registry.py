@@ -0,0 +1,169 @@
+"""
+Hot reload of the served ML model without restarting gunicorn workers
+- ModelRegistry holds the categorizer a worker serves and replaces it when the model at
+  its path changes: polled every interval seconds, or on demand (signal or admin endpoint)
+- A candidate is loaded and validated in the background on a labelled smoke corpus;
+  a model that fails to load or scores below min_accuracy is never served
+- The swap is one reference assignment: requests that already took the old categorizer
+  finish on it (artifact arrays stay mapped after save_artifact retires the directory)
+"""
+
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+from model_artifact import MANIFEST_NAME
+
+
+def model_fingerprint(path):
+    """Identity of the model at path, or None when there is none
+
+    save_artifact swaps in a new directory, so the manifest's inode changes on every save.
+    """
+    target = os.path.join(path, MANIFEST_NAME) if os.path.isdir(path) else path
+    try:
+        stat = os.stat(target)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class ModelRegistry:
+    """Current categorizer of this worker, plus the background reloader that replaces it"""
+
+    def __init__(self, path, build, smoke_corpus, min_accuracy=0.7, interval=0.0, on_swap=None):
+        """
+        build: callable(path) returning an unloaded categorizer configured like the current one
+        smoke_corpus: dicts with description, merchant, amount and the expected category
+        interval: seconds between checks of path; 0 only reloads when asked to
+        on_swap: callable(categorizer) run after each swap
+        """
+        self.path = path
+        self.build = build
+        self.smoke_corpus = smoke_corpus
+        self.min_accuracy = min_accuracy
+        self.interval = interval
+        self.on_swap = on_swap
+
+        self.current = None
+        # Taken before the first load, so a model written while it loads is still picked up
+        self._fingerprint = model_fingerprint(path)
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._forced = False
+        self._thread = None
+        self._thread_pid = None
+
+        self.generation = 0
+        self.last_reload = None
+
+    def adopt(self, categorizer):
+        """Serve a categorizer loaded at startup
+
+        One trained at startup has just been saved to path by this process; that file is
+        the model being served, so workers must not reload a private copy of it.
+        """
+        self.current = categorizer
+        if categorizer.model_source == 'trained':
+            self._fingerprint = model_fingerprint(self.path)
+
+    def validate(self, categorizer):
+        """None if the candidate may be served, otherwise the reason it may not"""
+        if not categorizer.is_trained:
+            return "model is not trained"
+        items = [(item['description'], item.get('merchant', ''), item.get('amount')) for item in self.smoke_corpus]
+        predictions = categorizer.categorize_batch(items)
+        unknown = {p['primary_category'] for p in predictions} - set(categorizer.categories)
+        if unknown:
+            return f"predicted unknown categories {sorted(unknown)}"
+        correct = sum(p['primary_category'] == item['category'] for p, item in zip(predictions, self.smoke_corpus))
+        accuracy = correct / len(self.smoke_corpus)
+        if accuracy < self.min_accuracy:
+            return f"smoke accuracy {accuracy:.3f} is below {self.min_accuracy}"
+        return None
+
+    def reload(self, force=False):
+        """Load, validate and swap in the model at path if it changed (or when forced)
+
+        Returns a status dict, also kept as last_reload.
+        """
+        with self._reload_lock:
+            fingerprint = model_fingerprint(self.path)
+            if fingerprint is None:
+                return self._status(False, f"no model at {self.path}")
+            if fingerprint == self._fingerprint and not force:
+                return {'swapped': False, 'reason': 'unchanged'}
+
+            started = time.perf_counter()
+            candidate = self.build(self.path)
+            try:
+                if not candidate.load_model():
+                    error = "model failed to load"
+                else:
+                    error = self.validate(candidate)
+            except Exception as e:
+                error = str(e)
+            # A rejected model is not retried until the file changes again
+            self._fingerprint = fingerprint
+            if error:
+                print(f"⚠️ Keeping the current model, {self.path} rejected: {error}")
+                return self._status(False, error, started)
+
+            self.current = candidate
+            self.generation += 1
+            if self.on_swap:
+                self.on_swap(candidate)
+            print(f"✅ Model reloaded from {self.path} (generation {self.generation})")
+            return self._status(True, None, started)
+
+    def _status(self, swapped, error, started=None):
+        self.last_reload = {
+            'swapped': swapped,
+            'error': error,
+            'at': datetime.now().isoformat(),
+            'seconds': time.perf_counter() - started if started is not None else None
+        }
+        return self.last_reload
+
+    def request_reload(self, *_):
+        """Wake the reloader for a forced reload; safe to use as a signal handler"""
+        self._forced = True
+        self._wake.set()
+
+    def install_signal_handler(self, signum=signal.SIGHUP):
+        """Reload on signum; must be called from the worker's main thread"""
+        signal.signal(signum, self.request_reload)
+
+    def ensure_started(self):
+        """Start the reloader in this process (threads do not survive a gunicorn fork)"""
+        if self._thread_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='model-reloader', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        # Check once at start: a worker forked from an old preload picks up the newest model
+        while True:
+            force, self._forced = self._forced, False
+            try:
+                self.reload(force=force)
+            except Exception as e:
+                print(f"⚠️ Model reload failed: {e}")
+            self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'generation': self.generation,
+            'watch_interval_seconds': self.interval,
+            'reloader_running': self._thread_pid == os.getpid() and self._thread.is_alive(),
+            'last_reload': self.last_reload
+        }
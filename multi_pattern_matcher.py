@@ -0,0 +1,86 @@
+"""
+Aho-Corasick multi-pattern matcher for the rule engine
+- Compiles a fixed set of plain substrings once into a deterministic automaton
+- Reports every pattern occurring in a text with a single pass over it
+- The transition table is one read-only int32 buffer rather than a dict per node,
+  so forked workers keep sharing it instead of dirtying it with refcount updates
+- numpy is imported when the first matcher is built, so importing the rule engine is free
+"""
+
+from collections import deque
+
+
+class MultiPatternMatcher:
+    """Finds all occurrences of many literal substrings in one scan"""
+
+    def __init__(self, patterns):
+        import numpy as np
+
+        patterns = [pattern for pattern in dict.fromkeys(patterns) if pattern]
+
+        # The automaton runs over UTF-8 bytes; bytes that appear in no pattern
+        # share code 0, which always leads back towards the root
+        encoded = [pattern.encode('utf-8') for pattern in patterns]
+        byte_codes = bytearray(256)
+        for code, byte in enumerate(sorted({byte for data in encoded for byte in data}), 1):
+            byte_codes[byte] = code
+        width = max(byte_codes) + 1
+
+        # goto[node] maps a byte code to the next trie node
+        goto = [{}]
+        outputs = [[]]
+
+        for pattern, data in zip(patterns, encoded):
+            node = 0
+            for code in data.translate(byte_codes):
+                next_node = goto[node].get(code)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][code] = next_node
+                    goto.append({})
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(pattern)
+
+        # Breadth-first pass: resolve failure links and fold them into a full
+        # transition table so matching never has to walk the failure chain
+        fail = [0] * len(goto)
+        table = np.zeros((len(goto), width), dtype=np.int32)
+        for code, child in goto[0].items():
+            table[0, code] = child
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            table[node] = table[fail[node]]
+            for code, child in goto[node].items():
+                table[node, code] = child
+            outputs[node] = outputs[node] + outputs[fail[node]]
+
+            for code, child in goto[node].items():
+                fail[child] = int(table[fail[node], code]) if node else 0
+                queue.append(child)
+
+        table = table.ravel()
+        table.flags.writeable = False
+
+        self._byte_codes = bytes(byte_codes)
+        self._width = width
+        self._table = table
+        self._transitions = memoryview(table)
+        self._outputs = {node: tuple(found) for node, found in enumerate(outputs) if found}
+
+    def find_all(self, text):
+        """Return the set of patterns that occur anywhere in text"""
+        found = set()
+        node = 0
+        transitions = self._transitions
+        width = self._width
+        outputs = self._outputs
+
+        for code in text.encode('utf-8', 'surrogatepass').translate(self._byte_codes):
+            node = transitions[node * width + code]
+            if node in outputs:
+                found.update(outputs[node])
+
+        return found
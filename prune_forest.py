@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Smaller variants of the trained random forest, with an accuracy/latency tradeoff report
+- top<k>: the k trees with the best out-of-bag accuracy (each tree scored on the training
+  rows its bootstrap sample left out)
+- depth<d>: every tree cut at depth d; a cut node becomes a leaf with its class distribution
+- distilled<k>x<d>: a k-tree forest of depth d fitted to the full forest's predictions on the
+  training rows and token-dropout copies of them
+- Per variant: stratified k-fold accuracy on ENHANCED_TRAINING_DATA (vectorizer, forest and
+  pruning all refitted per fold), artifact size, load time and p50/p99 categorize_expense latency
+- --min-accuracy picks the smallest artifact that meets the bar; --output saves it
+
+Usage: python prune_forest.py [--model enhanced_expense_model.pkl] [--top-k 25,50,100] [--depths 6,10]
+       python prune_forest.py --min-accuracy 0.75 --output models/enhanced_ml_categorizer_pruned
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import get_enhanced_training_data, training_data_digest
+from model_artifact import FOREST_ARRAYS, forest_from_arrays, forest_to_arrays
+
+# Node markers in sklearn's tree arrays
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def tree_oob_accuracy(forest, X, y):
+    """Accuracy of each tree on the rows of X (the forest's training rows) outside its bootstrap sample"""
+    y = np.asarray(y)
+    scores = np.zeros(len(forest.estimators_))
+    for i, (tree, in_bag) in enumerate(zip(forest.estimators_, forest.estimators_samples_)):
+        out_of_bag = np.ones(len(y), dtype=bool)
+        out_of_bag[in_bag] = False
+        if out_of_bag.any():
+            # Trees inside a forest predict class indices
+            predicted = forest.classes_[tree.predict(X[out_of_bag]).astype(np.intp)]
+            scores[i] = np.mean(predicted == y[out_of_bag])
+    return scores
+
+
+def top_k_trees(forest, X, y, k):
+    """Copy of forest keeping its k trees with the best out-of-bag accuracy, in their original order"""
+    best = np.sort(np.argsort(-tree_oob_accuracy(forest, X, y), kind='stable')[:k])
+    selected = copy.copy(forest)
+    selected.estimators_ = [forest.estimators_[i] for i in best]
+    selected.n_estimators = len(selected.estimators_)
+    return selected
+
+
+def rebuild_forest(forest, arrays, **params):
+    """RandomForestClassifier over node arrays in the forest_to_arrays layout, with params overridden"""
+    tree_params = forest.estimators_[0].get_params()
+    tree_params.pop('random_state', None)
+    tree_params.update(params)
+    return forest_from_arrays(
+        arrays,
+        dict(forest.get_params(), **params),
+        tree_params,
+        forest.classes_,
+        forest.n_features_in_,
+        forest.estimators_[0].max_features_
+    )
+
+
+def cap_depth(forest, max_depth):
+    """Copy of forest with every tree cut at max_depth"""
+    arrays = forest_to_arrays(forest)
+    left, right, offsets = arrays['children_left'], arrays['children_right'], arrays['tree_offsets']
+
+    kept, kept_left, kept_right = [], [], []
+    tree_offsets, tree_depths = [0], []
+    for tree in range(len(offsets) - 1):
+        # Breadth-first from the root, expanding split nodes above max_depth
+        start = len(kept)
+        order, depths = [int(offsets[tree])], [0]
+        position = {order[0]: start}
+        for node, depth in zip(order, depths):
+            if left[node] != TREE_LEAF and depth < max_depth:
+                for child in (int(left[node]), int(right[node])):
+                    position[child] = start + len(order)
+                    order.append(child)
+                    depths.append(depth + 1)
+
+        for node in order:
+            split = left[node] != TREE_LEAF and int(left[node]) in position
+            kept_left.append(position[int(left[node])] if split else TREE_LEAF)
+            kept_right.append(position[int(right[node])] if split else TREE_LEAF)
+        kept.extend(order)
+        tree_offsets.append(len(kept))
+        tree_depths.append(max(depths))
+
+    capped = {name: np.array(arrays[name][kept], dtype=dtype) for name, dtype in FOREST_ARRAYS.items()}
+    capped['children_left'] = np.array(kept_left, dtype=np.int32)
+    capped['children_right'] = np.array(kept_right, dtype=np.int32)
+    leaves = capped['children_left'] == TREE_LEAF
+    capped['feature'][leaves] = TREE_UNDEFINED
+    capped['threshold'][leaves] = TREE_UNDEFINED
+    capped['tree_offsets'] = np.array(tree_offsets, dtype=np.int64)
+    capped['tree_max_depth'] = np.array(tree_depths, dtype=np.int64)
+    return rebuild_forest(forest, capped, max_depth=max_depth)
+
+
+def distill(forest, X, n_trees, max_depth, copies=10, dropout=0.3, seed=42):
+    """n_trees forest of max_depth fitted to forest's labels for X and token-dropout copies of X"""
+    rng = np.random.default_rng(seed)
+    augmented = [X]
+    for _ in range(copies):
+        noisy = X.copy()
+        noisy.data = noisy.data * (rng.random(len(noisy.data)) >= dropout)
+        noisy.eliminate_zeros()
+        augmented.append(noisy)
+    X_student = sparse.vstack(augmented, format='csr')
+    student = clone(forest).set_params(n_estimators=n_trees, max_depth=max_depth)
+    return student.fit(X_student, forest.predict(X_student))
+
+
+def variant_builders(top_k, depths, distilled):
+    """{name: callable(forest, X_train, y_train) returning the variant}; 'full' is the forest itself"""
+    builders = {'full': lambda forest, X, y: forest}
+    for k in top_k:
+        builders[f"top{k}"] = lambda forest, X, y, k=k: top_k_trees(forest, X, y, k)
+    for depth in depths:
+        builders[f"depth{depth}"] = lambda forest, X, y, depth=depth: cap_depth(forest, depth)
+    for n_trees, depth in distilled:
+        builders[f"distilled{n_trees}x{depth}"] = (
+            lambda forest, X, y, n_trees=n_trees, depth=depth: distill(forest, X, n_trees, depth)
+        )
+    return builders
+
+
+def cross_validate(categorizer, items, labels, builders, folds, seed):
+    """Accuracy of each variant, every fold refitting the vectorizer, the forest and the variant"""
+    texts, block = categorizer.feature_inputs(items)
+    correct = dict.fromkeys(builders, 0)
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for train_index, test_index in splitter.split(texts, labels):
+        vectorizer = categorizer.build_vectorizer(categorizer.vectorizer_mode)
+        X_train = vectorizer.fit_transform([texts[i] for i in train_index])
+        X_test = vectorizer.transform([texts[i] for i in test_index])
+        if block is not None:
+            X_train = sparse.hstack([X_train, block[train_index]], format='csr')
+            X_test = sparse.hstack([X_test, block[test_index]], format='csr')
+
+        y_train = labels[train_index]
+        forest = categorizer.build_forest().fit(X_train, y_train)
+        for name, build in builders.items():
+            variant = build(forest, X_train, y_train)
+            correct[name] += int((variant.predict(X_test) == labels[test_index]).sum())
+
+    return {name: count / len(labels) for name, count in correct.items()}
+
+
+def with_forest(categorizer, forest, name):
+    """Shallow copy of categorizer serving forest"""
+    variant = copy.copy(categorizer)
+    variant.model = forest
+    variant.training_info = dict(categorizer.training_info, forest_variant=name)
+    return variant
+
+
+def serving_stats(variant, directory, items, repeat):
+    """Artifact size, median load time and p50/p99 categorize_expense latency of a saved variant"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        variant.save_artifact(directory)
+    size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    load_seconds = []
+    for _ in range(5):
+        served = ImprovedExpenseCategorizer(model_path=directory, auto_train=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not served.load_model():
+                sys.exit(f"❌ Could not load the artifact saved to {directory}")
+        load_seconds.append(served.load_seconds)
+
+    # No fast threshold is set, so every request is scored by the forest
+    timings = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            served.categorize_expense(*item)
+            timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        'artifact_bytes': size,
+        'load_ms': round(statistics.median(load_seconds) * 1000, 2),
+        'p50_us': round(statistics.median(timings), 1),
+        'p99_us': round(timings[int(0.99 * (len(timings) - 1))], 1)
+    }
+
+
+def load_categorizer(model_path, scratch):
+    """Trained categorizer with a sklearn forest: from a model pickle, or trained into scratch"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if model_path:
+            categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+            if not categorizer.load_model():
+                sys.exit(f"❌ No model could be loaded from {model_path}")
+        else:
+            categorizer = ImprovedExpenseCategorizer(model_path=os.path.join(scratch, 'model.pkl'))
+            if not categorizer.train_model():
+                sys.exit("❌ Training failed")
+    if not isinstance(categorizer.model, RandomForestClassifier):
+        sys.exit("❌ Needs a model pickle: an artifact keeps no bootstrap samples to rank trees by")
+    return categorizer
+
+
+def training_rows(categorizer):
+    """The exact rows the model was fitted on, regenerated from the seed train_model recorded
+
+    Out-of-bag scores index the training matrix by bootstrap sample, so the amounts must be the
+    noisy ones the forest saw, not a fresh draw of ENHANCED_TRAINING_DATA.
+    """
+    info = categorizer.training_info
+    if info.get('data_seed') is None:
+        sys.exit("❌ The model records no training data seed (trained on custom data or by an older "
+                 "version); its bootstrap samples cannot be matched to training rows. Retrain it.")
+    data = get_enhanced_training_data(info['data_seed'])
+    if training_data_digest(data) != info.get('data_digest'):
+        sys.exit("❌ ENHANCED_TRAINING_DATA changed since the model was trained; retrain it")
+    return data
+
+
+def parse_list(value, convert=int):
+    return [convert(part) for part in value.split(',') if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="trained model pickle (default: train a fresh one)")
+    parser.add_argument('--top-k', default='25,50,100', help="tree counts for the top<k> variants")
+    parser.add_argument('--depths', default='6,10', help="depth caps for the depth<d> variants")
+    parser.add_argument('--distill', default='25x10', help="<trees>x<depth> of the distilled variants")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3, help="passes over the training items when timing")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--min-accuracy', type=float, help="cross-validated accuracy the shipped variant needs")
+    parser.add_argument('--output', help="artifact directory to save the chosen variant to")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args()
+
+    builders = variant_builders(
+        parse_list(args.top_k),
+        parse_list(args.depths),
+        parse_list(args.distill, lambda spec: tuple(int(n) for n in spec.split('x')))
+    )
+
+    with tempfile.TemporaryDirectory() as scratch:
+        categorizer = load_categorizer(args.model, scratch)
+        data = training_rows(categorizer)
+        items = [(item.get('description', ''), item.get('merchant', ''), item.get('amount')) for item in data]
+        labels = np.array([item['category'] for item in data])
+
+        print(f"🔄 Cross-validating {len(builders)} variants ({args.folds} folds)...")
+        accuracy = cross_validate(categorizer, items, labels, builders, args.folds, args.seed)
+
+        # The served forest was fitted on train_model's split; its bootstrap indices refer to it
+        X_train, _, y_train, _ = categorizer.validation_split(categorizer.featurize(items), labels)
+        print("🔄 Building the variants of the served forest and timing their artifacts...")
+        report = {}
+        variants = {}
+        for name, build in builders.items():
+            forest = build(categorizer.model, X_train, y_train)
+            variants[name] = with_forest(categorizer, forest, name)
+            report[name] = {
+                'trees': len(forest.estimators_),
+                'nodes': int(sum(tree.tree_.node_count for tree in forest.estimators_)),
+                'cv_accuracy': accuracy[name],
+                **serving_stats(variants[name], os.path.join(scratch, name), items, args.repeat)
+            }
+
+    print(f"\n📊 {'variant':<18}{'trees':>7}{'nodes':>8}{'cv acc':>8}{'artifact KB':>13}"
+          f"{'load ms':>9}{'p50 us':>9}{'p99 us':>9}")
+    for name, stats in report.items():
+        print(f"  {name:<18}{stats['trees']:>7}{stats['nodes']:>8}{stats['cv_accuracy']:>8.3f}"
+              f"{stats['artifact_bytes'] / 1024:>13.1f}{stats['load_ms']:>9.1f}{stats['p50_us']:>9.1f}"
+              f"{stats['p99_us']:>9.1f}")
+
+    chosen = None
+    if args.min_accuracy is not None:
+        passing = [name for name, stats in report.items() if stats['cv_accuracy'] >= args.min_accuracy]
+        if not passing:
+            sys.exit(f"\n❌ No variant reaches a cross-validated accuracy of {args.min_accuracy}")
+        chosen = min(passing, key=lambda name: report[name]['artifact_bytes'])
+        print(f"\n✅ Smallest variant with cv accuracy >= {args.min_accuracy}: {chosen} "
+              f"({report[chosen]['artifact_bytes'] / 1024:.1f} KB)")
+
+    if args.output:
+        if chosen is None:
+            sys.exit("❌ --output needs --min-accuracy to choose a variant")
+        variants[chosen].save_artifact(args.output)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'variants': report, 'chosen': chosen, 'min_accuracy': args.min_accuracy}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Result cache for hybrid SMS categorization
+- Bank SMS repeat the same template with only amounts, dates, account masks and
+  reference numbers changing, so decisions are cached per normalized template
+- Bounded LRU with a per-entry time to live and hit/miss/eviction counters
+- Each worker process keeps its own cache
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Standalone numbers and masked accounts (XX1234, *5678, 10-05-25, UPI:8829...).
+# Digits inside words ('kotak811', 'd2h') are kept: rule keywords contain them.
+VARIABLE_DIGITS = re.compile(r'(?<!\w)[Xx]*[0-9]+(?!\w)')
+ZERO_DIGITS = str.maketrans('123456789', '000000000')
+VARIABLE_TOKEN = re.compile(r'[Xx]*[0-9]+')
+
+
+def sms_template(text):
+    """SMS text with variable numbers zeroed out.
+
+    Digits become '0' rather than being removed so every digit run keeps its
+    length: the merchant regexes (\\d{1,2} etc.) and the TF-IDF tokenizer then
+    behave exactly as they did on the original message. The numbers themselves only
+    drop out of the ML features when no feature is built from them: see
+    has_variable_digit_terms.
+    """
+    return VARIABLE_DIGITS.sub(lambda match: match.group().translate(ZERO_DIGITS), text)
+
+
+def has_variable_digit_terms(terms):
+    """Whether any vocabulary term (an n-gram of space-separated tokens) contains a token
+    sms_template rewrites: a standalone number or masked account such as '350' or 'xx1234'.
+
+    Such a term gives the numbers of an SMS weight, so two messages with one template
+    can get different categories. Tokens with digits inside words ('count_2') are kept
+    by sms_template and do not count.
+    """
+    return any(VARIABLE_TOKEN.fullmatch(token) for term in terms for token in term.split(' '))
+
+
+class TemplateCache:
+    """Thread-safe LRU cache whose entries expire ttl seconds after being stored"""
+
+    def __init__(self, maxsize=10000, ttl=3600):
+        # maxsize 0 disables the cache; ttl <= 0 keeps entries until evicted
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return a copy of the cached result for key, or None"""
+        if not self.maxsize:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return dict(value)
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._entries[key] = (expires_at, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the model behind the cached results changes"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': bool(self.maxsize),
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            }
@@ -7,13 +7,14 @@ This preserves the trained model for future use without retraining
 import sys
 import os
 import pickle
-import joblib
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+
 # Import directly without the problematic dependencies
 try:
-    from app_hybrid import FinancialAnalystAI
+    from financial_analyst import FinancialAnalystAI
     HYBRID_AVAILABLE = True
 except Exception as e:
     print(f"⚠️ Could not import FinancialAnalystAI: {e}")
@@ -37,28 +38,33 @@ def save_models():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     import json
     
-    # 1. Copy existing ML model if it exists
+    # 1. Export the trained ML model to the compact artifact format
     print("\n🤖 Handling ML Categorizer...")
     if os.path.exists(ML_MODEL_PATH):
         try:
-            import shutil
-            # Copy the existing model
-            ml_model_path = os.path.join(models_dir, f"enhanced_ml_categorizer_{timestamp}.pkl")
-            shutil.copy2(ML_MODEL_PATH, ml_model_path)
-            print(f"✅ ML Model copied to: {ml_model_path}")
+            categorizer = ImprovedExpenseCategorizer(model_path=ML_MODEL_PATH, auto_train=False)
+            if not categorizer.load_model():
+                raise RuntimeError(f"could not load {ML_MODEL_PATH}")
+            
+            # Versioned artifact directory
+            ml_model_path = os.path.join(models_dir, f"enhanced_ml_categorizer_{timestamp}")
+            manifest = categorizer.save_artifact(ml_model_path)
+            print(f"✅ ML Model exported to: {ml_model_path}/")
             
             # Also create a latest version
-            latest_ml_path = os.path.join(models_dir, "enhanced_ml_categorizer_latest.pkl")
-            shutil.copy2(ML_MODEL_PATH, latest_ml_path)
-            print(f"✅ Latest ML model saved to: {latest_ml_path}")
+            latest_ml_path = os.path.join(models_dir, "enhanced_ml_categorizer_latest")
+            categorizer.save_artifact(latest_ml_path)
+            print(f"✅ Latest ML model saved to: {latest_ml_path}/")
             
             # Save model info
             model_info = {
                 'timestamp': timestamp,
                 'model_type': 'ImprovedExpenseCategorizer',
-                'source': 'enhanced_expense_model.pkl',
+                'source': ML_MODEL_PATH,
                 'model_version': '2.0_comprehensive_merchants',
-                'notes': 'Copied from existing trained model'
+                'artifact_format_version': manifest['format_version'],
+                'training_info': manifest['training_info'],
+                'notes': 'Exported from existing trained model'
             }
             
             info_path = os.path.join(models_dir, f"ml_model_info_{timestamp}.json")
@@ -67,7 +73,7 @@ def save_models():
             print(f"📋 Model info saved to: {info_path}")
             
         except Exception as e:
-            print(f"❌ Failed to copy ML model: {e}")
+            print(f"❌ Failed to export ML model: {e}")
     else:
         print(f"⚠️ ML model file not found: {ML_MODEL_PATH}")
     
@@ -132,13 +138,13 @@ def save_models():
             test_result = loaded_hybrid.categorize_transaction("Test payment Rs. 100 to BESCOM for electricity")
             print(f"✅ Hybrid AI loads correctly: {test_result.get('category', 'Unknown')} ({test_result.get('confidence_score', 0)*100:.1f}%)")
         
-        if os.path.exists(os.path.join(models_dir, "enhanced_ml_categorizer_latest.pkl")):
+        if os.path.isdir(os.path.join(models_dir, "enhanced_ml_categorizer_latest")):
             # Try to load ML model
-            try:
-                loaded_ml = joblib.load(os.path.join(models_dir, "enhanced_ml_categorizer_latest.pkl"))
-                print(f"✅ ML Model loads correctly: {type(loaded_ml).__name__}")
-            except Exception as e:
-                print(f"⚠️ ML model loading failed: {e}")
+            loaded_ml = ImprovedExpenseCategorizer(auto_train=False)
+            if loaded_ml.load_model(os.path.join(models_dir, "enhanced_ml_categorizer_latest")):
+                print(f"✅ ML Model loads correctly in {loaded_ml.load_seconds * 1000:.1f} ms")
+            else:
+                print("⚠️ ML model loading failed")
         
     except Exception as e:
         print(f"⚠️ Model loading test failed: {e}")
@@ -150,19 +156,22 @@ def save_models():
 Utility to load saved models
 """
 
-import joblib
 import pickle
 import os
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
 
 def load_ml_categorizer(model_path=None):
-    """Load the enhanced ML categorizer"""
+    """Load the enhanced ML categorizer from its artifact directory"""
     if model_path is None:
-        model_path = os.path.join("models", "enhanced_ml_categorizer_latest.pkl")
+        model_path = os.path.join("models", "enhanced_ml_categorizer_latest")
     
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model not found: {model_path}")
     
-    return joblib.load(model_path)
+    categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+    if not categorizer.load_model():
+        raise RuntimeError(f"Could not load model: {model_path}")
+    return categorizer
 
 def load_hybrid_ai(model_path=None):
     """Load the hybrid financial analyst AI"""
@@ -183,8 +192,9 @@ def get_available_models():
     
     models = []
     for file in os.listdir(models_dir):
-        if file.endswith('.pkl'):
-            models.append(os.path.join(models_dir, file))
+        path = os.path.join(models_dir, file)
+        if file.endswith('.pkl') or os.path.isdir(path):
+            models.append(path)
     return models
 
 # Example usage
@@ -226,7 +236,10 @@ if __name__ == "__main__":
     for file in os.listdir(models_dir):
         if timestamp in file or 'latest' in file:
             file_path = os.path.join(models_dir, file)
-            file_size = os.path.getsize(file_path)
+            if os.path.isdir(file_path):
+                file_size = sum(os.path.getsize(os.path.join(file_path, name)) for name in os.listdir(file_path))
+            else:
+                file_size = os.path.getsize(file_path)
             saved_files.append(f"  {file} ({file_size:,} bytes)")
     
     for file_info in saved_files:
@@ -0,0 +1,128 @@
+"""
+Bounded inference executor for the threaded (gthread) serving mode
+- Request threads hand categorization work to a small fixed pool of inference threads
+- At most max_workers + max_queue tasks are admitted; the rest are rejected at once
+  so the server sheds load instead of letting every request's latency grow
+- Rejections carry a Retry-After estimate from the recent service time
+- A task whose caller timed out is cancelled if it has not started; one already running
+  cannot be stopped and keeps its admission slot until it finishes
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class InferenceRejected(Exception):
+    """Raised when inference work is refused or abandoned; maps to an HTTP error"""
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Thread pool with an admission limit and a per-task timeout"""
+
+    def __init__(self, max_workers=4, max_queue=8, timeout=20.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._in_flight = 0
+        self._abandoned = 0
+        self._mean_seconds = 0.05
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_pool(self):
+        # Threads do not survive fork: each gunicorn worker starts its own pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained"""
+        backlog = self._in_flight * self._mean_seconds / max(self.max_workers, 1)
+        return max(1, math.ceil(backlog))
+
+    def _timed(self, fn, args, kwargs, task):
+        with self._lock:
+            if task['given_up']:
+                # The caller timed out between the pool picking the task up and cancelling it
+                self._in_flight -= 1
+                self._abandoned -= 1
+                task['done'] = True
+                return None
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                if task['given_up']:
+                    self._abandoned -= 1
+                task['done'] = True
+                self.completed += 1
+                self._mean_seconds = 0.9 * self._mean_seconds + 0.1 * elapsed
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on the inference pool and wait for its result
+
+        Raises InferenceRejected with status 429 when the queue is full and
+        503 when the task does not finish within the timeout.
+        """
+        if not self.max_workers:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceRejected("Inference queue is full, retry later", 429, self.retry_after())
+            self._in_flight += 1
+            pool = self._get_pool()
+
+        task = {'given_up': False, 'done': False}
+        try:
+            future = pool.submit(self._timed, fn, args, kwargs, task)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timed_out += 1
+                if future.cancel():
+                    self._in_flight -= 1
+                elif not task['done']:
+                    # Still running (or about to): it counts against the admission limit until done
+                    self._abandoned += 1
+                    task['given_up'] = True
+            raise InferenceRejected("Inference timed out, retry later", 503, self.retry_after())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': bool(self.max_workers),
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'timeout_seconds': self.timeout,
+                'in_flight': self._in_flight,
+                'abandoned': self._abandoned,
+                'mean_task_ms': round(self._mean_seconds * 1000, 2),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
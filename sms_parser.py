@@ -0,0 +1,136 @@
+"""
+Single-pass bank SMS parser
+- Amount, transaction type and date come from one scan with a combined token regex
+- Merchant names keep their priority cascades but are extracted once per SMS
+- ParsedSMS is shared by hybrid_categorize and FinancialAnalystAI.categorize_transaction
+- The combined regex is built on the first parse, so importing the parser is free
+"""
+
+import re
+from functools import lru_cache
+from sms_patterns import SMS_PATTERNS, NON_WORD, first_merchant
+
+# Field patterns folded into the single-pass token regex, in priority order.
+# 'date.on_numeric' is left out because any text it matches is already
+# matched by 'date.numeric', and 'amount.before_txn_verb' only runs as a
+# fallback since its '.*?' would rescan the rest of the SMS at every digit.
+AMOUNT_TOKENS = ['amount.rs', 'amount.inr', 'amount.rupee_symbol']
+TRANSACTION_TYPE_TOKENS = [
+    'transaction_type.debit', 'transaction_type.credit',
+    'transaction_type.transfer', 'transaction_type.payment'
+]
+DATE_TOKENS = ['date.numeric', 'date.day_month_name']
+
+
+@lru_cache(maxsize=None)
+def _token_regex():
+    """Combine the field patterns into one regex of zero-width alternatives.
+
+    Each alternative sits inside a lookahead so a token never consumes text;
+    finditer therefore reports the first match of every pattern exactly where
+    a separate re.search would have found it. Also returns the outer group map
+    and the fallback amount pattern.
+    """
+    patterns = {}
+    for group in ('amount', 'transaction_type', 'date'):
+        for name, pattern in SMS_PATTERNS.patterns(group):
+            patterns[name] = pattern
+
+    alternatives = []
+    for name in AMOUNT_TOKENS + TRANSACTION_TYPE_TOKENS + DATE_TOKENS:
+        group_name = name.replace('.', '__')
+        alternatives.append(f"(?=(?P<{group_name}>{patterns[name].pattern}))")
+
+    token_regex = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    # Map each outer group to its qualified name and the index of the value it captures
+    value_groups = {}
+    for name in AMOUNT_TOKENS + DATE_TOKENS:
+        group_index = token_regex.groupindex[name.replace('.', '__')]
+        value_groups[name.replace('.', '__')] = (name, group_index + 1)
+    for name in TRANSACTION_TYPE_TOKENS:
+        value_groups[name.replace('.', '__')] = (name, None)
+
+    return token_regex, value_groups, patterns['amount.before_txn_verb']
+
+
+def extract_merchant_info(text):
+    """Merchant name and cleaned text as used by the Financial Analyst AI"""
+    text_clean = NON_WORD.sub(' ', text.lower())
+    merchant_name = first_merchant('analyst_merchant', text)
+    return merchant_name, text_clean
+
+
+class ParsedSMS:
+    """Fields extracted from one bank SMS"""
+
+    __slots__ = ('raw_text', 'amount', 'transaction_type', 'date', 'merchant', '_merchant_info')
+
+    def __init__(self, raw_text, amount, transaction_type, date, merchant):
+        self.raw_text = raw_text
+        self.amount = amount
+        self.transaction_type = transaction_type
+        self.date = date
+        self.merchant = merchant
+        self._merchant_info = None
+
+    @property
+    def merchant_info(self):
+        """(merchant_name, text_clean) for the rule engine, computed on first use"""
+        if self._merchant_info is None:
+            self._merchant_info = extract_merchant_info(self.raw_text)
+        return self._merchant_info
+
+    def as_dict(self):
+        """The sms_data dictionary returned by the API"""
+        return {
+            'amount': self.amount,
+            'transaction_type': self.transaction_type,
+            'date': self.date,
+            'merchant': self.merchant,
+            'raw_text': self.raw_text
+        }
+
+
+def parse_sms(sms_text):
+    """Parse a bank SMS, scanning it once for amount, type and date"""
+    token_regex, token_values, amount_fallback = _token_regex()
+    first_tokens = {}
+    for match in token_regex.finditer(sms_text):
+        name, value_group = token_values[match.lastgroup]
+        if name not in first_tokens:
+            first_tokens[name] = match.group(value_group) if value_group else True
+
+    # Extract amount
+    amount = None
+    for name in AMOUNT_TOKENS:
+        if name in first_tokens:
+            amount = float(first_tokens[name].replace(',', ''))
+            SMS_PATTERNS.record_hit(name)
+            break
+    else:
+        match = amount_fallback.search(sms_text)
+        if match:
+            amount = float(match.group(1).replace(',', ''))
+            SMS_PATTERNS.record_hit('amount.before_txn_verb')
+
+    # Extract transaction type
+    transaction_type = 'unknown'
+    for name in TRANSACTION_TYPE_TOKENS:
+        if name in first_tokens:
+            transaction_type = name.split('.', 1)[1]
+            SMS_PATTERNS.record_hit(name)
+            break
+
+    # Extract date
+    date = None
+    for name in DATE_TOKENS:
+        if name in first_tokens:
+            date = first_tokens[name]
+            SMS_PATTERNS.record_hit(name)
+            break
+
+    # Extract merchant/description with enhanced patterns
+    merchant = first_merchant('sms_merchant', sms_text)
+
+    return ParsedSMS(sms_text, amount, transaction_type, date, merchant)
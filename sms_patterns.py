@@ -0,0 +1,163 @@
+"""
+Compiled regex registry for SMS parsing and merchant extraction
+- Every pattern is compiled once, on the first lookup of its group, and kept in priority
+  order per group; importing the registry compiles nothing
+- Per-pattern hit counters show which patterns actually decide results in production
+"""
+
+import re
+import threading
+from collections import Counter
+
+
+class PatternRegistry:
+    """Named groups of precompiled regexes with hit counters"""
+
+    def __init__(self):
+        self._sources = {}
+        self._groups = {}
+        self._hits = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, group, patterns, flags=0):
+        """Add (name, pattern) pairs as an ordered group, compiled when first used"""
+        self._sources[group] = ([(f"{group}.{name}", pattern) for name, pattern in patterns], flags)
+        self._groups.pop(group, None)
+
+    def patterns(self, group):
+        """Return the [(qualified_name, compiled_pattern)] list for a group, in priority order"""
+        compiled = self._groups.get(group)
+        if compiled is None:
+            patterns, flags = self._sources[group]
+            compiled = [(name, re.compile(pattern, flags)) for name, pattern in patterns]
+            self._groups[group] = compiled
+        return compiled
+
+    def record_hit(self, name):
+        """Count a pattern whose match was used for the result"""
+        with self._lock:
+            self._hits[name] += 1
+
+    def stats(self):
+        """Hit counts for every registered pattern, including ones that never fired"""
+        with self._lock:
+            hits = dict(self._hits)
+        return {
+            group: {name: hits.get(name, 0) for name, _ in patterns}
+            for group, (patterns, _) in self._sources.items()
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits.clear()
+
+
+SMS_PATTERNS = PatternRegistry()
+
+# Amount extraction patterns
+SMS_PATTERNS.register('amount', [
+    ('rs', r'Rs\.?\s*(\d+(?:,\d+)*(?:\.\d{2})?)'),
+    ('inr', r'INR\s*(\d+(?:,\d+)*(?:\.\d{2})?)'),
+    ('rupee_symbol', r'₹\s*(\d+(?:,\d+)*(?:\.\d{2})?)'),
+    ('before_txn_verb', r'(\d+(?:,\d+)*(?:\.\d{2})?).*?(?:debited|credited|spent|paid)'),
+], re.IGNORECASE)
+
+# Transaction type patterns, named after the type they detect
+SMS_PATTERNS.register('transaction_type', [
+    ('debit', r'debited|spent|paid|withdrawn|purchase'),
+    ('credit', r'credited|received|deposited|refund|cashback'),
+    ('transfer', r'transfer|sent to|received from'),
+    ('payment', r'payment|bill payment|recharge'),
+], re.IGNORECASE)
+
+# Date extraction patterns
+SMS_PATTERNS.register('date', [
+    ('numeric', r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'),
+    ('day_month_name', r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{2,4})'),
+    ('on_numeric', r'on\s+(\d{1,2}[-/]\d{1,2}[-/]\d{2})'),
+], re.IGNORECASE)
+
+# Merchant patterns used by extract_sms_data
+SMS_PATTERNS.register('sms_merchant', [
+    # Standard preposition patterns
+    ('preposition', r'(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\s+ref|\s+upi|\.|$)'),
+    ('txn_verb_preposition', r'(?:spent|paid|debited|credited).*?(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+
+    # Card and transaction patterns
+    ('card', r'card\s+(?:ending\s+)?\w+\s+at\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+    ('transaction', r'transaction.*?(?:at|to|with)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+
+    # UPI and payment patterns
+    ('upi', r'upi.*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+    ('payment', r'payment.*?(?:to|at|for)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+
+    # Purchase and order patterns
+    ('purchase_order', r'(?:purchase|order).*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\s+avl|\.|$)'),
+
+    # Direct merchant name patterns (no preposition)
+    ('direct_name', r'([A-Z][A-Z\s&.\-\(\)0-9]{3,}?)(?:\s+on\s+\d|\s+for|\s+avl|\s+ref|\s+upi|\.|$)'),
+
+    # Subscription and service patterns
+    ('subscription', r'(?:subscription|service|recharge).*?(?:for|at)\s+([A-Z][A-Z\s&.\-\(\)0-9]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Company and brand name patterns
+    ('company_suffix', r'\b([A-Z]{2,}(?:\s+[A-Z][A-Z\s&.\-\(\)0-9]*)*(?:\s+(?:PVT|LTD|INC|CORP|LLC|CO|SYSTEMS|SERVICES|TECHNOLOGIES|INDIA|PHARMACY|LABORATORY|HOSPITAL|CLINIC|STORE|MART|MALL))*)\b(?:\s+on|\s+for|\s+avl|\.|$)'),
+
+    # Generic patterns (fallback)
+    ('generic_caps', r'(?:^|\s)([A-Z]{2,}(?:\s+[A-Z]+)*)\s+(?:on\s+\d|\s+for|\s+avl|\s+ref)'),
+    ('before_balance', r'([A-Z][A-Z\s&.\-\(\)]{4,}?)(?:\s+(?:avl|available|balance|ref|reference))'),
+])
+
+# Merchant patterns used by FinancialAnalystAI.extract_merchant_info
+SMS_PATTERNS.register('analyst_merchant', [
+    # Power/Utility company specific patterns (highest priority)
+    ('utility_company', r'to\s+([A-Z][A-Za-z\s&.\-\(\)]*?(?:Power|Electricity|Distribution|Corporation|Board|Authority|Company|Limited)[A-Za-z\s&.\-\(\)]*?)(?:\s*\.\s*UPI|\s+UPI|\s+on\s+\d|\.)'),
+
+    # Standard patterns with prepositions
+    ('preposition', r'(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\s+avl|\s+ref|\.|$)'),
+    ('txn_verb_preposition', r'(?:spent|paid|debited|credited).*?(?:at|to|from|for)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Patterns without prepositions (direct merchant names)
+    ('direct_name', r'([A-Z][A-Z\s&.\-\(\)]{3,}?)(?:\s+on\s+\d|\s+for|\s+avl|\s+ref|\s+upi|\.|$)'),
+
+    # Card transaction patterns
+    ('card', r'card\s+(?:ending\s+)?\w+\s+at\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+    ('transaction', r'transaction.*?at\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # UPI and payment patterns
+    ('upi', r'upi\s+(?:payment|transaction).*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+    ('payment', r'payment.*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Purchase and order patterns
+    ('purchase', r'purchase.*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+    ('order', r'order.*?(?:at|from)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Withdrawal and transfer patterns
+    ('withdrawal_transfer', r'(?:withdrawal|transfer|sent).*?(?:to|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Subscription and service patterns
+    ('subscription', r'(?:subscription|service).*?(?:for|at)\s+([A-Z][A-Z\s&.\-\(\)]+?)(?:\s+on|\s+for|\.|$)'),
+
+    # Generic merchant name patterns (fallback)
+    ('generic_name', r'\b([A-Z][A-Z\s&.\-\(\)]{4,}?)\s+(?:on\s+\d|\s+for|\s+avl|\s+ref)'),
+    ('generic_caps', r'(?:^|\s)([A-Z]{2,}(?:\s+[A-Z][A-Z\s&.\-\(\)]*)?)\s+(?:on\s+\d|\s+for|\.|$)'),
+
+    # Brand and company patterns
+    ('brand', r'\b([A-Z]+(?:\s+[A-Z]+)*(?:\s+(?:PVT|LTD|INC|CORP|LLC|CO|SYSTEMS|SERVICES|TECHNOLOGIES|INDIA|PHARMACY|LABORATORY|HOSPITAL|CLINIC))*)\b'),
+])
+
+# Helpers shared by the extractors
+ALL_DIGITS = re.compile(r'^\d+$')
+NON_WORD = re.compile(r'[^\w\s]')
+
+
+def first_merchant(group, text):
+    """Return the first plausible merchant captured by a merchant pattern group"""
+    for name, pattern in SMS_PATTERNS.patterns(group):
+        match = pattern.search(text)
+        if match:
+            candidate = match.group(1).strip()
+            if len(candidate) > 2 and not ALL_DIGITS.match(candidate):
+                SMS_PATTERNS.record_hit(name)
+                return candidate
+    return None
@@ -0,0 +1,90 @@
+"""
+End-to-end tests for the bulk_categorize CLI on small CSV and NDJSON files
+Its results must match categorize_sms_list, the path the API serves
+"""
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import app_hybrid
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from result_cache import TemplateCache
+from test_sms_parser import SAMPLE_SMS, EDGE_CASE_SMS
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+MESSAGES = [sms for sms, *_ in SAMPLE_SMS] + EDGE_CASE_SMS
+
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('model') / 'model.pkl')
+    assert ImprovedExpenseCategorizer(model_path=path).train_model()
+    return path
+
+
+@pytest.fixture(scope='module')
+def expected(model_path):
+    """categorize_sms_list results for MESSAGES, served by the same model"""
+    app_hybrid.create_app()
+    categorizer = ImprovedExpenseCategorizer(model_path=model_path, auto_train=False)
+    assert categorizer.load_model()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(app_hybrid, 'ml_categorizer', categorizer)
+        patch.setattr(app_hybrid, 'result_cache', TemplateCache(maxsize=0))
+        return app_hybrid.categorize_sms_list(MESSAGES)
+
+
+def run_cli(*args, check=True):
+    completed = subprocess.run(
+        [sys.executable, os.path.join(REPO_ROOT, 'bulk_categorize.py'), *map(str, args)],
+        capture_output=True, text=True, timeout=300
+    )
+    if check:
+        assert completed.returncode == 0, completed.stderr
+    return completed
+
+
+def test_csv_to_ndjson(tmp_path, model_path, expected):
+    source = tmp_path / 'sms.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'sms_text'])
+        writer.writerows(enumerate(MESSAGES))
+    output = tmp_path / 'out.ndjson'
+
+    run_cli(source, output, '--processes', 2, '--chunk-size', 3, '--model', model_path)
+
+    results = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [r['index'] for r in results] == list(range(len(MESSAGES)))
+    assert [r['sms_data'] for r in results] == [r['sms_data'] for r in expected]
+    assert [r['categorization']['category'] for r in results] == \
+        [r['categorization']['category'] for r in expected]
+
+
+def test_ndjson_to_csv(tmp_path, model_path, expected):
+    source = tmp_path / 'sms.ndjson'
+    lines = [json.dumps({'sms_text': sms}) for sms in MESSAGES[:4]] + ['', '{broken', json.dumps(MESSAGES[4])]
+    source.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    output = tmp_path / 'out.csv'
+
+    run_cli(source, output, '--processes', 1, '--model', model_path, '--omit-raw-text')
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert 'sms_text' not in rows[0]
+    assert [row['index'] for row in rows] == [str(i) for i in range(6)]
+    assert rows[4]['error'] and not rows[4]['category']
+    categories = [row['category'] for row in rows[:4] + rows[5:]]
+    assert categories == [r['categorization']['category'] for r in expected[:5]]
+
+
+def test_missing_column(tmp_path):
+    source = tmp_path / 'sms.csv'
+    source.write_text('text\nRs.100 paid to ZOMATO\n', encoding='utf-8')
+    completed = run_cli(source, tmp_path / 'out.csv', '--processes', 1, check=False)
+    assert completed.returncode != 0
+    assert "Column 'sms_text' not found" in completed.stderr
@@ -0,0 +1,74 @@
+"""
+Parity tests for TfidfFeaturizer against the TfidfVectorizer it is built from
+"""
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA
+from featurizer import TfidfFeaturizer, build_featurizer
+from hashing_vectorizer import HashingTfidfVectorizer
+from test_hybrid_rules_first import CORPUS
+
+
+@pytest.fixture(scope='module')
+def texts():
+    categorizer = ImprovedExpenseCategorizer(auto_train=False)
+    training = [categorizer.create_enhanced_features(item['description'], item['merchant'], item['amount'])
+                for item in ENHANCED_TRAINING_DATA]
+    serving = [categorizer.create_enhanced_features(sms, None, None) for sms in CORPUS]
+    return categorizer, training, serving
+
+
+def same_matrix(a, b):
+    return (a.format == b.format == 'csr' and a.shape == b.shape and a.dtype == b.dtype
+            and np.array_equal(a.indptr, b.indptr) and np.array_equal(a.indices, b.indices)
+            and np.array_equal(a.data, b.data))
+
+
+def test_categorizer_vectorizer_parity(texts):
+    categorizer, training, serving = texts
+    vectorizer = categorizer.build_vectorizer('tfidf').fit(training)
+    featurizer = build_featurizer(vectorizer)
+    assert isinstance(featurizer, TfidfFeaturizer)
+
+    for text in training + serving:
+        assert same_matrix(featurizer.transform([text]), vectorizer.transform([text]))
+    assert same_matrix(featurizer.transform(serving), vectorizer.transform(serving))
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'sublinear_tf': True, 'ngram_range': (1, 2)},
+    {'norm': None},
+    {'norm': None, 'sublinear_tf': True, 'stop_words': 'english'},
+])
+def test_vectorizer_settings_parity(texts, params):
+    _, training, serving = texts
+    vectorizer = TfidfVectorizer(**params).fit(training)
+    featurizer = TfidfFeaturizer(vectorizer)
+    assert same_matrix(featurizer.transform(serving), vectorizer.transform(serving))
+
+
+def test_rows_without_known_terms(texts):
+    _, training, _ = texts
+    vectorizer = TfidfVectorizer().fit(training)
+    featurizer = TfidfFeaturizer(vectorizer)
+    documents = ['', 'qwertyuiop zxcvbnm', training[0]]
+    result = featurizer.transform(documents)
+    assert same_matrix(result, vectorizer.transform(documents))
+    assert result[0].nnz == result[1].nnz == 0
+    assert featurizer.transform([]).shape == (0, featurizer.n_features)
+
+
+@pytest.mark.parametrize('params', [{'binary': True}, {'use_idf': False}, {'norm': 'l1'}])
+def test_rejects_unsupported_settings(texts, params):
+    _, training, _ = texts
+    with pytest.raises(ValueError):
+        TfidfFeaturizer(TfidfVectorizer(**params).fit(training))
+
+
+def test_hashing_vectorizer_is_its_own_featurizer():
+    vectorizer = HashingTfidfVectorizer()
+    assert build_featurizer(vectorizer) is vectorizer
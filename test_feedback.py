@@ -0,0 +1,161 @@
+"""
+Tests for the feedback store, the online updater and the /api/feedback endpoint
+"""
+import pytest
+
+import app_hybrid
+import feedback
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA
+from feedback import FeedbackStore, OnlineUpdater
+from result_cache import TemplateCache
+
+CORRECTION = {'description': 'Monthly gym membership', 'merchant': 'CULT FIT', 'amount': 1500.0,
+              'category': 'Healthcare'}
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'))
+    assert categorizer.train_model()
+    return categorizer
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeedbackStore(str(tmp_path / 'feedback' / 'corrections.jsonl'))
+
+
+@pytest.fixture
+def updater(trained, store):
+    swaps = []
+    updater = OnlineUpdater(trained, store, ENHANCED_TRAINING_DATA, on_swap=lambda: swaps.append(1))
+    updater.swaps = swaps
+    fast_model = trained.fast_model
+    yield updater
+    trained.fast_model = fast_model
+
+
+def test_store_reads_from_offset(store):
+    records, offset = store.read_from(0)
+    assert records == [] and offset == 0
+
+    store.append({'category': 'Travel'})
+    store.append({'category': 'Shopping'})
+    records, offset = store.read_from(0)
+    assert [r['category'] for r in records] == ['Travel', 'Shopping']
+    assert all('received_at' in r for r in records)
+
+    store.append({'category': 'Fuel'})
+    records, offset = store.read_from(offset)
+    assert [r['category'] for r in records] == ['Fuel']
+
+
+def test_store_skips_partial_and_corrupt_lines(store):
+    store.append({'category': 'Travel'})
+    with open(store.path, 'a', encoding='utf-8') as f:
+        f.write('{not json}\n{"category": "Sho')
+    records, offset = store.read_from(0)
+    assert [r['category'] for r in records] == ['Travel']
+
+    # The unfinished line is read once its writer completes it
+    with open(store.path, 'a', encoding='utf-8') as f:
+        f.write('pping"}\n')
+    records, _ = store.read_from(offset)
+    assert [r['category'] for r in records] == ['Shopping']
+
+
+def test_updater_learns_corrections(updater, store, trained):
+    assert not updater.update_once()
+
+    store.append(CORRECTION)
+    previous = trained.fast_model
+    assert updater.update_once()
+    assert trained.fast_model is not previous
+    assert updater.swaps == [1]
+    assert updater.stats()['corrections_learned'] == 1
+
+    # Nothing new: no refit
+    assert not updater.update_once()
+    assert updater.stats()['updates'] == 1
+
+
+def test_poison_record_is_skipped_once(updater, store):
+    store.append(dict(CORRECTION, amount='abc'))
+    store.append(dict(CORRECTION, category='Not A Category'))
+    store.append(CORRECTION)
+
+    assert updater.update_once()
+    stats = updater.stats()
+    assert (stats['corrections_learned'], stats['corrections_skipped']) == (1, 2)
+
+    # The bad records are behind the offset and never read again
+    assert not updater.update_once()
+    store.append(dict(CORRECTION, amount='abc'))
+    assert not updater.update_once()
+    stats = updater.stats()
+    assert (stats['corrections_learned'], stats['corrections_skipped'], stats['updates']) == (1, 3, 1)
+    assert stats['last_error'] is None
+
+
+def test_failed_refit_keeps_nothing(updater, store, monkeypatch):
+    class Broken:
+        def set_params(self, **params):
+            return self
+
+        def fit(self, X, y, sample_weight=None):
+            raise RuntimeError("fit failed")
+
+    store.append(CORRECTION)
+    build_linear_model = feedback.build_linear_model
+    monkeypatch.setattr(feedback, 'build_linear_model', Broken)
+    with pytest.raises(RuntimeError):
+        updater.update_once()
+    assert updater.stats()['corrections_learned'] == 0
+
+    updater._model = None
+    monkeypatch.setattr(feedback, 'build_linear_model', build_linear_model)
+    assert updater.update_once()
+    assert updater.stats()['corrections_learned'] == 1
+
+
+def test_replayed_corrections_are_capped(trained, store):
+    updater = OnlineUpdater(trained, store, ENHANCED_TRAINING_DATA, max_corrections=3)
+    fast_model = trained.fast_model
+    try:
+        for amount in range(5):
+            store.append(dict(CORRECTION, amount=float(amount * 100)))
+        assert updater.update_once()
+        store.append(CORRECTION)
+        assert updater.update_once()
+        assert updater.stats()['corrections_learned'] == 3
+        assert [row[0].shape[0] for row in updater._corrections] == [1, 1, 1]
+    finally:
+        trained.fast_model = fast_model
+
+
+@pytest.fixture
+def client(trained, store, monkeypatch):
+    app_hybrid.create_app()
+    monkeypatch.setattr(app_hybrid, 'ml_categorizer', trained)
+    monkeypatch.setattr(app_hybrid, 'result_cache', TemplateCache(maxsize=0))
+    monkeypatch.setattr(app_hybrid, 'feedback_store', store)
+    return app_hybrid.app.test_client()
+
+
+@pytest.mark.parametrize('amount', ['abc', [1], {'value': 1}, 'NaN', 'inf'])
+def test_endpoint_rejects_bad_amount(client, store, amount):
+    response = client.post('/api/feedback', json=dict(CORRECTION, amount=amount))
+    assert response.status_code == 400
+    assert store.read_from(0)[0] == []
+
+
+def test_endpoint_stores_numeric_amount(client, store):
+    response = client.post('/api/feedback', json=dict(CORRECTION, amount='350'))
+    assert response.status_code == 202
+    assert response.get_json()['feedback']['amount'] == 350.0
+    without_amount = {key: value for key, value in CORRECTION.items() if key != 'amount'}
+    assert client.post('/api/feedback', json=without_amount).status_code == 202
+
+    records, _ = store.read_from(0)
+    assert [r['amount'] for r in records] == [350.0, None]
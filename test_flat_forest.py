@@ -0,0 +1,56 @@
+"""
+Parity tests for FlatForest against RandomForestClassifier.predict_proba
+The single-row engine and the batch walk must give sklearn's probabilities bit for bit
+"""
+import numpy as np
+import pytest
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import get_enhanced_training_data
+from flat_forest import FlatForest
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    """Freshly trained categorizer and its training set as a feature matrix"""
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'))
+    assert categorizer.train_model()
+    X = categorizer.featurize([
+        (item.get('description', ''), item.get('merchant', ''), item.get('amount'))
+        for item in get_enhanced_training_data()
+    ])
+    return categorizer, X
+
+
+def test_single_rows_match_predict_proba(trained):
+    categorizer, X = trained
+    expected = categorizer.model.predict_proba(X)
+    flat = FlatForest.from_sklearn(categorizer.model)
+    for i in range(X.shape[0]):
+        assert np.array_equal(flat.predict_proba(X[i]), expected[i:i + 1])
+    assert np.array_equal(flat.predict_proba(X[:1].toarray()), expected[:1])
+
+
+def test_batches_match_predict_proba(trained):
+    categorizer, X = trained
+    flat = FlatForest.from_sklearn(categorizer.model)
+    assert np.array_equal(flat.predict_proba(X), categorizer.model.predict_proba(X))
+
+
+def test_artifact_forest_matches_predict_proba(trained, tmp_path):
+    categorizer, X = trained
+    categorizer.save_artifact(str(tmp_path / 'artifact'))
+    served = ImprovedExpenseCategorizer(model_path=str(tmp_path / 'artifact'), auto_train=False)
+    assert served.load_model()
+    assert isinstance(served.model, FlatForest)
+    expected = categorizer.model.predict_proba(X)
+    for i in range(0, X.shape[0], 7):
+        assert np.array_equal(served.model.predict_proba(X[i]), expected[i:i + 1])
+
+
+def test_categorizer_serves_single_rows_from_the_export(trained):
+    categorizer, X = trained
+    assert isinstance(categorizer.forest_for(1), FlatForest)
+    assert categorizer.forest_for(X.shape[0]) is categorizer.model
+    probabilities, _ = categorizer.predict_proba(X[3])
+    assert np.array_equal(probabilities, categorizer.model.predict_proba(X[3]))
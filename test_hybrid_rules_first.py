@@ -0,0 +1,132 @@
+"""
+Parity tests for the rules-first short-circuit in hybrid_categorize
+Skipping the forest when the rule engine is sure must not change the category of any
+message in the corpus
+"""
+import itertools
+
+import pytest
+
+import app_hybrid
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from result_cache import TemplateCache
+from test_sms_parser import SAMPLE_SMS, EDGE_CASE_SMS
+
+TEMPLATES = [
+    "A/c *{acct} debited Rs. {amount} on 10-05-25 to {merchant}. UPI:88291837{acct}",
+    "Payment of Rs.{amount} made to {merchant} on 15-Oct-25 via UPI",
+    "INR {amount} spent on card ending {acct} at {merchant} on 03/11/2025",
+    "Your a/c {acct} is credited with Rs {amount} from {merchant}",
+    "Dear Customer, Rs.{amount} has been debited for {merchant} premium payment",
+    "Recharge of Rs.{amount} for {merchant} successful",
+]
+MERCHANTS = [
+    'ZOMATO', 'BIG BAZAAR', 'IRCTC', 'NETFLIX', 'HDFC ERGO', 'FASTAG NHAI', 'AIRTEL', 'BWSSB',
+    'RAHUL SHARMA', 'AMAZON', 'OLA CABS', 'APOLLO HOSPITAL', 'CROMA', 'ZERODHA', 'DELHI UNIVERSITY',
+    'UNKNOWN TRADERS', 'SHELL', 'SBI LIFE', 'LOCAL STORE', 'CULT FIT'
+]
+
+CORPUS = [sms for sms, *_ in SAMPLE_SMS] + EDGE_CASE_SMS + [
+    template.format(acct=1000 + i, amount=f"{(i * 379) % 20000 + 10}.50", merchant=merchant)
+    for i, (template, merchant) in enumerate(itertools.product(TEMPLATES, MERCHANTS))
+]
+
+
+@pytest.fixture(scope='module')
+def hybrid(tmp_path_factory):
+    """app_hybrid with a freshly trained model and no result cache"""
+    app_hybrid.create_app()
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'))
+    assert categorizer.train_model()
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(app_hybrid, 'ml_categorizer', categorizer)
+        patch.setattr(app_hybrid, 'result_cache', TemplateCache(maxsize=0))
+        yield app_hybrid
+
+
+def categorize_each(module):
+    results = []
+    for sms in CORPUS:
+        parsed = module.parse_sms(sms)
+        results.append(module.hybrid_categorize(parsed.as_dict(), parsed))
+    return results
+
+
+def test_rules_first_keeps_categories(hybrid, monkeypatch):
+    module = hybrid
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 2.0)
+    always_ml = categorize_each(module)
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 0.99)
+    rules_first = categorize_each(module)
+
+    assert sum(r['ml_confidence'] is None for r in rules_first if r['method'] == 'AI_Analyst') > 0
+    assert [r['category'] for r in rules_first] == [r['category'] for r in always_ml]
+
+
+def test_batch_rules_first_keeps_categories(hybrid, monkeypatch):
+    module = hybrid
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 2.0)
+    skipped_before = module.metrics.value('ml_skipped')
+    always_ml = module.categorize_sms_list(CORPUS)
+    assert module.metrics.value('ml_skipped') == skipped_before
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 0.99)
+    rules_first = module.categorize_sms_list(CORPUS)
+
+    assert module.metrics.value('ml_skipped') > skipped_before
+    assert [r['categorization']['category'] for r in rules_first] == \
+        [r['categorization']['category'] for r in always_ml]
+
+
+def test_certain_rules_skip_the_forest(hybrid, monkeypatch):
+    module = hybrid
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 0.99)
+    forest_calls = []
+    categorize_expense = module.ml_categorizer.categorize_expense
+    monkeypatch.setattr(module.ml_categorizer, 'categorize_expense',
+                        lambda *args, **kwargs: forest_calls.append(args) or categorize_expense(*args, **kwargs))
+
+    certain = sum(
+        module.ai_analyst.categorize_transaction(sms)['confidence_score'] >= 0.99 for sms in CORPUS
+    )
+    skipped_before = module.metrics.value('ml_skipped')
+    results = categorize_each(module)
+
+    assert certain > 0
+    assert module.metrics.value('ml_skipped') - skipped_before == certain
+    assert len(forest_calls) == len(CORPUS) - certain
+
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 2.0)
+    always_ml = categorize_each(module)
+    skipped = [i for i, r in enumerate(results) if r['method'] == 'AI_Analyst' and r['ml_confidence'] is None]
+    assert len(skipped) == certain
+    assert [results[i]['category'] for i in skipped] == [always_ml[i]['category'] for i in skipped]
+
+
+def test_rules_at_the_threshold_skip_the_forest(hybrid, monkeypatch):
+    """Rules exactly as sure as the threshold settle a message a certain forest would take"""
+    module = hybrid
+    sms = "Payment of Rs.1240.00 made to IRCTC on 15-Oct-25 via UPI"
+    ai_result = module.ai_analyst.categorize_transaction(sms)
+    assert ai_result['confidence_score'] == 1.0 and ai_result['category'] == 'Travel'
+
+    certain = {'primary_category': 'Shopping', 'confidence': 1.0,
+               'top_predictions': [{'category': 'Shopping', 'confidence': 1.0}]}
+    monkeypatch.setattr(module.ml_categorizer, 'categorize_expense', lambda *args, **kwargs: dict(certain))
+    monkeypatch.setattr(module.ml_categorizer, 'categorize_batch',
+                        lambda items, **kwargs: [dict(certain) for _ in items])
+
+    # Never skipping, the forest wins the tie
+    monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', 2.0)
+    parsed = module.parse_sms(sms)
+    result = module.hybrid_categorize(parsed.as_dict(), parsed)
+    assert (result['category'], result['method'], result['ai_category']) == ('Shopping', 'ML_Model', 'Travel')
+    batch = module.categorize_sms_list([sms])[0]['categorization']
+    assert (batch['category'], batch['method']) == ('Shopping', 'ML_Model')
+
+    for threshold in (1.0, 0.99):
+        monkeypatch.setattr(module, 'RULES_FIRST_THRESHOLD', threshold)
+        result = module.hybrid_categorize(parsed.as_dict(), parsed)
+        assert (result['category'], result['method'], result['ml_confidence']) == ('Travel', 'AI_Analyst', None)
+        batch = module.categorize_sms_list([sms])[0]['categorization']
+        assert (batch['category'], batch['method']) == ('Travel', 'AI_Analyst')
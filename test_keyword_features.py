@@ -0,0 +1,94 @@
+"""
+Parity tests for the keyword feature block against the per-row keyword tokens
+Each block value must be implied by the tokens extract_keyword_features writes for that row
+"""
+import pytest
+
+from enhanced_categorizer_v2 import CATEGORY_KEYWORDS, ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA
+from keyword_features import AMOUNT_BINS, AMOUNT_RANGES, MAX_KEYWORD_COUNT
+from sms_parser import parse_sms
+from test_hybrid_rules_first import CORPUS
+
+BOUNDARY_AMOUNTS = sorted({0.0, *AMOUNT_BINS, *(bound for bounds in AMOUNT_RANGES.values()
+                                              for bound in bounds if bound is not None)})
+
+
+@pytest.fixture(scope='module')
+def categorizer():
+    return ImprovedExpenseCategorizer(auto_train=False, feature_mode='block')
+
+
+def items():
+    rows = [(item['description'], item['merchant'], item['amount']) for item in ENHANCED_TRAINING_DATA]
+    for sms in CORPUS:
+        sms_data = parse_sms(sms).as_dict()
+        rows.append((sms_data['raw_text'], sms_data['merchant'], sms_data['amount']))
+    description, merchant, _ = rows[0]
+    for amount in BOUNDARY_AMOUNTS:
+        rows += [(description, merchant, amount - 0.01), (description, merchant, amount),
+                 (description, merchant, amount + 0.01)]
+    rows += [('', '', None), ('swiggy swiggy zomato food order dinner lunch restaurant meal', 'SWIGGY', None)]
+    return rows
+
+
+def expected_block(categorizer, item):
+    """Block values implied by the tokens create_enhanced_features writes for item"""
+    tokens = set(categorizer.create_enhanced_features(*item).split())
+    columns = set(categorizer.keyword_block.columns)
+    expected = {}
+    for category in CATEGORY_KEYWORDS:
+        for count in range(1, MAX_KEYWORD_COUNT + 1):
+            if f"category_{category}_count_{count}" in tokens:
+                expected[f"category_{category}_count"] = count / MAX_KEYWORD_COUNT
+    expected.update({token: 1.0 for token in tokens if token in columns})
+    return expected
+
+
+def test_block_matches_keyword_tokens(categorizer):
+    rows = items()
+    _, block = categorizer.feature_inputs(rows)
+    columns = categorizer.keyword_block.columns
+    assert block.shape == (len(rows), len(columns))
+
+    for row, item in enumerate(rows):
+        values = block[row]
+        actual = {columns[column]: value for column, value in zip(values.indices, values.data)}
+        assert actual == expected_block(categorizer, item), item
+
+
+def test_rows_are_independent_of_the_batch(categorizer):
+    rows = items()
+    _, block = categorizer.feature_inputs(rows)
+    for row in range(0, len(rows), 17):
+        _, single = categorizer.feature_inputs([rows[row]])
+        assert (single != block[row]).nnz == 0
+
+
+def test_featurize_appends_block_columns(tmp_path):
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'), feature_mode='block')
+    assert categorizer.train_model()
+    rows = items()[:20]
+    X = categorizer.featurize(rows)
+    texts, block = categorizer.feature_inputs(rows)
+    n_text = len(categorizer.vectorizer.vocabulary_)
+    assert X.shape == (len(rows), n_text + block.shape[1])
+    assert (X[:, n_text:] != block).nnz == 0
+    assert (X[:, :n_text] != categorizer.vectorizer.transform(texts)).nnz == 0
+
+
+@pytest.mark.parametrize('feature_mode', ['text', 'block'])
+def test_amounts_are_normalized_before_either_mode(feature_mode):
+    categorizer = ImprovedExpenseCategorizer(auto_train=False, feature_mode=feature_mode)
+    description, merchant = 'Monthly gym membership', 'CULT FIT'
+
+    def inputs(amount):
+        texts, block = categorizer.feature_inputs([(description, merchant, amount)])
+        return texts, None if block is None else block.toarray().tolist()
+
+    for amount in ['1500', ' 1500.00 ', 1500, 1500.0]:
+        assert inputs(amount) == inputs(1500.0)
+    assert inputs(float('nan')) == inputs(None)
+    assert inputs(1500.0) != inputs(None)
+    with pytest.raises(ValueError):
+        inputs('abc')
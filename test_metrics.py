@@ -0,0 +1,120 @@
+"""
+Tests for the shared metrics: per-process slots, their reuse, and a worker killed mid-update
+"""
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+import metrics
+from metrics import SharedMetrics
+
+fork = multiprocessing.get_context('fork')
+
+
+def build(max_processes=4):
+    return SharedMetrics(routes=('sms',), stages=('ml', 'total'), methods=('ML_Model', 'AI_Analyst'),
+                         counters={'ml_skipped': "skipped"}, max_processes=max_processes)
+
+
+def in_child(target, *args):
+    process = fork.Process(target=target, args=args)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+    return process
+
+
+def record_requests(m, n):
+    for _ in range(n):
+        timer = m.timer('sms')
+        with timer.stage('ml'):
+            pass
+        timer.count_method('ML_Model')
+        timer.finish()
+    m.increment('ml_skipped', n)
+
+
+def sample(rendered, name):
+    return next(float(line.rsplit(' ', 1)[1]) for line in rendered.splitlines() if line.startswith(name))
+
+
+def test_processes_record_into_their_own_slots():
+    m = build()
+    record_requests(m, 2)
+    for _ in range(2):
+        in_child(record_requests, m, 3)
+
+    rendered = m.render()
+    assert m.value('ml_skipped') == 8
+    assert sample(rendered, 'finsaathi_stage_seconds_count{route="sms",stage="total"}') == 8
+    assert sample(rendered, 'finsaathi_stage_seconds_bucket{route="sms",stage="ml",le="+Inf"}') == 8
+    assert sample(rendered, 'finsaathi_categorizations_total{route="sms",method="ML_Model"}') == 8
+    assert sum(1 for owner in m._owners.tolist() if owner) == 3
+
+
+def test_dead_process_slot_is_reused_with_its_counts():
+    m = build(max_processes=2)
+    record_requests(m, 1)
+    for _ in range(3):
+        in_child(record_requests, m, 1)
+
+    assert m.value('ml_skipped') == 4
+    assert m.dropped == 0
+
+
+def test_updates_dropped_when_no_slot_is_free():
+    m = build(max_processes=1)
+    record_requests(m, 1)
+
+    def blocked(m):
+        record_requests(m, 1)
+        assert m.dropped == 2  # the request and the counter increment
+    in_child(blocked, m)
+    assert m.value('ml_skipped') == 1
+
+
+def test_killed_worker_holding_the_claim_lock_blocks_nobody(monkeypatch):
+    monkeypatch.setattr(metrics, 'CLAIM_TIMEOUT', 0.05)
+    m = build()
+    record_requests(m, 1)
+
+    def hold_lock(m):
+        m._claim_lock.acquire()
+        time.sleep(60)
+    holder = fork.Process(target=hold_lock, args=(m,))
+    holder.start()
+    time.sleep(0.2)
+    os.kill(holder.pid, signal.SIGKILL)
+    holder.join()
+
+    # Processes with a slot never touch the shared lock again
+    started = time.perf_counter()
+    record_requests(m, 5)
+    assert time.perf_counter() - started < 0.05
+    assert m.value('ml_skipped') == 6
+
+    # A new worker gives up on claiming a slot rather than hanging
+    def newcomer(m):
+        started = time.perf_counter()
+        record_requests(m, 1)
+        assert m.dropped == 2 and time.perf_counter() - started < 1
+    in_child(newcomer, m)
+    assert m.value('ml_skipped') == 6
+
+
+def test_reset():
+    m = build()
+    record_requests(m, 3)
+    m.reset()
+    assert m.value('ml_skipped') == 0
+    assert 'finsaathi_stage_seconds_count{route="sms",stage="total"} 0' in m.render()
+
+
+@pytest.fixture(autouse=True)
+def no_stray_children():
+    yield
+    for child in multiprocessing.active_children():
+        child.kill()
@@ -0,0 +1,118 @@
+"""
+Tests for the artifact loader's integrity and version checks
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from flat_forest import FlatForest
+from model_artifact import MANIFEST_NAME, ArtifactError, load_artifact, read_manifest
+
+ITEMS = [('Zomato food order', 'ZOMATO', 350.0), ('IRCTC ticket', 'IRCTC', 1200.0),
+         ('Monthly gym membership', 'CULT FIT', 1500.0)]
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'))
+    assert categorizer.train_model()
+    return categorizer
+
+
+@pytest.fixture
+def artifact(trained, tmp_path):
+    directory = str(tmp_path / 'artifact')
+    trained.save_artifact(directory)
+    return directory
+
+
+def edit_manifest(directory, **changes):
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest.update(changes)
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def test_rebuilt_forest_matches(trained, artifact):
+    loaded = load_artifact(artifact, verify=True)
+    X = trained.featurize(ITEMS)
+    assert np.array_equal(loaded['model'].predict_proba(X), trained.model.predict_proba(X))
+
+
+def test_sklearn_version_mismatch_refuses_to_rebuild_trees(artifact):
+    edit_manifest(artifact, sklearn_version='0.0.1')
+    with pytest.raises(ArtifactError, match='scikit-learn 0.0.1'):
+        load_artifact(artifact)
+    # FlatForest serves the node arrays without sklearn's tree internals
+    assert load_artifact(artifact, build_forest=False)['model'] is None
+    served = ImprovedExpenseCategorizer(model_path=artifact, auto_train=False)
+    assert served.load_model()
+
+
+def test_size_checked_without_reading_files(artifact):
+    path = os.path.join(artifact, 'threshold.npy')
+    with open(path, 'ab') as f:
+        f.write(b'\0')
+    with pytest.raises(ArtifactError, match='Size mismatch'):
+        load_artifact(artifact, build_forest=False)
+
+
+def test_checksum_only_when_verifying(artifact):
+    path = os.path.join(artifact, 'threshold.npy')
+    data = bytearray(open(path, 'rb').read())
+    data[-1] ^= 0xFF
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    load_artifact(artifact, build_forest=False)
+    with pytest.raises(ArtifactError, match='Checksum mismatch'):
+        load_artifact(artifact, build_forest=False, verify=True)
+    served = ImprovedExpenseCategorizer(model_path=artifact, auto_train=False)
+    assert not served.load_artifact(artifact, verify=True)
+
+
+def test_missing_file(artifact):
+    os.remove(os.path.join(artifact, 'feature.npy'))
+    with pytest.raises(ArtifactError, match='Cannot read'):
+        load_artifact(artifact)
+    shutil.rmtree(artifact)
+    with pytest.raises(ArtifactError):
+        load_artifact(artifact)
+
+
+def served_rows(directory, X):
+    served = ImprovedExpenseCategorizer(model_path=directory, auto_train=False)
+    assert served.load_model()
+    return served, [served.model.predict_proba(X[row]) for row in range(X.shape[0])]
+
+
+def test_row_tables_are_mapped_from_the_artifact(trained, artifact):
+    X = trained.featurize(ITEMS)
+    served, rows = served_rows(artifact, X)
+    for table in (served.model._slot_next, served.model._slot_feature, served.model._slot_threshold):
+        assert isinstance(table, np.memmap) and not table.flags.writeable
+    rebuilt = FlatForest.from_sklearn(trained.model)
+    assert all(np.array_equal(proba, rebuilt.predict_proba(X[row])) for row, proba in enumerate(rows))
+
+    # Artifacts written without the tables build them at load
+    files = read_manifest(artifact)['files']
+    for name in [name for name in files if name.startswith('slot_')]:
+        os.remove(os.path.join(artifact, name))
+        del files[name]
+    edit_manifest(artifact, files=files)
+    served, old_rows = served_rows(artifact, X)
+    assert not isinstance(served.model._slot_next, np.memmap)
+    assert all(np.array_equal(a, b) for a, b in zip(old_rows, rows))
+
+
+def test_featurizer_is_built_at_load(artifact):
+    served = ImprovedExpenseCategorizer(model_path=artifact, auto_train=False)
+    assert served.load_model()
+    vectorizer, featurizer = served._featurizer
+    assert vectorizer is served.vectorizer and featurizer.vocabulary is vectorizer.vocabulary_
@@ -0,0 +1,177 @@
+"""
+Tests for hot model reload: the registry's change detection, validation and swap,
+and the admin reload endpoint
+"""
+import os
+import shutil
+
+import pytest
+
+import app_hybrid
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA
+from model_registry import ModelRegistry
+
+
+def build(path):
+    return ImprovedExpenseCategorizer(model_path=path, auto_train=False)
+
+
+@pytest.fixture(scope='module')
+def saved_model(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('model') / 'model.pkl')
+    assert build(path).train_model()
+    return path
+
+
+def publish(saved_model, path):
+    """Swap a copy of the saved model into path, as a deploy would"""
+    staging = path + '.new'
+    shutil.copy(saved_model, staging)
+    os.replace(staging, path)
+
+
+def loaded(path):
+    categorizer = build(path)
+    assert categorizer.load_model()
+    return categorizer
+
+
+def test_model_trained_at_startup_is_not_reloaded(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    registry = ModelRegistry(path, build, ENHANCED_TRAINING_DATA)
+
+    categorizer = build(path)
+    assert categorizer.train_model()
+    registry.adopt(categorizer)
+
+    assert registry.reload() == {'swapped': False, 'reason': 'unchanged'}
+    assert registry.current is categorizer and registry.generation == 0
+
+
+def test_new_model_is_swapped_in(tmp_path, saved_model):
+    path = str(tmp_path / 'model.pkl')
+    publish(saved_model, path)
+    swapped = []
+    registry = ModelRegistry(path, build, ENHANCED_TRAINING_DATA, on_swap=swapped.append)
+    startup = loaded(path)
+    registry.adopt(startup)
+    assert not registry.reload()['swapped']
+
+    publish(saved_model, path)
+    status = registry.reload()
+    assert status['swapped'] and status['error'] is None
+    assert registry.current is not startup and swapped == [registry.current]
+    assert registry.generation == 1
+    assert registry.reload() == {'swapped': False, 'reason': 'unchanged'}
+
+    assert registry.reload(force=True)['swapped']
+    assert registry.generation == 2
+
+
+def test_rejected_model_is_not_served_or_retried(tmp_path, saved_model):
+    path = str(tmp_path / 'model.pkl')
+    registry = ModelRegistry(path, build, ENHANCED_TRAINING_DATA, min_accuracy=1.01)
+    assert registry.reload()['error'].startswith('no model at')
+
+    publish(saved_model, path)
+    status = registry.reload()
+    assert not status['swapped'] and 'below 1.01' in status['error']
+    assert registry.current is None
+    assert registry.reload() == {'swapped': False, 'reason': 'unchanged'}
+
+
+def test_unloadable_model_is_rejected(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    registry = ModelRegistry(path, build, ENHANCED_TRAINING_DATA)
+    status = registry.reload(force=True)
+    assert status == registry.last_reload
+    assert not status['swapped'] and status['error'] == 'model failed to load'
+    assert registry.current is None
+
+
+@pytest.fixture
+def admin(tmp_path, saved_model, monkeypatch):
+    path = str(tmp_path / 'model.pkl')
+    publish(saved_model, path)
+    app_hybrid.create_app()
+    registry = ModelRegistry(path, build, ENHANCED_TRAINING_DATA)
+    startup = loaded(path)
+    registry.adopt(startup)
+    installed = []
+    registry.on_swap = installed.append
+    monkeypatch.setattr(app_hybrid, 'model_registry', registry)
+    monkeypatch.setattr(app_hybrid, 'ADMIN_TOKEN', 'secret')
+    registry.installed = installed
+    return app_hybrid.app.test_client(), registry
+
+
+def test_admin_reload(admin, monkeypatch):
+    client, registry = admin
+
+    assert client.post('/api/admin/reload-model').status_code == 403
+    assert client.post('/api/admin/reload-model', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    monkeypatch.setattr(app_hybrid, 'ADMIN_TOKEN', None)
+    assert client.post('/api/admin/reload-model', headers={'X-Admin-Token': 'secret'}).status_code == 403
+    monkeypatch.setattr(app_hybrid, 'ADMIN_TOKEN', 'secret')
+
+    response = client.post('/api/admin/reload-model', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['generation'] == 1 and body['worker_pid'] == os.getpid()
+    assert registry.installed == [registry.current]
+
+
+def test_admin_reload_of_rejected_model(admin):
+    client, registry = admin
+    registry.min_accuracy = 1.01
+    response = client.post('/api/admin/reload-model', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 422
+    assert not response.get_json()['success'] and registry.installed == []
+
+
+class NoLock:
+    def __enter__(self):
+        raise AssertionError("lock taken on the request path")
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_started_worker_takes_no_lock_per_request(monkeypatch):
+    app_hybrid.create_app()
+    client = app_hybrid.app.test_client()
+    started = []
+    monkeypatch.setattr(app_hybrid, '_threads_pid', None)
+    monkeypatch.setattr(app_hybrid.model_registry, 'ensure_started', lambda: started.append(os.getpid()))
+    assert client.get('/api/health').status_code == 200
+    assert started == [os.getpid()]
+
+    monkeypatch.setattr(app_hybrid, '_create_lock', NoLock())
+    assert app_hybrid.create_app() is app_hybrid.app
+    assert client.get('/api/health').status_code == 200
+    assert started == [os.getpid()]
+
+
+def test_model_source_names_the_format(tmp_path, saved_model):
+    assert loaded(saved_model).model_source == 'pickle'
+    directory = str(tmp_path / 'artifact')
+    loaded(saved_model).save_artifact(directory)
+    assert loaded(directory).model_source == 'artifact'
+
+
+def test_health_and_metrics_report_the_served_model(tmp_path, saved_model, monkeypatch):
+    app_hybrid.create_app()
+    client = app_hybrid.app.test_client()
+
+    monkeypatch.setattr(app_hybrid, 'ml_categorizer', build(str(tmp_path / 'missing.pkl')))
+    health = client.get('/api/health').get_json()
+    assert (health['status'], health['ml_model'], health['ml_model_source']) == ('degraded', 'Not loaded', None)
+    assert 'finsaathi_ml_model_info{source="none",vectorizer="tfidf"} 1' in client.get('/metrics').get_data(as_text=True)
+
+    monkeypatch.setattr(app_hybrid, 'ml_categorizer', loaded(saved_model))
+    health = client.get('/api/health').get_json()
+    assert (health['status'], health['ml_model_source']) == ('healthy', 'pickle')
+    assert 'finsaathi_ml_model_info{source="pickle",vectorizer="tfidf"} 1' in client.get('/metrics').get_data(as_text=True)
@@ -0,0 +1,55 @@
+"""
+Parity tests for the Aho-Corasick matcher behind the special merchant rules
+Expected results come from the per-rule substring loops it replaced
+"""
+import pytest
+
+from financial_analyst import FinancialAnalystAI
+from multi_pattern_matcher import MultiPatternMatcher
+from test_hybrid_rules_first import CORPUS
+
+
+@pytest.fixture(scope='module')
+def analyst():
+    return FinancialAnalystAI()
+
+
+def substring_rules(analyst, merchant_name, text):
+    """special_merchant_rules as it was: an any() substring scan per rule, in priority order"""
+    merchant_lower = (merchant_name or "").lower()
+    text_lower = text.lower()
+    for category, merchant_terms, text_terms in analyst.special_rules:
+        if any(term in merchant_lower for term in merchant_terms) or any(term in text_lower for term in text_terms):
+            return category
+        if category == 'Insurance' and 'premium' in text_lower and \
+           not any(term in text_lower for term in analyst.premium_exclusions) and \
+           any(term in text_lower for term in analyst.premium_insurance_terms):
+            return 'Insurance'
+    return None
+
+
+def test_find_all_matches_substring_scan(analyst):
+    patterns = ['premium'] + analyst.premium_exclusions + analyst.premium_insurance_terms
+    for _, merchant_terms, text_terms in analyst.special_rules:
+        patterns += merchant_terms + text_terms
+    matcher = MultiPatternMatcher(patterns)
+
+    for sms in CORPUS:
+        text = sms.lower()
+        assert matcher.find_all(text) == {pattern for pattern in patterns if pattern in text}
+
+
+def test_overlapping_patterns():
+    matcher = MultiPatternMatcher(['he', 'she', 'his', 'hers', 'she'])
+    assert matcher.find_all('ushers') == {'she', 'he', 'hers'}
+    assert matcher.find_all('') == set()
+    assert matcher.find_all('xyz') == set()
+
+
+@pytest.mark.parametrize("sms", CORPUS)
+def test_special_rules_match_substring_loop(analyst, sms):
+    merchant_name, _ = analyst.extract_merchant_info(sms)
+    assert analyst.special_merchant_rules(merchant_name, sms) == substring_rules(analyst, merchant_name, sms)
+    # Merchant-only and text-only hits take the same rule as the old loop
+    assert analyst.special_merchant_rules(merchant_name, "") == substring_rules(analyst, merchant_name, "")
+    assert analyst.special_merchant_rules(None, sms) == substring_rules(analyst, None, sms)
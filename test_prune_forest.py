@@ -0,0 +1,51 @@
+"""
+Tests that prune_forest rebuilds the exact training rows the served forest was fitted on
+"""
+import pytest
+
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA, get_enhanced_training_data, training_data_digest
+from prune_forest import training_rows
+
+
+def amounts(data):
+    return [item['amount'] for item in data]
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'),
+                                             auto_train=False)
+    assert categorizer.train_model()
+    return categorizer
+
+
+def test_seeded_data_is_reproducible():
+    assert amounts(get_enhanced_training_data(7)) == amounts(get_enhanced_training_data(7))
+    assert amounts(get_enhanced_training_data(7)) != amounts(get_enhanced_training_data(8))
+    assert training_data_digest(get_enhanced_training_data(7)) == training_data_digest(get_enhanced_training_data(7))
+
+
+def test_training_rows_match_the_fitted_data(trained):
+    info = trained.training_info
+    assert info['data_seed'] is not None
+    data = training_rows(trained)
+    assert len(data) == info['n_samples']
+    assert training_data_digest(data) == info['data_digest']
+
+
+def test_training_rows_reloaded_from_pickle(trained):
+    categorizer = ImprovedExpenseCategorizer(model_path=trained.model_path, auto_train=False)
+    assert categorizer.load_model()
+    assert amounts(training_rows(categorizer)) == amounts(training_rows(trained))
+
+
+def test_rejects_models_it_cannot_match(trained):
+    custom = ImprovedExpenseCategorizer(auto_train=False)
+    custom.training_info = dict(trained.training_info, data_seed=None)
+    with pytest.raises(SystemExit):
+        training_rows(custom)
+
+    custom.training_info = dict(trained.training_info, data_digest=training_data_digest(ENHANCED_TRAINING_DATA))
+    with pytest.raises(SystemExit):
+        training_rows(custom)
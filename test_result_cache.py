@@ -0,0 +1,128 @@
+"""
+Tests for the per-worker result cache and the keys app_hybrid stores results under
+"""
+import pytest
+
+import app_hybrid
+import result_cache
+from enhanced_categorizer_v2 import ImprovedExpenseCategorizer
+from enhanced_training_data import ENHANCED_TRAINING_DATA
+from result_cache import TemplateCache, has_variable_digit_terms, sms_template
+
+SMS = "A/c *4521 debited Rs. 350.00 on 10-05-25 to ZOMATO. UPI:882918374521"
+SAME_TEMPLATE = "A/c *7734 debited Rs. 420.00 on 21-06-25 to ZOMATO. UPI:119283747734"
+OTHER_MERCHANT = "A/c *4521 debited Rs. 350.00 on 10-05-25 to SWIGGY. UPI:882918374521"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture(scope='module', params=['tfidf', 'hashing'])
+def categorizer(request, tmp_path_factory):
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path_factory.mktemp('model') / 'model.pkl'),
+                                             vectorizer_mode=request.param)
+    assert categorizer.train_model()
+    return categorizer
+
+
+def key(sms, categorizer):
+    return app_hybrid.sms_cache_key(app_hybrid.extract_sms_data(sms), categorizer)
+
+
+def test_lru_eviction():
+    cache = TemplateCache(maxsize=2, ttl=0)
+    cache.put('a', {'category': 'A'})
+    cache.put('b', {'category': 'B'})
+    assert cache.get('a') == {'category': 'A'}  # 'b' is now least recently used
+    cache.put('c', {'category': 'C'})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'category': 'A'}
+    assert cache.get('c') == {'category': 'C'}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TemplateCache(maxsize=10, ttl=60)
+    cache.put('a', {'category': 'A'})
+    clock.now += 59
+    assert cache.get('a') == {'category': 'A'}
+    clock.now += 1
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_cached_results_are_copies():
+    cache = TemplateCache(maxsize=10)
+    result = {'category': 'A'}
+    cache.put('a', result)
+    result['category'] = 'B'
+    cache.get('a')['category'] = 'C'
+    assert cache.get('a') == {'category': 'A'}
+
+
+def test_disabled_cache():
+    cache = TemplateCache(maxsize=0)
+    cache.put('a', {'category': 'A'})
+    assert cache.get('a') is None
+    assert not cache.stats()['enabled']
+
+
+def test_template_keeps_digit_run_lengths():
+    assert sms_template(SMS) == "A/c *0000 debited Rs. 000.00 on 00-00-00 to ZOMATO. UPI:000000000000"
+    assert sms_template("Paid to kotak811 via d2h") == "Paid to kotak811 via d2h"
+
+
+def test_digit_only_variation_shares_key(categorizer):
+    if categorizer.vectorizer_mode == 'hashing':
+        # Hashed numeric tokens carry weight, so their digits stay in the key
+        assert not categorizer.template_keys
+        assert key(SMS, categorizer) != key(SAME_TEMPLATE, categorizer)
+        assert key(SMS, categorizer) == key(SMS, categorizer)
+    else:
+        # The bundled vocabulary's digits are all inside words ('count_2')
+        assert categorizer.template_keys
+        assert key(SMS, categorizer) == key(SAME_TEMPLATE, categorizer)
+
+
+def test_numeric_vocabulary_terms():
+    assert not has_variable_digit_terms(['zomato', 'category_food_dining_count_2 amount_small', 'kotak811'])
+    assert has_variable_digit_terms(['zomato', 'upi 350'])
+    assert has_variable_digit_terms(['a/c xx4521'])
+
+
+def test_numeric_vocabulary_term_keys_on_raw_text(tmp_path):
+    # A recurring number in the training text becomes a TF-IDF term
+    data = [dict(item, description=f"{item['description']} 350") if item['category'] == 'Food & Dining'
+            else item for item in ENHANCED_TRAINING_DATA]
+    categorizer = ImprovedExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'), auto_train=False)
+    assert categorizer.train_model(data)
+    assert '350' in categorizer.vectorizer.vocabulary_ and not categorizer.template_keys
+    assert key(SMS, categorizer) != key(SAME_TEMPLATE, categorizer)
+
+    reloaded = ImprovedExpenseCategorizer(model_path=str(tmp_path / 'model.pkl'), auto_train=False)
+    assert reloaded.load_model() and not reloaded.template_keys
+    reloaded.save_artifact(str(tmp_path / 'artifact'))
+    served = ImprovedExpenseCategorizer(model_path=str(tmp_path / 'artifact'), auto_train=False)
+    assert served.load_model() and not served.template_keys
+
+
+def test_merchant_change_misses(categorizer):
+    assert key(SMS, categorizer) != key(OTHER_MERCHANT, categorizer)
+
+
+def test_amount_bucket_change_misses(categorizer):
+    assert key(SMS, categorizer) != key(SMS.replace('350.00', '35000.00'), categorizer)
@@ -0,0 +1,178 @@
+"""
+Tests for the bounded inference executor and the 429/503 responses built from its rejections
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import app_hybrid
+from serving import InferenceExecutor, InferenceRejected
+
+SMS = "Payment of Rs.450.00 made to ZOMATO on 15-Oct-25 via UPI"
+
+
+def occupy(executor, count):
+    """Start count tasks that block until the returned event is set"""
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def task():
+        started.release()
+        release.wait(5)
+
+    threads = [threading.Thread(target=executor.run, args=(task,)) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for _ in range(min(count, executor.max_workers)):
+        assert started.acquire(timeout=5)
+    return release, threads
+
+
+def test_runs_inline_without_workers():
+    executor = InferenceExecutor(max_workers=0)
+    assert executor.run(lambda a, b=0: a + b, 1, b=2) == 3
+    assert executor.stats()['completed'] == 0
+
+
+def test_returns_result_and_propagates_errors():
+    executor = InferenceExecutor(max_workers=2, max_queue=0)
+    assert executor.run(lambda a, b=0: a + b, 1, b=2) == 3
+    with pytest.raises(ZeroDivisionError):
+        executor.run(lambda: 1 / 0)
+    assert executor.stats()['in_flight'] == 0
+    assert executor.stats()['completed'] == 2
+
+
+def test_full_queue_rejects_with_429():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    release, threads = occupy(executor, 2)
+    try:
+        with pytest.raises(InferenceRejected) as rejected:
+            executor.run(lambda: None)
+        assert rejected.value.status == 429
+        assert rejected.value.retry_after >= 1
+        assert executor.stats()['rejected'] == 1
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert executor.run(lambda: 'ok') == 'ok'
+
+
+def test_timeout_rejects_with_503():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(InferenceRejected) as rejected:
+            executor.run(release.wait, 5)
+        assert rejected.value.status == 503
+        assert executor.stats()['timed_out'] == 1
+    finally:
+        release.set()
+
+
+def test_timed_out_queued_task_is_cancelled():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    release, threads = occupy(executor, 1)
+    executor.timeout = 0.05
+    ran = []
+    try:
+        with pytest.raises(InferenceRejected):
+            executor.run(ran.append, 1)
+        assert executor.stats()['in_flight'] == 1 and executor.stats()['abandoned'] == 0
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert executor.run(lambda: 'ok') == 'ok'
+    assert ran == []
+
+
+def test_abandoned_running_task_keeps_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(InferenceRejected):
+            executor.run(release.wait, 5)
+        assert executor.stats()['abandoned'] == 1
+        with pytest.raises(InferenceRejected) as rejected:
+            executor.run(lambda: None)
+        assert rejected.value.status == 429
+    finally:
+        release.set()
+    deadline = time.monotonic() + 5
+    while executor.stats()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.stats()['abandoned'] == 0
+    assert executor.run(lambda: 'ok') == 'ok'
+
+
+def pool_settings(**env):
+    """Inference pool app_hybrid builds under the given environment"""
+    env = dict({key: value for key, value in os.environ.items() if not key.startswith('FINSAATHI_')}, **env)
+    code = ("import json, app_hybrid; app_hybrid.create_app(); "
+            "print(json.dumps(app_hybrid.inference.stats()))")
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_pool_defaults_follow_the_gunicorn_settings(tmp_path):
+    model = str(tmp_path / 'missing.pkl')
+    sync = pool_settings(FINSAATHI_MODEL_PATH=model)
+    assert not sync['enabled'] and sync['timeout_seconds'] == 24
+
+    gthread = pool_settings(FINSAATHI_MODEL_PATH=model, FINSAATHI_SERVING_MODE='gthread',
+                            FINSAATHI_WORKER_TIMEOUT='60')
+    assert gthread['max_workers'] == 4 and gthread['timeout_seconds'] == 48
+
+    capped = pool_settings(FINSAATHI_MODEL_PATH=model, FINSAATHI_INFERENCE_TIMEOUT='45')
+    assert capped['timeout_seconds'] == 24
+
+
+@pytest.fixture
+def client():
+    app_hybrid.create_app()
+    return app_hybrid.app.test_client()
+
+
+def test_endpoint_answers_429_when_queue_is_full(client, monkeypatch):
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=5)
+    monkeypatch.setattr(app_hybrid, 'inference', executor)
+    release, threads = occupy(executor, 1)
+    try:
+        response = client.post('/api/categorize/sms', json={'sms_text': SMS})
+        batch = client.post('/api/categorize/batch', json={'sms_list': [SMS]})
+        stream = client.post('/api/categorize/stream', data=SMS + '\n', content_type='text/plain')
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    for rejected in (response, batch, stream):
+        assert rejected.status_code == 429
+        assert int(rejected.headers['Retry-After']) >= 1
+        assert rejected.get_json()['retry_after'] >= 1
+    assert client.post('/api/categorize/sms', json={'sms_text': SMS}).status_code == 200
+
+
+def test_endpoint_answers_503_on_timeout(client, monkeypatch):
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=0.05)
+    monkeypatch.setattr(app_hybrid, 'inference', executor)
+    release = threading.Event()
+    hybrid_categorize = app_hybrid.hybrid_categorize
+    monkeypatch.setattr(app_hybrid, 'hybrid_categorize',
+                        lambda *args, **kwargs: release.wait(5) and hybrid_categorize(*args, **kwargs))
+    try:
+        response = client.post('/api/categorize/sms', json={'sms_text': SMS})
+    finally:
+        release.set()
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    assert 'timed out' in response.get_json()['error']
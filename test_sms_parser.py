@@ -0,0 +1,98 @@
+"""
+Parity tests for the single-pass SMS parser
+Expected values were recorded from the sequential regex cascades it replaced
+"""
+import pytest
+
+from sms_parser import parse_sms
+from sms_patterns import SMS_PATTERNS
+from financial_analyst import FinancialAnalystAI
+from app_hybrid import extract_sms_data
+
+# (sms, amount, transaction_type, date, sms merchant, analyst merchant, category, confidence)
+SAMPLE_SMS = [
+    ("A/c *5678 debited Rs. 970.00 on 10-05-25 to UMA CLINICAL LABORATORY. UPI:882918376710",
+     970.0, 'debit', '10-05-25', 'UMA CLINICAL LABORATORY', 'UMA CLINICAL LABORATORY', 'Healthcare', 1.0),
+    ("Rs.1250.00 debited from A/c XX1234 on 15-Oct-25 to MYNTRA FASHION STORE for online purchase",
+     1250.0, 'debit', None, 'MYNTRA FASHION STORE', 'MYNTRA FASHION STORE', 'Shopping', 1.0),
+    ("Payment of Rs.45.50 made to INDIAN OIL PETROL PUMP on 15-Oct-25 via UPI",
+     45.5, 'payment', None, 'INDIAN OIL PETROL PUMP', 'INDIAN OIL PETROL PUMP', 'Fuel', 1.0),
+    ("Account debited Rs.285.50 on 15-Oct-25 at STARBUCKS COFFEE STORE for Card ending 1234",
+     285.5, 'debit', None, 'STARBUCKS COFFEE STORE', 'STARBUCKS COFFEE STORE', 'Food & Dining', 1.0),
+    ("A/c debited Rs.471.00 on 23-05-25 to EASTERN POWER DISTRIBUTION COMPANY LIMITED OF ANDHRA PRADESH",
+     471.0, 'debit', '23-05-25', 'EASTERN POWER DISTRIBUTION COMPANY LIMITED OF ANDHRA PRADESH',
+     'EASTERN POWER DISTRIBUTION COMPANY LIMITED OF ANDHRA PRADESH', 'Utilities', 1.0),
+    ("A/c debited Rs.500 to APOLLO PHARMACY",
+     500.0, 'debit', None, 'APOLLO PHARMACY', 'APOLLO PHARMACY', 'Healthcare', 1.0),
+    ("Payment Rs.1200 to AMAZON INDIA",
+     1200.0, 'payment', None, 'AMAZON INDIA', 'AMAZON INDIA', 'Transportation', 0.9),
+    ("UPI to UBER INDIA Rs.150",
+     150.0, 'unknown', None, None, 'UPI', 'Transportation', 1.0),
+    # /api/test
+    ("A/c *5678 debited Rs. 970.00 on 10-05-25 to UMA CLINICAL LABORATORY. Avl bal Rs.45,230.00",
+     970.0, 'debit', '10-05-25', 'UMA CLINICAL LABORATORY', 'UMA CLINICAL LABORATORY', 'Healthcare', 1.0),
+]
+
+# Inputs where token starts sit inside or next to other tokens
+EDGE_CASE_SMS = [
+    "INR 2,500.00 spent on card ending 4321 at CROMA on 03/11/2025. Avl bal INR 10,000.00",
+    "₹ 99 paid to RAHUL SHARMA via UPI on 7 May 2025",
+    "Refund of Rs.120 received from AMAZON on 12 Dec 25",
+    "Your transfers 5 received from NEFT",
+    "Prepaid recharge of 199 done for JIO",
+    "Balance enquiry",
+]
+
+
+def sequential_fields(text):
+    """Amount, type and date the way the old per-pattern cascade computed them"""
+    amount = None
+    for _, pattern in SMS_PATTERNS.patterns('amount'):
+        match = pattern.search(text)
+        if match:
+            amount = float(match.group(1).replace(',', ''))
+            break
+
+    transaction_type = 'unknown'
+    for name, pattern in SMS_PATTERNS.patterns('transaction_type'):
+        if pattern.search(text):
+            transaction_type = name.split('.', 1)[1]
+            break
+
+    date = None
+    for _, pattern in SMS_PATTERNS.patterns('date'):
+        match = pattern.search(text)
+        if match:
+            date = match.group(1)
+            break
+
+    return amount, transaction_type, date
+
+
+@pytest.mark.parametrize("sms, amount, transaction_type, date, merchant, analyst_merchant, category, confidence", SAMPLE_SMS)
+def test_sample_sms_fields(sms, amount, transaction_type, date, merchant, analyst_merchant, category, confidence):
+    assert extract_sms_data(sms) == {
+        'amount': amount,
+        'transaction_type': transaction_type,
+        'date': date,
+        'merchant': merchant,
+        'raw_text': sms
+    }
+
+
+@pytest.mark.parametrize("sms, amount, transaction_type, date, merchant, analyst_merchant, category, confidence", SAMPLE_SMS)
+def test_sample_sms_categorization_shares_parse(sms, amount, transaction_type, date, merchant, analyst_merchant, category, confidence):
+    analyst = FinancialAnalystAI()
+    parsed = parse_sms(sms)
+
+    shared = analyst.categorize_transaction(sms, parsed)
+    assert shared == analyst.categorize_transaction(sms)
+    assert shared['merchant_name'] == analyst_merchant
+    assert shared['category'] == category
+    assert shared['confidence_score'] == confidence
+
+
+@pytest.mark.parametrize("sms", [case[0] for case in SAMPLE_SMS] + EDGE_CASE_SMS)
+def test_single_pass_matches_sequential_cascade(sms):
+    parsed = parse_sms(sms)
+    assert (parsed.amount, parsed.transaction_type, parsed.date) == sequential_fields(sms)
@@ -0,0 +1,95 @@
+"""
+Round-trip tests for the NDJSON streaming endpoint /api/categorize/stream
+"""
+import json
+
+import pytest
+
+import app_hybrid
+from test_sms_parser import SAMPLE_SMS
+
+MESSAGES = [sms for sms, *_ in SAMPLE_SMS[:5]]
+
+
+@pytest.fixture
+def client():
+    app_hybrid.create_app()
+    return app_hybrid.app.test_client()
+
+
+def stream(client, body, content_type='text/plain', **params):
+    response = client.post('/api/categorize/stream', data=body, content_type=content_type, query_string=params)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    return [json.loads(line) for line in lines[:-1]], json.loads(lines[-1])
+
+
+def test_text_lines_round_trip(client):
+    body = '\n'.join(MESSAGES[:2] + ['', '   '] + MESSAGES[2:]) + '\n\n'
+    results, summary = stream(client, body, chunk_size=2)
+
+    # Blank lines are skipped, not counted
+    assert summary['success'] and summary['processed_count'] == len(MESSAGES)
+    assert [r['index'] for r in results] == list(range(len(MESSAGES)))
+    assert [r['sms_data']['raw_text'] for r in results] == MESSAGES
+    batch = app_hybrid.categorize_sms_list(MESSAGES)
+    assert [r['categorization']['category'] for r in results] == [r['categorization']['category'] for r in batch]
+
+
+def test_ndjson_lines_round_trip(client):
+    lines = [
+        json.dumps(MESSAGES[0]),
+        json.dumps({'sms_text': MESSAGES[1]}),
+        '{not json',
+        json.dumps({'text': MESSAGES[2]}),
+        '',
+        json.dumps(MESSAGES[3]) + '\r'
+    ]
+    results, summary = stream(client, '\n'.join(lines), content_type='application/x-ndjson')
+
+    assert summary['processed_count'] == 5
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert [r['sms_data']['raw_text'] for r in results if 'sms_data' in r] == [MESSAGES[0], MESSAGES[1], MESSAGES[3]]
+    assert [r['index'] for r in results if 'error' in r] == [2, 3]
+    assert results[2]['error'] == 'line is not valid JSON'
+    assert results[3]['error'].startswith('line has no SMS text')
+
+
+def test_oversized_line_is_reported_and_skipped(client):
+    oversized = 'x' * (app_hybrid.STREAM_MAX_LINE_BYTES + 100)
+    body = '\n'.join([MESSAGES[0], oversized, MESSAGES[1]])
+    results, summary = stream(client, body)
+
+    assert summary['processed_count'] == 3
+    assert results[1]['error'] == f"line exceeds {app_hybrid.STREAM_MAX_LINE_BYTES} bytes"
+    assert results[1]['sms_text'] is None
+    assert [results[0]['sms_data']['raw_text'], results[2]['sms_data']['raw_text']] == MESSAGES[:2]
+
+
+@pytest.mark.parametrize('content_type', ['text/plain', 'application/x-ndjson'])
+def test_undecodable_line_is_reported(client, content_type):
+    first = MESSAGES[0] if content_type == 'text/plain' else json.dumps(MESSAGES[0])
+    body = first.encode() + b'\nPaid Rs.50 to \xff\xfe STORE\n' + first.encode() + b'\n'
+    results, summary = stream(client, body, content_type=content_type)
+
+    assert summary['processed_count'] == 3
+    assert results[1] == {'index': 1, 'error': 'line is not valid UTF-8', 'sms_text': None}
+    assert [results[0]['sms_data']['raw_text'], results[2]['sms_data']['raw_text']] == [MESSAGES[0]] * 2
+
+
+def test_omit_raw_text(client):
+    results, _ = stream(client, '\n'.join(MESSAGES[:2]), omit_raw_text='1')
+    assert all('raw_text' not in r['sms_data'] for r in results)
+
+
+def test_empty_body(client):
+    results, summary = stream(client, '\n\n')
+    assert results == [] and summary['processed_count'] == 0
+
+
+@pytest.mark.parametrize('chunk_size', [0, -1, app_hybrid.STREAM_MAX_CHUNK_SIZE + 1])
+def test_rejects_bad_chunk_size(client, chunk_size):
+    response = client.post('/api/categorize/stream', data=MESSAGES[0], content_type='text/plain',
+                           query_string={'chunk_size': chunk_size})
+    assert response.status_code == 400